@@ -0,0 +1,137 @@
+"""
+This module finds the Darshan logs of a run and reduces their counters
+to an I/O characterization: bytes moved, operation counts, the access
+size histogram, and the time spent in I/O versus metadata.
+"""
+
+import re
+import os
+
+# darshan-parser --total prints, e.g., total_POSIX_BYTES_READ: 1048576
+TOTAL_REGEX = re.compile(r'^total_([A-Z0-9_]+):\s+(\S+)\s*$')
+
+# The counters reported, by module
+COUNTERS = {
+    'POSIX': ['BYTES_READ', 'BYTES_WRITTEN', 'READS', 'WRITES', 'OPENS',
+              'STATS', 'SEEKS', 'FSYNCS'],
+    'MPIIO': ['BYTES_READ', 'BYTES_WRITTEN', 'INDEP_READS', 'INDEP_WRITES',
+              'COLL_READS', 'COLL_WRITES', 'INDEP_OPENS', 'COLL_OPENS'],
+    'STDIO': ['BYTES_READ', 'BYTES_WRITTEN', 'READS', 'WRITES', 'OPENS'],
+}
+
+# The buckets of the POSIX access size histogram
+SIZE_BUCKETS = ['0_100', '100_1K', '1K_10K', '10K_100K', '100K_1M',
+                '1M_4M', '4M_10M', '10M_100M', '100M_1G', '1G_PLUS']
+
+# The counters holding the time (seconds, summed over ranks) spent
+# reading, writing, and in metadata operations. Only POSIX and STDIO are
+# summed, since MPI-IO calls are also counted by the POSIX module.
+TIMES = {
+    'read_time': 'F_READ_TIME',
+    'write_time': 'F_WRITE_TIME',
+    'meta_time': 'F_META_TIME',
+}
+
+
+def find_logs(log_dir, since=None, job_id=None):
+    """
+    Find the Darshan logs of a run
+
+    :param log_dir: The directory Darshan writes logs to
+    :param since: Only logs modified at or after this time (seconds since
+    the epoch)
+    :param job_id: Only logs of this job id. Darshan names logs
+    USER_EXE_idJOBID-PID_..., so the id is matched up to the dash.
+    :return: The list of logs
+    """
+    logs = []
+    for root, _, names in os.walk(log_dir):
+        for name in names:
+            if not name.endswith('.darshan'):
+                continue
+            if job_id is not None and f'_id{job_id}-' not in name:
+                continue
+            path = os.path.join(root, name)
+            if since is not None and os.path.getmtime(path) < since:
+                continue
+            logs.append(path)
+    return sorted(logs)
+
+
+def parse_totals(text):
+    """
+    Parse the output of darshan-parser --total
+
+    :param text: darshan-parser's stdout
+    :return: Dict mapping counter names (e.g., POSIX_BYTES_READ) to values
+    """
+    totals = {}
+    for line in text.splitlines():
+        match = TOTAL_REGEX.match(line.strip())
+        if match is None:
+            continue
+        try:
+            totals[match.group(1)] = float(match.group(2))
+        except ValueError:
+            continue
+    return totals
+
+
+def pydarshan_totals(path):
+    """
+    Sum every counter of a log with pydarshan, for hosts without
+    darshan-parser
+
+    :param path: The log
+    :return: The same format as parse_totals
+    """
+    import darshan
+    report = darshan.DarshanReport(path, read_all=True)
+    totals = {}
+    for mod in report.modules:
+        if mod.replace('-', '') not in COUNTERS:
+            continue
+        dfs = report.records[mod].to_df()
+        for kind in ['counters', 'fcounters']:
+            df = dfs.get(kind)
+            if df is None:
+                continue
+            for col in df.columns:
+                if col in ('id', 'rank'):
+                    continue
+                totals[col] = totals.get(col, 0) + float(df[col].sum())
+    return totals
+
+
+def summarize(log_totals):
+    """
+    Combine the counters of several logs into stats
+
+    :param log_totals: A list with the parse_totals of each log
+    :return: Dict mapping stat names (e.g., posix_bytes_read,
+    posix_size_read_1k_10k, io_time) to values
+    """
+    totals = {}
+    for log in log_totals:
+        for key, val in log.items():
+            totals[key] = totals.get(key, 0) + val
+    stats = {'logs': len(log_totals)}
+    for mod, counters in COUNTERS.items():
+        for counter in counters:
+            key = f'{mod}_{counter}'
+            if key in totals:
+                stats[key.lower()] = totals[key]
+    for op in ['READ', 'WRITE']:
+        for bucket in SIZE_BUCKETS:
+            key = f'POSIX_SIZE_{op}_{bucket}'
+            if key in totals:
+                stats[key.lower()] = totals[key]
+    for name, counter in TIMES.items():
+        stats[name] = totals.get(f'POSIX_{counter}', 0) + \
+            totals.get(f'STDIO_{counter}', 0)
+    stats['io_time'] = stats['read_time'] + stats['write_time']
+    stats['bytes_read'] = totals.get('POSIX_BYTES_READ', 0) + \
+        totals.get('STDIO_BYTES_READ', 0)
+    stats['bytes_written'] = totals.get('POSIX_BYTES_WRITTEN', 0) + \
+        totals.get('STDIO_BYTES_WRITTEN', 0)
+    return stats
@@ -4,6 +4,10 @@ Darshan is ....
 """
 from jarvis_cd.basic.pkg import Interceptor
 from jarvis_util import *
+from .parse import find_logs, parse_totals, pydarshan_totals, summarize
+import importlib.util
+import shutil
+import time
 import os
 
 
@@ -15,7 +19,7 @@ class Darshan(Interceptor):
         """
         Initialize paths
         """
-        pass
+        self.run_start = None
 
     def _configure_menu(self):
         """
@@ -38,6 +42,12 @@ class Darshan(Interceptor):
                 'type': str,
                 'default': 'myjob',
             },
+            {
+                'name': 'analyze',
+                'msg': 'Parse the logs of each run into the iterator stats',
+                'type': bool,
+                'default': True,
+            },
         ]
 
     def _configure(self, **kwargs):
@@ -48,7 +58,7 @@ class Darshan(Interceptor):
         :param kwargs: Configuration parameters for this pkg.
         :return: None
         """
-        self.env['DARSHAN_LOG_DIR'] = self.config['log_dir']
+        self.env['DARSHAN_LOG_DIR'] = self.log_dir()
         self.env['PBS_JOBID'] = self.config['job_id']
         self.config['DARSHAN_LIB'] = self.find_library('darshan')
         if self.config['DARSHAN_LIB'] is None:
@@ -63,4 +73,69 @@ class Darshan(Interceptor):
 
         :return: None
         """
+        log_dir = self.log_dir()
+        if log_dir != self.env['DARSHAN_LOG_DIR']:
+            # E.g., log_dir references ITER_DIR
+            self.env['DARSHAN_LOG_DIR'] = log_dir
+            self.mkdir(log_dir)
+        self.run_start = time.time()
         self.append_env('LD_PRELOAD', self.config['DARSHAN_LIB'])
+
+    def log_dir(self):
+        """
+        The directory Darshan writes logs to. Environment variables (e.g.,
+        ${ITER_DIR}) are expanded, so each iteration can have its own.
+
+        :return: str
+        """
+        return os.path.expandvars(self.config['log_dir'])
+
+    def parse_logs(self):
+        """
+        Parse the logs written since this run started. Darshan names logs
+        after the job id only when it is numeric, so other job ids are
+        not used to select logs.
+
+        :return: Dict of stats, or None if there are no logs or no tool
+        to parse them
+        """
+        job_id = self.config['job_id']
+        if not str(job_id).isdigit():
+            job_id = None
+        logs = find_logs(self.env['DARSHAN_LOG_DIR'], self.run_start, job_id)
+        if len(logs) == 0:
+            self.log(f'No darshan logs found in '
+                     f'{self.env["DARSHAN_LOG_DIR"]}', Color.YELLOW)
+            return None
+        parser = shutil.which('darshan-parser', path=self.env.get('PATH'))
+        if parser is None and importlib.util.find_spec('darshan') is None:
+            self.log('Skipping darshan log analysis: neither '
+                     'darshan-parser nor pydarshan is available',
+                     Color.YELLOW)
+            return None
+        log_totals = []
+        for log in logs:
+            if parser is not None:
+                node = Exec(f'{parser} --total {log}',
+                            LocalExecInfo(env=self.env,
+                                          hide_output=True,
+                                          collect_output=True))
+                log_totals.append(parse_totals(node.stdout['localhost']))
+            else:
+                log_totals.append(pydarshan_totals(log))
+        return summarize(log_totals)
+
+    def _get_stat(self, stat_dict):
+        """
+        Get statistics from the application.
+
+        :param stat_dict: A dictionary of statistics.
+        :return: None
+        """
+        if not self.config.get('analyze', True) or self.run_start is None:
+            return
+        stats = self.parse_logs()
+        if stats is None:
+            return
+        for key, val in stats.items():
+            stat_dict[f'{self.pkg_id}.{key}'] = val
@@ -4,6 +4,10 @@ DataStagein is ....
 """
 from jarvis_cd.basic.pkg import Application
 from jarvis_util import *
+from .stager import Stager
+import base64
+import shlex
+import json
 import os
 import pathlib
 import time
@@ -62,6 +66,34 @@ class DataStagein(Application):
                 'type': str,
                 'default': None,
             },
+            {
+                'name': 'nthreads',
+                'msg': 'The number of files to copy in parallel',
+                'type': int,
+                'default': 8,
+            },
+            {
+                'name': 'skip',
+                'msg': 'How to detect files which are already staged',
+                'type': str,
+                'default': 'size_mtime',
+                'choices': Stager.SKIP_MODES,
+            },
+            {
+                'name': 'buf_size',
+                'msg': 'The size of each read and write (e.g., 16m)',
+                'type': str,
+                'default': '16m',
+            },
+            {
+                'name': 'distribute',
+                'msg': 'Stage the data into dest_data_path on every host. '
+                       'Each host pulls a disjoint shard from the source and '
+                       'the hosts then exchange shards in a ring, so the '
+                       'source is read only once.',
+                'type': bool,
+                'default': False,
+            },
         ]
     
     def _print_required_params(self):
@@ -138,8 +170,6 @@ class DataStagein(Application):
         if not pathlib.Path(dest_data_path).exists():
             pathlib.Path(dest_data_path).mkdir(parents=True, exist_ok=True)
         
-        start = time.time()
-        
         for data_path in user_data_list:
             if not os.path.exists(data_path):
                 raise FileNotFoundError(f"Data path {data_path} does not exist")
@@ -153,30 +183,101 @@ class DataStagein(Application):
                     # Check if the file is not empty
                     if os.stat(data_path).st_size == 0:
                         raise ValueError(f"Data file {data_path} is empty")
-            
-            # Check if two directory contains the same files
-            dest_files = os.listdir(dest_data_path)
-            if os.path.isdir(data_path) and set(dest_files) == set(os.listdir(data_path)):
-                # data_files = os.listdir(data_path)
-                # if set(dest_files) == set(data_files):
-                print(f"Data path {data_path} already exists in {dest_data_path}")
-                continue
-            
-            # Move data to destination path
-            cmd = f"cp -r {data_path} {dest_data_path}"
-            print(f"Copying data from {data_path} to {dest_data_path}")
-            Exec(cmd,LocalExecInfo(env=self.mod_env,))
-            
-            copied_items = 1
-            if os.path.isdir(data_path): copied_items = len(os.listdir(data_path))
-            print(f"Copied {copied_items} items ... ")
-        
-        end = time.time()
-        diff = end - start
-        self.log(f'data_stagein TIME: {diff} seconds')
-            
+
+        # Copy the data in parallel, skipping files already staged
+        print(f"Copying data from {user_data_list} to {dest_data_path}")
+        stager = Stager(nthreads=self.config.get('nthreads', 8),
+                        skip=self.config.get('skip', 'size_mtime'),
+                        buf_size=SizeConv.to_int(
+                            self.config.get('buf_size', '16m')))
+        if self.config.get('distribute') and len(self.jarvis.hostfile) > 1:
+            if len(mkdir_datapaths_list):
+                self.mkdir(mkdir_datapaths_list, self.jarvis.hostfile)
+            self.stage_stats = self.stage_distributed(
+                stager, user_data_list, dest_data_path)
+        else:
+            self.stage_stats = stager.stage(user_data_list, dest_data_path)
+        stats = self.stage_stats
+        if 'files_copied' in stats:
+            print(f"Copied {stats['files_copied']} files "
+                  f"({stats['bytes_copied']} bytes), skipped "
+                  f"{stats['files_skipped']} already staged files")
+        self.log(f'data_stagein TIME: {stats["seconds"]} seconds')
+        self.log(f'data_stagein BANDWIDTH: '
+                 f'{stats["bandwidth"] / (1 << 20):.2f} MB/s')
+
         print("Data stagein complete")
 
+    def stage_distributed(self, stager, srcs, dest_data_path):
+        """
+        Stage the data on every host in the hostfile. Host i pulls shard i
+        of the files from the source. Then, in each round of a ring
+        allgather, every host streams a shard to the next host with tar
+        over ssh.
+
+        :param stager: The Stager each host copies its shard with
+        :param srcs: A list of files or directories
+        :param dest_data_path: The directory to stage them into
+        :return: Dict of statistics
+        """
+        hosts = self.jarvis.hostfile.hosts
+        stage_dir = f'{self.shared_dir}/stagein'
+        os.makedirs(stage_dir, exist_ok=True)
+        files = stager.plan(srcs, dest_data_path, mkdirs=False)
+        shards = Stager.shard(files, len(hosts))
+        total = sum(size for _, _, size in files)
+        dest = shlex.quote(dest_data_path)
+
+        # Each host pulls its shard. The stager is sent with the command,
+        # so it does not need to be installed on the hosts.
+        with open(f'{self.pkg_dir}/stager.py', 'rb') as fp:
+            script = base64.b64encode(fp.read()).decode()
+        pull_cmds = {}
+        for i, (host, shard) in enumerate(zip(hosts, shards)):
+            manifest = f'{stage_dir}/shard_{i}.json'
+            with open(manifest, 'w', encoding='utf-8') as fp:
+                json.dump(shard, fp)
+            with open(f'{stage_dir}/shard_{i}.list', 'w',
+                      encoding='utf-8') as fp:
+                for _, dst, _ in shard:
+                    fp.write(os.path.relpath(dst, dest_data_path) + '\n')
+            pull_cmds[host] = (f'mkdir -p {dest} && '
+                               f'echo {script} | base64 -d | python3 - '
+                               f'{shlex.quote(manifest)} '
+                               f'--nthreads {stager.nthreads} '
+                               f'--skip {stager.skip} '
+                               f'--buf_size {stager.buf_size}')
+        start = time.time()
+        self.exec_per_host(pull_cmds)
+        pull_time = time.time() - start
+
+        # Exchange the shards
+        for cur_round in Stager.ring_rounds(len(hosts)):
+            cmds = {}
+            for sender, receiver, shard in cur_round:
+                if len(shards[shard]) == 0:
+                    continue
+                shard_list = shlex.quote(f'{stage_dir}/shard_{shard}.list')
+                cmds[hosts[sender]] = (
+                    f'tar -C {dest} -cf - -T {shard_list} | '
+                    f'ssh -o BatchMode=yes {hosts[receiver]} '
+                    f'{shlex.quote(f"mkdir -p {dest} && tar -C {dest} -xf -")}')
+            self.exec_per_host(cmds)
+        seconds = time.time() - start
+        exchange_time = seconds - pull_time
+        return {
+            'hosts': len(hosts),
+            'files': len(files),
+            'bytes': total,
+            'pull_seconds': pull_time,
+            'exchange_seconds': exchange_time,
+            'seconds': seconds,
+            # The rate the source was read at
+            'source_bandwidth': total / pull_time if pull_time else 0,
+            # The rate data landed on all hosts together
+            'bandwidth': total * len(hosts) / seconds if seconds else 0,
+        }
+
     def stop(self):
         """
         Stop a running application. E.g., OrangeFS will terminate the servers,
@@ -194,3 +295,16 @@ class DataStagein(Application):
         :return: None
         """
         pass
+
+    def _get_stat(self, stat_dict):
+        """
+        Get statistics from the application.
+
+        :param stat_dict: A dictionary of statistics.
+        :return: None
+        """
+        stats = getattr(self, 'stage_stats', None)
+        if stats is None:
+            return
+        for key, val in stats.items():
+            stat_dict[f'{self.pkg_id}.{key}'] = val
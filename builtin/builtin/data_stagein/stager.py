@@ -0,0 +1,242 @@
+"""
+This module copies files and directory trees with a pool of threads.
+Files are copied in the kernel with copy_file_range where possible and
+with large buffered reads otherwise. Files which are already staged are
+skipped, so an interrupted or repeated stage-in only copies what changed.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import hashlib
+import heapq
+import json
+import shutil
+import time
+import os
+
+PART_SUFFIX = '.jarvis-part'
+
+
+class Stager:
+    """
+    Copies a set of source paths into a destination directory, like
+    cp -r src... dest.
+
+    Skip modes:
+        size_mtime: skip files whose destination has the same size and
+        modification time (copies keep the source's mtime)
+        checksum: skip files whose destination has the same size and
+        contents
+        never: always copy
+    """
+
+    SKIP_MODES = ['size_mtime', 'checksum', 'never']
+
+    def __init__(self, nthreads=8, skip='size_mtime', buf_size=16 << 20):
+        """
+        :param nthreads: The number of files copied at once
+        :param skip: One of SKIP_MODES
+        :param buf_size: The size of each read and write
+        """
+        if skip not in self.SKIP_MODES:
+            raise Exception(f'skip must be one of {self.SKIP_MODES}, '
+                            f'not {skip}')
+        self.nthreads = nthreads
+        self.skip = skip
+        self.buf_size = buf_size
+
+    def plan(self, srcs, dest_dir, mkdirs=True):
+        """
+        List the files to stage and create the destination directories
+
+        :param srcs: A list of files or directories
+        :param dest_dir: The directory to stage them into
+        :param mkdirs: Whether to create the destination directories
+        :return: List of (src, dst, size)
+        """
+        files = []
+        for src in srcs:
+            src = os.path.normpath(src)
+            dst_root = os.path.join(dest_dir, os.path.basename(src))
+            if not os.path.isdir(src):
+                if mkdirs:
+                    os.makedirs(dest_dir, exist_ok=True)
+                files.append((src, dst_root, os.path.getsize(src)))
+                continue
+            for root, _, names in os.walk(src):
+                dst_dir = os.path.join(dst_root, os.path.relpath(root, src))
+                if mkdirs:
+                    os.makedirs(dst_dir, exist_ok=True)
+                for name in names:
+                    path = os.path.join(root, name)
+                    files.append((path, os.path.join(dst_dir, name),
+                                  os.path.getsize(path)))
+        return files
+
+    def is_staged(self, src, dst):
+        """
+        Whether dst is already a copy of src
+
+        :param src: The source file
+        :param dst: The destination file
+        :return: bool
+        """
+        if self.skip == 'never' or not os.path.exists(dst):
+            return False
+        src_stat = os.stat(src)
+        dst_stat = os.stat(dst)
+        if src_stat.st_size != dst_stat.st_size:
+            return False
+        if self.skip == 'checksum':
+            return self.checksum(src) == self.checksum(dst)
+        return int(src_stat.st_mtime) == int(dst_stat.st_mtime)
+
+    def checksum(self, path):
+        digest = hashlib.blake2b()
+        with open(path, 'rb') as fp:
+            for chunk in iter(lambda: fp.read(self.buf_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def copy_file(self, src, dst):
+        """
+        Copy a file. The copy is written next to dst and renamed once
+        complete, so an interrupted copy is never mistaken for a staged
+        file.
+
+        :param src: The source file
+        :param dst: The destination file
+        :return: The number of bytes copied
+        """
+        part = dst + PART_SUFFIX
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        size = os.path.getsize(src)
+        with open(src, 'rb') as src_fp, open(part, 'wb') as dst_fp:
+            copied = 0
+            if hasattr(os, 'copy_file_range'):
+                try:
+                    while copied < size:
+                        count = os.copy_file_range(src_fp.fileno(),
+                                                   dst_fp.fileno(),
+                                                   self.buf_size)
+                        if count == 0:
+                            break
+                        copied += count
+                except OSError:
+                    # E.g., not supported between these file systems
+                    src_fp.seek(copied)
+                    dst_fp.seek(copied)
+            if copied < size:
+                shutil.copyfileobj(src_fp, dst_fp, self.buf_size)
+        shutil.copystat(src, part)
+        os.replace(part, dst)
+        return size
+
+    def stage(self, srcs, dest_dir):
+        """
+        Copy every source into dest_dir in parallel
+
+        :param srcs: A list of files or directories
+        :param dest_dir: The directory to stage them into
+        :return: Dict of statistics (see copy_files)
+        """
+        start = time.time()
+        stats = self.copy_files(self.plan(srcs, dest_dir))
+        stats['seconds'] = time.time() - start
+        stats['bandwidth'] = 0
+        if stats['seconds'] > 0:
+            stats['bandwidth'] = stats['bytes_copied'] / stats['seconds']
+        return stats
+
+    def copy_files(self, files):
+        """
+        Copy a list of files in parallel
+
+        :param files: List of (src, dst, size)
+        :return: Dict of statistics (files_copied, files_skipped,
+        bytes_copied, bytes_skipped, seconds, bandwidth in bytes/s)
+        """
+        start = time.time()
+        # Start the largest files first so one does not finish alone
+        files = sorted(files, key=lambda file: file[2], reverse=True)
+
+        def stage_file(file):
+            src, dst, size = file
+            if self.is_staged(src, dst):
+                return False, size
+            return True, self.copy_file(src, dst)
+        stats = {
+            'files_copied': 0,
+            'files_skipped': 0,
+            'bytes_copied': 0,
+            'bytes_skipped': 0,
+        }
+        with ThreadPoolExecutor(max_workers=self.nthreads) as pool:
+            for copied, size in pool.map(stage_file, files):
+                if copied:
+                    stats['files_copied'] += 1
+                    stats['bytes_copied'] += size
+                else:
+                    stats['files_skipped'] += 1
+                    stats['bytes_skipped'] += size
+        stats['seconds'] = time.time() - start
+        stats['bandwidth'] = 0
+        if stats['seconds'] > 0:
+            stats['bandwidth'] = stats['bytes_copied'] / stats['seconds']
+        return stats
+
+    @staticmethod
+    def shard(files, nshards):
+        """
+        Split files into shards of nearly equal total size. Each file is
+        placed in the currently smallest shard, largest files first.
+
+        :param files: List of (src, dst, size)
+        :param nshards: The number of shards
+        :return: List of nshards lists of files
+        """
+        shards = [[] for _ in range(nshards)]
+        totals = [(0, i) for i in range(nshards)]
+        for file in sorted(files, key=lambda file: file[2], reverse=True):
+            total, i = heapq.heappop(totals)
+            shards[i].append(file)
+            heapq.heappush(totals, (total + file[2], i))
+        return shards
+
+    @staticmethod
+    def ring_rounds(nhosts):
+        """
+        Plan a ring allgather. Host i starts with shard i. In every round,
+        each host sends the shard it most recently received (or its own)
+        to the next host, so every host has every shard after nhosts - 1
+        rounds and every link carries one shard per round.
+
+        :param nhosts: The number of hosts
+        :return: List of rounds. A round is a list of (sender, receiver,
+        shard) host and shard indices.
+        """
+        return [[(i, (i + 1) % nhosts, (i - cur_round) % nhosts)
+                 for i in range(nhosts)]
+                for cur_round in range(nhosts - 1)]
+
+
+def main():
+    """
+    Copy the files in a manifest. Used to run a shard of a distributed
+    stage-in on each host.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('manifest',
+                        help='A JSON list of [src, dst, size] to copy')
+    parser.add_argument('--nthreads', type=int, default=8)
+    parser.add_argument('--skip', default='size_mtime')
+    parser.add_argument('--buf_size', type=int, default=16 << 20)
+    args = parser.parse_args()
+    with open(args.manifest, 'r', encoding='utf-8') as fp:
+        files = json.load(fp)
+    stager = Stager(args.nthreads, args.skip, args.buf_size)
+    print(json.dumps(stager.copy_files(files)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+This module provides classes and methods to launch the DataStageout application.
+DataStageout gathers outputs off the node-local storage of every host
+before they are cleaned.
+"""
+from jarvis_cd.basic.pkg import Application
+from jarvis_cd.basic.ssh_pool import SshPool
+from jarvis_util import *
+from concurrent.futures import ThreadPoolExecutor
+import shlex
+import os
+import time
+
+
+class DataStageout(Application):
+    """
+    This class provides methods to launch the DataStageout application.
+    """
+    # The command each host compresses its archive with, and its extension
+    COMPRESSORS = {
+        'none': (None, ''),
+        'gzip': ('gzip -c -1', '.gz'),
+        'zstd': ('zstd -c -q -T0 -3', '.zst'),
+    }
+
+    def _init(self):
+        """
+        Initialize paths
+        """
+        self.stageout_stats = None
+
+    def _configure_menu(self):
+        """
+        Create a CLI menu for the configurator method.
+        For thorough documentation of these parameters, view:
+        https://github.com/scs-lab/jarvis-util/wiki/3.-Argument-Parsing
+
+        :return: List(dict)
+        """
+        return [
+            {
+                'name': 'user_data_paths',
+                'msg': 'List of paths (may contain globs) to gather from '
+                       'every host, delimitated by comma',
+                'type': str,
+                'default': None,
+            },
+            {
+                'name': 'dest_data_path',
+                'msg': 'Where to store the gathered data. By default, a '
+                       'directory named after this pkg in ITER_DIR when '
+                       'iterating, otherwise in the shared directory.',
+                'type': str,
+                'default': None,
+            },
+            {
+                'name': 'compress',
+                'msg': 'How each host compresses its data while streaming it',
+                'type': str,
+                'default': 'none',
+                'choices': list(self.COMPRESSORS),
+            },
+            {
+                'name': 'nthreads',
+                'msg': 'The number of hosts to gather from at once',
+                'type': int,
+                'default': 16,
+            },
+        ]
+
+    def _configure(self, **kwargs):
+        """
+        Converts the Jarvis configuration to application-specific configuration.
+        E.g., OrangeFS produces an orangefs.xml file.
+
+        :param kwargs: Configuration parameters for this pkg.
+        :return: None
+        """
+        if self.config['user_data_paths'] is None:
+            raise ValueError("user_data_paths is not set")
+
+    def dest_dir(self):
+        """
+        The directory this iteration's data is gathered into
+
+        :return: str
+        """
+        if self.config['dest_data_path'] is not None:
+            return os.path.expandvars(self.config['dest_data_path'])
+        if os.environ.get('ITER_DIR'):
+            return f'{os.environ["ITER_DIR"]}/{self.pkg_id}'
+        return f'{self.shared_dir}/{self.pkg_id}'
+
+    def gather_cmd(self, host, archive):
+        """
+        The command which streams a host's data into an archive on this
+        node. Variables set on this node (e.g., PRIVATE_DIR, SHARED_DIR)
+        are expanded here. Other variables and globs are expanded by the
+        host's shell, and paths which do not exist on the host are skipped.
+
+        :param host: The host to gather from
+        :param archive: The archive to write
+        :return: str
+        """
+        paths = ' '.join([os.path.expandvars(path) for path
+                          in self.config['user_data_paths'].split(',')])
+        compressor, _ = self.COMPRESSORS[self.config['compress']]
+        remote_cmd = (f'for path in {paths}; do '
+                      f'if [ -e "$path" ]; then echo "$path"; fi; done | '
+                      f'tar -cf - -T -')
+        if compressor is not None:
+            remote_cmd = f'set -o pipefail; {remote_cmd} | {compressor}'
+        remote_cmd = f'bash -c {shlex.quote(remote_cmd)}'
+        if not SshPool.is_local(host):
+            remote_cmd = (f'ssh -o BatchMode=yes {host} '
+                          f'{shlex.quote(remote_cmd)}')
+        return f'{remote_cmd} > {shlex.quote(archive)}'
+
+    def start(self):
+        """
+        Launch an application. E.g., OrangeFS will launch the servers, clients,
+        and metadata services on all necessary pkgs.
+
+        :return: None
+        """
+        dest = self.dest_dir()
+        os.makedirs(dest, exist_ok=True)
+        hosts = self.jarvis.hostfile.hosts
+        _, ext = self.COMPRESSORS[self.config['compress']]
+        archives = {host: f'{dest}/{host}.tar{ext}' for host in hosts}
+        self.log(f'Gathering {self.config["user_data_paths"]} from '
+                 f'{len(hosts)} hosts into {dest}')
+
+        def gather(host):
+            node = Exec(self.gather_cmd(host, archives[host]),
+                        LocalExecInfo(env=self.env, hide_output=True))
+            return host, node.exit_code
+        start = time.time()
+        errors = []
+        with ThreadPoolExecutor(max_workers=self.config['nthreads']) as pool:
+            for host, exit_code in pool.map(gather, hosts):
+                if exit_code:
+                    errors.append(f'{host}: exit code {exit_code}')
+        seconds = time.time() - start
+        if len(errors):
+            raise Exception('Stage-out failed:\n' + '\n'.join(errors))
+        total = sum(os.path.getsize(archive)
+                    for archive in archives.values())
+        self.stageout_stats = {
+            'hosts': len(hosts),
+            'bytes': total,
+            'seconds': seconds,
+            'bandwidth': total / seconds if seconds else 0,
+        }
+        self.log(f'data_stageout TIME: {seconds} seconds')
+        self.log(f'data_stageout BANDWIDTH: '
+                 f'{self.stageout_stats["bandwidth"] / (1 << 20):.2f} MB/s')
+
+    def stop(self):
+        """
+        Stop a running application. E.g., OrangeFS will terminate the servers,
+        clients, and metadata services.
+
+        :return: None
+        """
+        pass
+
+    def clean(self):
+        """
+        Destroy all data for an application. E.g., OrangeFS will delete all
+        metadata and data directories in addition to the orangefs.xml file.
+
+        :return: None
+        """
+        pass
+
+    def _get_stat(self, stat_dict):
+        """
+        Get statistics from the application.
+
+        :param stat_dict: A dictionary of statistics.
+        :return: None
+        """
+        if self.stageout_stats is None:
+            return
+        for key, val in self.stageout_stats.items():
+            stat_dict[f'{self.pkg_id}.{key}'] = val
@@ -0,0 +1,183 @@
+"""
+This module parses the metrics DLIO writes to its output folder
+(summary.json and per_epoch_stats.json) and summarizes dftracer traces.
+Traces are read one event at a time, so they are never held in memory.
+"""
+
+import statistics
+import gzip
+import json
+import math
+import os
+
+
+def parse_summary(doc):
+    """
+    Extract the scalar metrics of DLIO's summary.json, e.g.,
+    train_au_mean_percentage, train_throughput_mean_samples_per_second,
+    train_io_mean_MB_per_second
+
+    :param doc: The loaded summary.json
+    :return: Dict mapping metric names to values
+    """
+    stats = {}
+    for key, val in doc.get('metric', {}).items():
+        if isinstance(val, (int, float)) and not isinstance(val, bool):
+            stats[key] = val
+    for key in ['num_accelerators', 'num_hosts', 'epochs']:
+        if isinstance(doc.get(key), (int, float)):
+            stats[key] = doc[key]
+    return stats
+
+
+def parse_epochs(doc):
+    """
+    Summarize the epoch durations of DLIO's per_epoch_stats.json
+
+    :param doc: The loaded per_epoch_stats.json, which maps each epoch to
+    a dict with its duration in seconds
+    :return: Dict with epoch_time, epoch_time_min, and epoch_time_max
+    """
+    durations = []
+    for epoch in doc.values():
+        if not isinstance(epoch, dict) or 'duration' not in epoch:
+            continue
+        try:
+            durations.append(float(epoch['duration']))
+        except ValueError:
+            continue
+    if len(durations) == 0:
+        return {}
+    return {
+        'epoch_time': statistics.mean(durations),
+        'epoch_time_min': min(durations),
+        'epoch_time_max': max(durations),
+    }
+
+
+def parse_output(output_dir):
+    """
+    Parse the metrics in a DLIO output folder
+
+    :param output_dir: The DLIO output folder
+    :return: Dict mapping stat names to values
+    """
+    stats = {}
+    for name, parse in [('summary.json', parse_summary),
+                        ('per_epoch_stats.json', parse_epochs)]:
+        path = os.path.join(output_dir, name)
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as fp:
+            stats.update(parse(json.load(fp)))
+    return stats
+
+
+class Histogram:
+    """
+    A histogram of event durations, with power-of-two microsecond buckets
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.buckets = {}
+
+    def add(self, dur):
+        """
+        :param dur: The duration in microseconds
+        :return: None
+        """
+        self.count += 1
+        self.total += dur
+        self.max = max(self.max, dur)
+        bucket = 0 if dur < 1 else int(math.log2(dur)) + 1
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, pct):
+        """
+        Approximate a percentile by the upper bound of its bucket
+
+        :param pct: The percentile (0-100)
+        :return: Microseconds
+        """
+        rank = pct / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(1 << bucket, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'time_s': self.total / 1e6,
+            'mean_us': self.total / self.count if self.count else 0,
+            'p50_us': self.percentile(50),
+            'p99_us': self.percentile(99),
+            'max_us': self.max,
+            'buckets_us': {1 << bucket: count for bucket, count
+                           in sorted(self.buckets.items())},
+        }
+
+
+def read_events(path):
+    """
+    Iterate over the events of a dftracer trace (.pfw or .pfw.gz). Traces
+    are JSON arrays with one event per line.
+
+    :param path: The trace file
+    :return: Generator of event dicts
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8', errors='replace') as fp:
+        for line in fp:
+            line = line.strip().rstrip(',')
+            if not line.startswith('{'):
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def find_traces(trace_dir):
+    """
+    :param trace_dir: The directory dftracer writes traces to
+    :return: The list of trace files in it
+    """
+    traces = []
+    for root, _, names in os.walk(trace_dir):
+        for name in names:
+            if name.endswith('.pfw') or name.endswith('.pfw.gz'):
+                traces.append(os.path.join(root, name))
+    return sorted(traces)
+
+
+def summarize_traces(paths, cats=None):
+    """
+    Build a histogram of the durations of every traced function
+
+    :param paths: The trace files
+    :param cats: The event categories to include (e.g., POSIX, STDIO).
+    None includes every category.
+    :return: Dict mapping each function name to its Histogram
+    """
+    hists = {}
+    for path in paths:
+        for event in read_events(path):
+            if 'dur' not in event or 'name' not in event:
+                continue
+            if cats is not None and event.get('cat') not in cats:
+                continue
+            try:
+                dur = float(event['dur'])
+            except (TypeError, ValueError):
+                continue
+            name = event['name']
+            if name not in hists:
+                hists[name] = Histogram()
+            hists[name].add(dur)
+    return hists
@@ -4,6 +4,8 @@ DlioBenchmark is ....
 """
 from jarvis_cd.basic.pkg import Application, Color
 from jarvis_util import *
+from .parse import parse_output, find_traces, summarize_traces
+import json
 
 
 class DlioBenchmark(Application):
@@ -14,7 +16,7 @@ class DlioBenchmark(Application):
         """
         Initialize paths
         """
-        pass
+        self.dlio_stats = None
 
     def _configure_menu(self):
         """
@@ -146,6 +148,21 @@ class DlioBenchmark(Application):
                 'type': bool,
                 'default': False,
             }, 
+            {
+                'name': 'trace_cats',
+                'msg': 'The DFTracer event categories summarized into '
+                       'per-function histograms (comma-separated, '
+                       'empty for all)',
+                'type': str,
+                'default': 'POSIX,STDIO',
+            },
+            {
+                'name': 'output_path',
+                'msg': 'Where DLIO writes its metrics and DFTracer its '
+                       'traces. Defaults to the shared directory.',
+                'type': str,
+                'default': None,
+            },
         ]
 
     def _configure(self, **kwargs):
@@ -169,6 +186,11 @@ class DlioBenchmark(Application):
             elif f"checkpoints/{self.config['workload']}" not in self.config['checkpoint_path']:
                 self.config['checkpoint_path'] = f"{self.config['checkpoint_path']}/checkpoints/{self.config['workload']}" 
 
+        # reconfigure output path
+        if self.config.get('output_path') is None:
+            self.config['output_path'] = f'{self.shared_dir}/output'
+        self.config['trace_path'] = f'{self.config["output_path"]}/trace'
+
     def start(self):
         """
         Launch an application. E.g., OrangeFS will launch the servers, clients,
@@ -176,20 +198,21 @@ class DlioBenchmark(Application):
 
         :return: None
         """
+        self.dlio_stats = None
         
         # step1: generate data if it is required before training
         if self.config['generate_data']:
             # construct the command
             gen_cmd = [
                 'dlio_benchmark',
-                f'workload={self.config['workload']}',
+                f'workload={self.config["workload"]}',
                 f'++workload.workflow.generate_data=True',
                 f'++workload.workflow.train=False',
-                f'++workload.dataset.data_folder={self.config['data_path']}' 
+                f'++workload.dataset.data_folder={self.config["data_path"]}' 
             ]
 
             if self.config['num_files_train'] is not None:
-                gen_cmd.append(f'++workload.dataset.num_files_train={self.config['num_files_train']}')
+                gen_cmd.append(f'++workload.dataset.num_files_train={self.config["num_files_train"]}')
 
             # run the command to generate data
             Exec(' '.join(gen_cmd),
@@ -204,37 +227,43 @@ class DlioBenchmark(Application):
                         hostfile=self.jarvis.hostfile))
         
         # step3: run the benchmark with the workload
+        output_path = self.config['output_path']
+        trace_path = self.config['trace_path']
+        self.rm(output_path)
         if self.config['tracing']:
+            self.mkdir(trace_path)
             self.mod_env['DFTRACER_ENABLE'] = '1'
             self.mod_env['DFTRACER_INC_METADATA'] = '1'   
+            self.mod_env['DFTRACER_LOG_FILE'] = f'{trace_path}/trace'
 
         run_cmd = [
             'dlio_benchmark',
-            f'workload={self.config['workload']}',
+            f'workload={self.config["workload"]}',
             f'++workload.workflow.generate_data=False',
             f'++workload.workflow.train=Train',
-            f'++workload.dataset.data_folder={self.config['data_path']}'  
+            f'++workload.dataset.data_folder={self.config["data_path"]}',
+            f'++workload.output.folder={output_path}'
         ]
 
         if self.config['num_files_train'] is not None:
-            run_cmd.append(f'++workload.dataset.num_files_train={self.config['num_files_train']}')
+            run_cmd.append(f'++workload.dataset.num_files_train={self.config["num_files_train"]}')
         
         if self.config['batch_size'] is not None:
-            run_cmd.append(f'++workload.reader.batch_size={self.config['batch_size']}')
+            run_cmd.append(f'++workload.reader.batch_size={self.config["batch_size"]}')
         
         if self.config['read_threads'] is not None:
-            run_cmd.append(f'++workload.reader.read_threads={self.config['read_threads']}')
+            run_cmd.append(f'++workload.reader.read_threads={self.config["read_threads"]}')
 
         if self.config['epochs'] is not None:
-            run_cmd.append(f'++workload.train.epochs={self.config['epochs']}')
+            run_cmd.append(f'++workload.train.epochs={self.config["epochs"]}')
         
         if self.config['checkpoint_supported']:
-            run_cmd.append(f'++workload.workflow.checkpoint={self.config['checkpoint']}')
-            run_cmd.append(f'++workload.checkpoint.checkpoint_folder={self.config['checkpoint_path']}')
+            run_cmd.append(f'++workload.workflow.checkpoint={self.config["checkpoint"]}')
+            run_cmd.append(f'++workload.checkpoint.checkpoint_folder={self.config["checkpoint_path"]}')
             if self.config['checkpoint_after_epoch'] is not None:
-                run_cmd.append(f'++workload.checkpoint.checkpoint_after_epoch={self.config['checkpoint_after_epoch']}')
+                run_cmd.append(f'++workload.checkpoint.checkpoint_after_epoch={self.config["checkpoint_after_epoch"]}')
             if self.config['epochs_between_checkpoints'] is not None:
-                run_cmd.append(f'++workload.checkpoint.epochs_between_checkpoints={self.config['epochs_between_checkpoints']}') 
+                run_cmd.append(f'++workload.checkpoint.epochs_between_checkpoints={self.config["epochs_between_checkpoints"]}') 
         #print(f"self.env = {self.env}", flush=True)
         # run the benchmark command
         Exec(' '.join(run_cmd),
@@ -242,7 +271,35 @@ class DlioBenchmark(Application):
                          hostfile=self.jarvis.hostfile,
                          nprocs=self.config['nprocs'],
                          ppn=self.config['ppn']))
-        
+        self.parse_results()
+
+    def parse_results(self):
+        """
+        Parse DLIO's metrics and, when tracing, summarize the traces into
+        per-function histograms. The full histograms are saved to
+        trace_summary.json in the output path.
+
+        :return: None
+        """
+        self.dlio_stats = parse_output(self.config['output_path'])
+        if len(self.dlio_stats) == 0:
+            self.log(f'No DLIO metrics in {self.config["output_path"]}',
+                     Color.RED)
+        if self.config['tracing']:
+            cats = [cat for cat in self.config.get('trace_cats', '').split(',')
+                    if cat]
+            hists = summarize_traces(find_traces(self.config['trace_path']),
+                                     cats or None)
+            summary = {name: hist.to_dict() for name, hist in hists.items()}
+            with open(f'{self.config["output_path"]}/trace_summary.json',
+                      'w', encoding='utf-8') as fp:
+                json.dump(summary, fp, indent=2)
+            for name, hist in summary.items():
+                for key, val in hist.items():
+                    if key != 'buckets_us':
+                        self.dlio_stats[f'trace.{name}.{key}'] = val
+        for key, val in self.dlio_stats.items():
+            self.log(f'{key}: {val}')
 
     def stop(self):
         """
@@ -265,11 +322,23 @@ class DlioBenchmark(Application):
            PsshExecInfo(env=self.env,
                         hostfile=self.jarvis.hostfile))
 
-        self.log(f'Removing dataset {self.config['data_path']}', Color.YELLOW)
+        self.log(f'Removing dataset {self.config["data_path"]}', Color.YELLOW)
 
         # clear checkpoint
         Rm(self.config['checkpoint_path'] + '*',
            PsshExecInfo(env=self.env,
                         hostfile=self.jarvis.hostfile))
         
-        self.log(f'Removing checkpoints {self.config['checkpoint_path']}', Color.YELLOW)
+        self.log(f'Removing checkpoints {self.config["checkpoint_path"]}', Color.YELLOW)
+
+    def _get_stat(self, stat_dict):
+        """
+        Get statistics from the application.
+
+        :param stat_dict: A dictionary of statistics.
+        :return: None
+        """
+        if self.dlio_stats is None:
+            return
+        for key, val in self.dlio_stats.items():
+            stat_dict[f'{self.pkg_id}.{key}'] = val
@@ -24,7 +24,7 @@
 #
 
 set $dir=##DIR##
-set $nfiles=10000
+set $nfiles=##NFILES##
 set $meandirwidth=20
 set $meanfilesize=128k
 set $nthreads=50
@@ -24,7 +24,7 @@
 #
 
 set $dir=##DIR##
-set $nfiles=10000
+set $nfiles=##NFILES##
 set $meandirwidth=1000000
 set $meanfilesize=16k
 set $nthreads=100
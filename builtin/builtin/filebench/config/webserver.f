@@ -24,7 +24,7 @@
 #
 
 set $dir=##DIR##
-set $nfiles=1000
+set $nfiles=##NFILES##
 set $meandirwidth=20
 set $meanfilesize=16k
 set $nthreads=100
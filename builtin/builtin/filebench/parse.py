@@ -0,0 +1,96 @@
+"""
+This module parses the IO Summary line filebench prints at the end of a
+run and aggregates it across hosts.
+"""
+
+import statistics
+import re
+
+# Filebench 1.5 prints, e.g.:
+# 60.014: IO Summary: 1234 ops 20.565 ops/s 2/4 rd/wr 0.5mb/s 48.6ms/op
+# Older versions print, e.g.:
+# IO Summary: 1234 ops, 20.6 ops/s, (2/4 r/w), 0.5mb/s, 0us cpu/op, 48.6ms latency
+OPS_REGEX = re.compile(r'(\d+)\s+ops\b(?!/)')
+OPS_SEC_REGEX = re.compile(r'([0-9.]+)\s+ops/s')
+RW_REGEX = re.compile(r'([0-9.]+)/([0-9.]+)\s+r(?:d)?/w(?:r)?')
+MB_SEC_REGEX = re.compile(r'([0-9.]+)\s*mb/s', re.IGNORECASE)
+LATENCY_REGEX = re.compile(r'([0-9.]+)\s*(ms|us)(?:/op|\s+latency)')
+
+
+def parse_summary(text):
+    """
+    Parse the last IO Summary line of a filebench run
+
+    :param text: filebench's stdout
+    :return: Dict with ops, ops_per_sec, reads_per_sec, writes_per_sec,
+    mb_per_sec, and latency_ms, or None if there is no IO Summary
+    """
+    lines = [line for line in text.splitlines() if 'IO Summary' in line]
+    if len(lines) == 0:
+        return None
+    line = lines[-1].split('IO Summary', 1)[1]
+    summary = {}
+    match = OPS_REGEX.search(line)
+    if match:
+        summary['ops'] = int(match.group(1))
+    match = OPS_SEC_REGEX.search(line)
+    if match:
+        summary['ops_per_sec'] = float(match.group(1))
+    match = RW_REGEX.search(line)
+    if match:
+        summary['reads_per_sec'] = float(match.group(1))
+        summary['writes_per_sec'] = float(match.group(2))
+    match = MB_SEC_REGEX.search(line)
+    if match:
+        summary['mb_per_sec'] = float(match.group(1))
+    match = LATENCY_REGEX.search(line)
+    if match:
+        latency = float(match.group(1))
+        if match.group(2) == 'us':
+            latency /= 1000
+        summary['latency_ms'] = latency
+    return summary
+
+
+def aggregate(host_summaries, straggler=.8):
+    """
+    Combine the IO Summary of every host. Counts and rates are summed and
+    latency is averaged, weighted by each host's ops. Hosts whose ops/s is
+    below straggler times the median are flagged as stragglers.
+
+    :param host_summaries: Dict mapping each host to its parse_summary
+    :param straggler: The fraction of the median ops/s below which a host
+    is a straggler
+    :return: (stats, stragglers). stats maps stat names (e.g., ops_per_sec,
+    ops_per_sec_min, latency_ms) to values. stragglers is the list of
+    straggling hosts.
+    """
+    summaries = {host: summary for host, summary in host_summaries.items()
+                 if summary}
+    stats = {'hosts': len(summaries)}
+    if len(summaries) == 0:
+        return stats, []
+    for key in ['ops', 'ops_per_sec', 'reads_per_sec', 'writes_per_sec',
+                'mb_per_sec']:
+        vals = [summary[key] for summary in summaries.values()
+                if key in summary]
+        if len(vals) == 0:
+            continue
+        stats[key] = sum(vals)
+        stats[f'{key}_min'] = min(vals)
+        stats[f'{key}_max'] = max(vals)
+    latencies = [(summary['latency_ms'], summary.get('ops', 1))
+                 for summary in summaries.values() if 'latency_ms' in summary]
+    weight = sum(ops for _, ops in latencies)
+    if weight > 0:
+        stats['latency_ms'] = sum(lat * ops for lat, ops in latencies) / weight
+        stats['latency_ms_max'] = max(lat for lat, _ in latencies)
+    rates = {host: summary['ops_per_sec']
+             for host, summary in summaries.items() if 'ops_per_sec' in summary}
+    stragglers = []
+    if len(rates) > 1:
+        median = statistics.median(rates.values())
+        stragglers = [host for host, rate in rates.items()
+                      if rate < straggler * median]
+    stats['stragglers'] = len(stragglers)
+    return stats, stragglers
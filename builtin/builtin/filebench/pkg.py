@@ -4,6 +4,15 @@ Redis cluster is used if the hostfile has many hosts
 """
 from jarvis_cd.basic.pkg import Application
 from jarvis_util import *
+from .parse import parse_summary, aggregate
+
+# The number of files each personality creates by default
+NFILES = {
+    'fileserver': 10000,
+    'varmail': 1000,
+    'webproxy': 10000,
+    'webserver': 1000,
+}
 
 
 class Filebench(Application):
@@ -14,7 +23,7 @@ class Filebench(Application):
         """
         Initialize paths
         """
-        pass
+        self.filebench_stats = None
 
     def _configure_menu(self):
         """
@@ -49,6 +58,25 @@ class Filebench(Application):
                 'choices': [],
                 'args': [],
             },
+            {
+                'name': 'nfiles',
+                'msg': 'The number of files in the fileset (e.g., 10k). '
+                       'Defaults to the workload\'s own. Unused by '
+                       'videoserver.',
+                'type': str,
+                'default': None,
+                'choices': [],
+                'args': [],
+            },
+            {
+                'name': 'straggler',
+                'msg': 'Flag hosts whose ops/s is below this fraction of '
+                       'the median host',
+                'type': float,
+                'default': .8,
+                'choices': [],
+                'args': [],
+            },
         ]
 
     def _configure(self, **kwargs):
@@ -62,13 +90,18 @@ class Filebench(Application):
         # Create the redis hostfile
         workload = self.config['workload']
         dir = os.path.expandvars(self.config['dir'])
-        nfiles = SizeConv.to_int(self.config['nfiles'])
+        nfiles = self.config['nfiles']
+        if nfiles is None:
+            nfiles = NFILES.get(workload, 0)
+        nfiles = SizeConv.to_int(nfiles)
         self.copy_template_file(f'{self.pkg_dir}/config/{workload}.f',
                                 f'{self.shared_dir}/{workload}.f',
                                 {
                                     'DIR': dir,
                                     'RUN': self.config['run'],
+                                    'NFILES': nfiles,
                                 })
+        self.broadcast(f'{self.shared_dir}/{workload}.f')
 
     def start(self):
         """
@@ -77,6 +110,7 @@ class Filebench(Application):
 
         :return: None
         """
+        self.filebench_stats = None
         cmd = [
             'setarch `arch` --addr-no-randomize',
             'filebench',
@@ -84,11 +118,35 @@ class Filebench(Application):
         ]
         cmd = ' '.join(cmd)
         self.log(cmd, color=Color.YELLOW)
-        Exec(cmd,
-             PsshExecInfo(env=self.mod_env,
-                          hostfile=self.jarvis.hostfile,
-                          do_dbg=self.config['do_dbg'],
-                          dbg_port=self.config['dbg_port']))
+        node = Exec(cmd,
+                    PsshExecInfo(env=self.mod_env,
+                                 hostfile=self.jarvis.hostfile,
+                                 do_dbg=self.config['do_dbg'],
+                                 dbg_port=self.config['dbg_port'],
+                                 collect_output=True))
+        self.parse_results(node.stdout)
+
+    def parse_results(self, host_stdout):
+        """
+        Parse the IO Summary of every host and combine them
+
+        :param host_stdout: Dict mapping each host to filebench's stdout
+        :return: None
+        """
+        summaries = {host: parse_summary(text)
+                     for host, text in host_stdout.items()}
+        missing = [host for host, summary in summaries.items()
+                   if summary is None]
+        if len(missing):
+            self.log(f'No IO Summary from: {" ".join(missing)}', Color.RED)
+        self.filebench_stats, stragglers = aggregate(
+            summaries, self.config.get('straggler', .8))
+        if len(stragglers):
+            rates = ', '.join([f'{host} ({summaries[host]["ops_per_sec"]} '
+                               f'ops/s)' for host in stragglers])
+            self.log(f'Stragglers: {rates}', Color.YELLOW)
+        for key, val in self.filebench_stats.items():
+            self.log(f'{key}: {val}')
 
     def stop(self):
         """
@@ -111,3 +169,15 @@ class Filebench(Application):
         Rm(self.config['dir'] + '*',
            PsshExecInfo(env=self.env,
                         hostfile=self.jarvis.hostfile))
+
+    def _get_stat(self, stat_dict):
+        """
+        Get statistics from the application.
+
+        :param stat_dict: A dictionary of statistics.
+        :return: None
+        """
+        if self.filebench_stats is None:
+            return
+        for key, val in self.filebench_stats.items():
+            stat_dict[f'{self.pkg_id}.{key}'] = val
@@ -4,6 +4,7 @@ hrun is ....
 """
 
 from jarvis_cd.basic.pkg import Service, Color
+from jarvis_cd.basic.readiness import PortProbe
 from jarvis_util import *
 
 
@@ -376,8 +377,8 @@ class HermesRun(Service):
                 'slab_sizes': ['4KB', '16KB', '64KB', '1MB']
             }
             self.config['borg_paths'].append(mount)
-            Mkdir(mount, PsshExecInfo(hostfile=self.hostfile,
-                                      env=self.env))
+        if len(self.config['borg_paths']):
+            self.mkdir(self.config['borg_paths'], self.hostfile)
         if 'ram' in self.config and self.config['ram'] != '0':
             hermes_server['devices']['ram'] = {
                 'mount_point': '',
@@ -455,6 +456,8 @@ class HermesRun(Service):
         hermes_client_yaml = f'{self.shared_dir}/hermes_client.yaml'
         YamlFile(hermes_client_yaml).save(hermes_client)
         self.env['HERMES_CLIENT_CONF'] = hermes_client_yaml
+        self.broadcast([hermes_server_yaml, hermes_client_yaml],
+                       self.hostfile)
 
     def start(self):
         """
@@ -475,8 +478,16 @@ class HermesRun(Service):
                                              hide_output=self.config['hide_output'],
                                              pipe_stdout=self.config['stdout'],
                                              pipe_stderr=self.config['stderr']))
-        time.sleep(self.config['sleep'])
-        self.log('Done sleeping')
+
+    def ready_probes(self):
+        """
+        Hermes is ready once every runtime accepts connections on
+        its RPC port.
+
+        :return: List of ReadyProbe
+        """
+        self.get_hostfile()
+        return [PortProbe(self.hostfile.hosts, self.config['port'])]
 
     def stop(self):
         """
@@ -523,7 +534,8 @@ class HermesRun(Service):
         self.get_hostfile()
         for path in self.config['borg_paths']:
             self.log(f'Removing {path}', Color.YELLOW)
-            Rm(path, PsshExecInfo(hostfile=self.hostfile))
+        if len(self.config['borg_paths']):
+            self.rm(self.config['borg_paths'], self.hostfile)
 
     def status(self):
         """
@@ -3,6 +3,7 @@ This module provides classes and methods to launch the Ior application.
 Ior is ....
 """
 from jarvis_cd.basic.pkg import Service
+from jarvis_cd.basic.readiness import PortProbe
 from jarvis_util import *
 
 
@@ -82,8 +83,14 @@ class HermesViz(Service):
             cmd = f'hermes_viz.py --port {self.config["port"]} --sleep_time {self.config["pooling"]} ' \
                   f'--real {self.config["real"]} --hostfile {self.config["hostfile"]} '
         self.daemon_pkg = Exec(cmd, LocalExecInfo(env=self.env, exec_async=True))
-        time.sleep(self.config['sleep'])
-        print('Finished sleeping for the visualizer')
+
+    def ready_probes(self):
+        """
+        The visualizer is ready once its flask server accepts connections.
+
+        :return: List of ReadyProbe
+        """
+        return [PortProbe('localhost', self.config['port'])]
 
     def stop(self):
         """
@@ -0,0 +1,114 @@
+"""
+This module parses the results of IOR, from its JSON summary file
+(-O summaryFormat=JSON) or, for IOR versions without one, from the
+per-iteration results table it prints.
+"""
+
+import statistics
+import json
+
+# The per-iteration metrics of each operation, and their keys in the
+# JSON summary
+METRICS = {
+    'bw': 'bwMiB',
+    'iops': 'iops',
+    'latency': 'latency',
+}
+
+# The headers of the columns of the text results table. IOR 3.2 added
+# the IOPS and Latency columns.
+TEXT_COLUMNS = {
+    'bw(MiB/s)': 'bw',
+    'IOPS': 'iops',
+    'Latency(s)': 'latency',
+}
+
+
+def parse_json(text):
+    """
+    Parse IOR's JSON summary
+
+    :param text: The contents of the summary file
+    :return: Dict mapping each operation (write, read) to a dict mapping
+    each metric to its list of per-iteration values
+    """
+    doc = json.loads(text)
+    results = {}
+    for test in doc.get('tests', []):
+        for entry in _flatten(test.get('Results', [])):
+            op = entry.get('access')
+            if op is None:
+                continue
+            metrics = results.setdefault(op, {name: [] for name in METRICS})
+            for name, key in METRICS.items():
+                if key in entry:
+                    metrics[name].append(float(entry[key]))
+    return results
+
+
+def parse_text(text):
+    """
+    Parse the per-iteration results table IOR prints, e.g.:
+    access bw(MiB/s) IOPS Latency(s) block(KiB) xfer(KiB) open(s) ...
+    write  1234.5    1234.5 0.0001   32768      1024      0.0001  ...
+    Columns are located by their header, since versions before 3.2 do
+    not print IOPS or Latency.
+
+    :param text: IOR's stdout
+    :return: The same format as parse_json
+    """
+    results = {}
+    columns = None
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) == 0:
+            continue
+        if fields[0] == 'access':
+            columns = {TEXT_COLUMNS[field]: i
+                       for i, field in enumerate(fields)
+                       if field in TEXT_COLUMNS}
+            if 'bw' not in columns:
+                columns = None
+            continue
+        if fields[0] == 'Summary':
+            columns = None
+            continue
+        if columns is None or fields[0] not in ('write', 'read'):
+            continue
+        try:
+            values = {name: float(fields[i]) for name, i in columns.items()}
+        except (ValueError, IndexError):
+            continue
+        metrics = results.setdefault(fields[0],
+                                     {name: [] for name in METRICS})
+        for name, val in values.items():
+            metrics[name].append(val)
+    return results
+
+
+def summarize(results):
+    """
+    Reduce per-iteration values to their mean, min, and max
+
+    :param results: The output of parse_json or parse_text
+    :return: Dict mapping stat names (e.g., write_bw, write_bw_min) to
+    values
+    """
+    stats = {}
+    for op, metrics in results.items():
+        for name, vals in metrics.items():
+            if len(vals) == 0:
+                continue
+            stats[f'{op}_{name}'] = statistics.mean(vals)
+            stats[f'{op}_{name}_min'] = min(vals)
+            stats[f'{op}_{name}_max'] = max(vals)
+    return stats
+
+
+def _flatten(results):
+    # Results is a list (per iteration) of lists (per operation) of dicts
+    for entry in results:
+        if isinstance(entry, list):
+            yield from _flatten(entry)
+        elif isinstance(entry, dict):
+            yield entry
@@ -4,6 +4,7 @@ Ior is ....
 """
 from jarvis_cd.basic.pkg import Application
 from jarvis_util import *
+from .parse import parse_json, parse_text, summarize
 
 
 class Ior(Application):
@@ -14,7 +15,7 @@ class Ior(Application):
         """
         Initialize paths
         """
-        pass
+        self.ior_stats = None
 
     def _configure_menu(self):
         """
@@ -105,6 +106,7 @@ class Ior(Application):
         :return: None
         """
         self.config['api'] = self.config['api'].upper()
+        self.config['summary'] = f'{self.shared_dir}/ior_summary.json'
 
     def start(self):
         """
@@ -113,6 +115,7 @@ class Ior(Application):
 
         :return: None
         """
+        self.ior_stats = None
         cmd = [
             'ior',
             '-k',
@@ -129,6 +132,11 @@ class Ior(Application):
             cmd.append('-F')
         if self.config['reps'] > 1:
             cmd.append(f'-i {self.config["reps"]}')
+        summary = self.config.get('summary')
+        if summary is not None:
+            cmd += ['-O summaryFormat=JSON', f'-O summaryFile={summary}']
+            if os.path.exists(summary):
+                os.remove(summary)
         if '.' in os.path.basename(self.config['out']):
             os.makedirs(str(pathlib.Path(self.config['out']).parent),
                         exist_ok=True)
@@ -137,13 +145,36 @@ class Ior(Application):
         # pipe_stdout=self.config['log']
         Exec('which mpiexec',
              LocalExecInfo(env=self.mod_env))
-        Exec(' '.join(cmd),
-             MpiExecInfo(env=self.mod_env,
-                         hostfile=self.jarvis.hostfile,
-                         nprocs=self.config['nprocs'],
-                         ppn=self.config['ppn'],
-                         do_dbg=self.config['do_dbg'],
-                         dbg_port=self.config['dbg_port']))
+        node = Exec(' '.join(cmd),
+                    MpiExecInfo(env=self.mod_env,
+                                hostfile=self.jarvis.hostfile,
+                                nprocs=self.config['nprocs'],
+                                ppn=self.config['ppn'],
+                                do_dbg=self.config['do_dbg'],
+                                dbg_port=self.config['dbg_port'],
+                                collect_output=True))
+        self.ior_stats = self.parse_results(node)
+        for key, val in self.ior_stats.items():
+            self.log(f'{key}: {val}')
+
+    def parse_results(self, node):
+        """
+        Parse the results of an IOR run. The JSON summary is preferred,
+        and the results table in IOR's output is used otherwise.
+
+        :param node: The Exec of IOR
+        :return: Dict of stats
+        """
+        summary = self.config.get('summary')
+        if summary is not None and os.path.exists(summary):
+            with open(summary, 'r', encoding='utf-8') as fp:
+                text = fp.read()
+            try:
+                return summarize(parse_json(text))
+            except ValueError:
+                self.log(f'Could not parse the IOR summary {summary}',
+                         Color.YELLOW)
+        return summarize(parse_text(node.stdout.get('localhost', '')))
 
     def stop(self):
         """
@@ -154,6 +185,17 @@ class Ior(Application):
         """
         pass
 
+    def kill(self):
+        """
+        Forcibly terminate a running application, e.g., when it exceeds
+        its timeout.
+
+        :return: None
+        """
+        Kill('ior',
+             PsshExecInfo(env=self.env,
+                          hostfile=self.jarvis.hostfile))
+
     def clean(self):
         """
         Destroy all data for an application. E.g., OrangeFS will delete all
@@ -164,3 +206,15 @@ class Ior(Application):
         Rm(self.config['out'] + '*',
            PsshExecInfo(env=self.env,
                         hostfile=self.jarvis.hostfile))
+
+    def _get_stat(self, stat_dict):
+        """
+        Get statistics from the application.
+
+        :param stat_dict: A dictionary of statistics.
+        :return: None
+        """
+        if self.ior_stats is None:
+            return
+        for key, val in self.ior_stats.items():
+            stat_dict[f'{self.pkg_id}.{key}'] = val
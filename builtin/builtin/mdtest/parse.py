@@ -0,0 +1,55 @@
+"""
+This module parses the SUMMARY rate table which mdtest prints. mdtest
+3.x prints "SUMMARY rate:" and "SUMMARY time:" tables. mdtest 1.9 prints
+a single "SUMMARY:" table of rates.
+"""
+
+import re
+
+# mdtest's operation names and their stat names
+OPERATIONS = {
+    'Directory creation': 'dir_create',
+    'Directory stat': 'dir_stat',
+    'Directory rename': 'dir_rename',
+    'Directory removal': 'dir_remove',
+    'File creation': 'file_create',
+    'File stat': 'file_stat',
+    'File read': 'file_read',
+    'File removal': 'file_remove',
+    'Tree creation': 'tree_create',
+    'Tree removal': 'tree_remove',
+}
+
+NUM = r'([-+0-9.eE]+)'
+ROW_REGEX = re.compile(rf'^\s*([A-Za-z ]+?)\s*:?\s+{NUM}\s+{NUM}\s+{NUM}\s+{NUM}')
+
+
+def parse_rates(text):
+    """
+    Parse the rates (ops/sec) of every operation mdtest ran
+
+    :param text: mdtest's stdout
+    :return: Dict mapping stat names (e.g., file_create, file_create_min,
+    file_create_max) to rates. Operations which were skipped have a rate
+    of 0 and are omitted.
+    """
+    stats = {}
+    in_rates = False
+    for line in text.splitlines():
+        if line.startswith('SUMMARY'):
+            in_rates = 'time' not in line
+            continue
+        if not in_rates:
+            continue
+        match = ROW_REGEX.match(line)
+        if match is None or match.group(1) not in OPERATIONS:
+            continue
+        name = OPERATIONS[match.group(1)]
+        max_rate, min_rate, mean_rate = [float(match.group(i))
+                                         for i in range(2, 5)]
+        if max_rate == 0:
+            continue
+        stats[name] = mean_rate
+        stats[f'{name}_min'] = min_rate
+        stats[f'{name}_max'] = max_rate
+    return stats
@@ -0,0 +1,208 @@
+"""
+This module provides classes and methods to launch the Mdtest application.
+Mdtest measures the metadata performance of a file system.
+"""
+from jarvis_cd.basic.pkg import Application
+from jarvis_util import *
+from .parse import parse_rates
+
+
+class Mdtest(Application):
+    """
+    This class provides methods to launch the Mdtest application.
+    """
+    def _init(self):
+        """
+        Initialize paths
+        """
+        self.mdtest_stats = None
+
+    def _configure_menu(self):
+        """
+        Create a CLI menu for the configurator method.
+        For thorough documentation of these parameters, view:
+        https://github.com/scs-lab/jarvis-util/wiki/3.-Argument-Parsing
+
+        :return: List(dict)
+        """
+        return [
+            {
+                'name': 'items',
+                'msg': 'The number of files/directories each rank creates',
+                'type': int,
+                'default': 1000,
+            },
+            {
+                'name': 'depth',
+                'msg': 'The depth of the directory tree',
+                'type': int,
+                'default': 0,
+            },
+            {
+                'name': 'branch',
+                'msg': 'The branching factor of the directory tree',
+                'type': int,
+                'default': 1,
+            },
+            {
+                'name': 'unique_dir',
+                'msg': 'Give each rank its own directory instead of sharing '
+                       'one directory',
+                'type': bool,
+                'default': False,
+            },
+            {
+                'name': 'files_only',
+                'msg': 'Only test files',
+                'type': bool,
+                'default': False,
+            },
+            {
+                'name': 'dirs_only',
+                'msg': 'Only test directories',
+                'type': bool,
+                'default': False,
+            },
+            {
+                'name': 'write',
+                'msg': 'Bytes to write to each file after creating it',
+                'type': str,
+                'default': None,
+            },
+            {
+                'name': 'read',
+                'msg': 'Bytes to read from each file',
+                'type': str,
+                'default': None,
+            },
+            {
+                'name': 'api',
+                'msg': 'The I/O api to use',
+                'type': str,
+                'choices': ['posix', 'mpiio', 'hdf5'],
+                'default': 'posix',
+            },
+            {
+                'name': 'reps',
+                'msg': 'Number of times to repeat',
+                'type': int,
+                'default': 1,
+            },
+            {
+                'name': 'nprocs',
+                'msg': 'Number of processes',
+                'type': int,
+                'default': 1,
+            },
+            {
+                'name': 'ppn',
+                'msg': 'The number of processes per node',
+                'type': int,
+                'default': 16,
+            },
+            {
+                'name': 'out',
+                'msg': 'The directory to test in',
+                'type': str,
+                'default': '/tmp/mdtest',
+            },
+        ]
+
+    def _configure(self, **kwargs):
+        """
+        Converts the Jarvis configuration to application-specific configuration.
+        E.g., OrangeFS produces an orangefs.xml file.
+
+        :param kwargs: Configuration parameters for this pkg.
+        :return: None
+        """
+        self.config['api'] = self.config['api'].upper()
+        if self.config['files_only'] and self.config['dirs_only']:
+            raise Exception('files_only and dirs_only are exclusive')
+
+    def start(self):
+        """
+        Launch an application. E.g., OrangeFS will launch the servers, clients,
+        and metadata services on all necessary pkgs.
+
+        :return: None
+        """
+        self.mdtest_stats = None
+        cmd = [
+            'mdtest',
+            f'-n {self.config["items"]}',
+            f'-z {self.config["depth"]}',
+            f'-b {self.config["branch"]}',
+            f'-a {self.config["api"]}',
+            f'-d {self.config["out"]}',
+        ]
+        if self.config['unique_dir']:
+            cmd.append('-u')
+        if self.config['files_only']:
+            cmd.append('-F')
+        if self.config['dirs_only']:
+            cmd.append('-D')
+        if self.config['write'] is not None:
+            cmd.append(f'-w {SizeConv.to_int(self.config["write"])}')
+        if self.config['read'] is not None:
+            cmd.append(f'-e {SizeConv.to_int(self.config["read"])}')
+        if self.config['reps'] > 1:
+            cmd.append(f'-i {self.config["reps"]}')
+        os.makedirs(self.config['out'], exist_ok=True)
+        node = Exec(' '.join(cmd),
+                    MpiExecInfo(env=self.mod_env,
+                                hostfile=self.jarvis.hostfile,
+                                nprocs=self.config['nprocs'],
+                                ppn=self.config['ppn'],
+                                do_dbg=self.config['do_dbg'],
+                                dbg_port=self.config['dbg_port'],
+                                collect_output=True))
+        self.mdtest_stats = parse_rates(node.stdout.get('localhost', ''))
+        if len(self.mdtest_stats) == 0:
+            self.log('Could not find the SUMMARY rate table in the output '
+                     'of mdtest', Color.RED)
+        for key, val in self.mdtest_stats.items():
+            self.log(f'{key}: {val} ops/sec')
+
+    def stop(self):
+        """
+        Stop a running application. E.g., OrangeFS will terminate the servers,
+        clients, and metadata services.
+
+        :return: None
+        """
+        pass
+
+    def kill(self):
+        """
+        Forcibly terminate a running application, e.g., when it exceeds
+        its timeout.
+
+        :return: None
+        """
+        Kill('mdtest',
+             PsshExecInfo(env=self.env,
+                          hostfile=self.jarvis.hostfile))
+
+    def clean(self):
+        """
+        Destroy all data for an application. E.g., OrangeFS will delete all
+        metadata and data directories in addition to the orangefs.xml file.
+
+        :return: None
+        """
+        Rm(self.config['out'],
+           PsshExecInfo(env=self.env,
+                        hostfile=self.jarvis.hostfile))
+
+    def _get_stat(self, stat_dict):
+        """
+        Get statistics from the application.
+
+        :param stat_dict: A dictionary of statistics.
+        :return: None
+        """
+        if self.mdtest_stats is None:
+            return
+        for key, val in self.mdtest_stats.items():
+            stat_dict[f'{self.pkg_id}.{key}'] = val
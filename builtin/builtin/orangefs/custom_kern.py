@@ -5,24 +5,15 @@ class OrangefsCustomKern:
     def custom_start(self):
         # start pfs servers
         print("Starting the PFS servers")
-        for host in self.server_hosts.list():
-            host_ip = host.hosts[0]
-            server_start_cmds = [
-                # f'pvfs2-server -f -a {host_ip}  {self.config["pfs_conf"]}',
-                f'pvfs2-server -a {host_ip} {self.config["pfs_conf"]}'
-            ]
-            print(server_start_cmds)
-            print(f"PVFS2TAB: {self.env['PVFS2TAB_FILE']}")
-            Exec(server_start_cmds,
-                 SshExecInfo(hostfile=host,
-                             env=self.env))
+        print(f"PVFS2TAB: {self.env['PVFS2TAB_FILE']}")
+        self.exec_per_host(self.server_cmds('pvfs2-server'))
         self.status()
 
         # insert OFS kernel module
         print("Inserting OrangeFS kernel module")
         Exec('modprobe orangefs', PsshExecInfo(sudo=True,
                                                sudoenv=self.config['sudoenv'],
-                                               hosts=self.client_hosts,
+                                               hostfile=self.client_hosts,
                                                env=self.env))
 
         # PFS client thing
@@ -51,7 +42,7 @@ class OrangefsCustomKern:
 
     def custom_stop(self):
         Exec(f'umount -t pvfs2 {self.config["mount"]}',
-             PsshExecInfo(hosts=self.client_hosts,
+             PsshExecInfo(hostfile=self.client_hosts,
                           env=self.env,
                           sudo=True,
                           sudoenv=self.config['sudoenv']))
@@ -59,11 +50,11 @@ class OrangefsCustomKern:
             f'killall -9 pvfs2-client',
             f'killall -9 pvfs2-client-core'
         ]
-        Exec(cmds, PsshExecInfo(hosts=self.client_hosts,
+        Exec(cmds, PsshExecInfo(hostfile=self.client_hosts,
                                 env=self.env))
         Exec('killall -9 pvfs2-server',
-             PsshExecInfo(hosts=self.server_hosts,
+             PsshExecInfo(hostfile=self.server_hosts,
                           env=self.env))
         Exec('pgrep -la pvfs2-server',
-             PsshExecInfo(hosts=self.client_hosts,
+             PsshExecInfo(hostfile=self.client_hosts,
                           env=self.env))
@@ -0,0 +1,130 @@
+"""
+This module plans the layout of an OrangeFS deployment: which hosts run
+IO servers, metadata servers, and clients, which storage device each
+server uses, and the stripe size.
+"""
+
+import math
+import re
+
+# Typical sequential bandwidth (bytes/s) of devices without measurements
+DEV_BW = {
+    'dimm': 10 * (1 << 30),
+    'nvme': 2 * (1 << 30),
+    'ssd': 500 * (1 << 20),
+    'hdd': 120 * (1 << 20),
+}
+
+# Resource graph columns which hold a measured bandwidth, in preference order
+BW_KEYS = ['bandwidth', 'write_bw', 'seq_write_bw', 'read_bw']
+
+SIZE_REGEX = re.compile(r'^([0-9.]+)\s*([kmgt]?)i?b?(ps|/s)?$', re.IGNORECASE)
+SIZE_UNITS = {'': 1, 'k': 1 << 10, 'm': 1 << 20, 'g': 1 << 30, 't': 1 << 40}
+
+
+def parse_size(val):
+    """
+    Convert a size or bandwidth (e.g., 1m, 500MBps, 4096) to bytes
+
+    :param val: An int, float, or str
+    :return: int, or None if val is None or cannot be parsed
+    """
+    if val is None:
+        return None
+    if isinstance(val, (int, float)):
+        return int(val)
+    match = SIZE_REGEX.match(str(val).strip())
+    if match is None:
+        return None
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).lower()])
+
+
+def select_hosts(hosts, spec, from_end=False):
+    """
+    Select a subset of hosts
+
+    :param hosts: The list of hosts to select from
+    :param spec: None for every host, a count (>= 1), or a fraction (< 1)
+    :param from_end: Select from the end of the list instead of the start.
+    Clients are taken from the end so that they overlap the servers as
+    little as possible.
+    :return: List of hosts
+    """
+    hosts = list(hosts)
+    if spec is None:
+        return hosts
+    spec = float(spec)
+    if spec <= 0:
+        raise Exception(f'Host counts must be positive, not {spec}')
+    if spec < 1:
+        count = math.ceil(spec * len(hosts))
+    else:
+        count = int(spec)
+    if count > len(hosts):
+        raise Exception(f'Requested {count} hosts, but only {len(hosts)} '
+                        f'are available')
+    if from_end:
+        return hosts[len(hosts) - count:]
+    return hosts[:count]
+
+
+def device_bandwidth(dev):
+    """
+    The bandwidth of a storage device, measured if the resource graph has
+    it and typical for its type otherwise
+
+    :param dev: A resource graph storage row
+    :return: Bytes per second
+    """
+    for key in BW_KEYS:
+        bw = parse_size(dev.get(key))
+        if bw:
+            return bw
+    return DEV_BW.get(dev.get('dev_type'), 0)
+
+
+def pick_devices(devs, hosts):
+    """
+    Choose the fastest storage device of each host. Rows whose host is
+    localhost (or unset) describe every host which has no rows of its own.
+
+    :param devs: The resource graph storage rows
+    :param hosts: The list of hosts
+    :return: Dict mapping each host to its device row
+    """
+    generic = [dev for dev in devs
+               if dev.get('host') in (None, 'localhost')]
+    choice = {}
+    for host in hosts:
+        host_devs = [dev for dev in devs if dev.get('host') == host]
+        if len(host_devs) == 0:
+            host_devs = generic
+        if len(host_devs) == 0:
+            raise Exception(f'Could not find any storage devices on {host}')
+        choice[host] = max(host_devs, key=device_bandwidth)
+    return choice
+
+
+def recommend_stripe_size(num_servers, num_clients, xfer_size,
+                          min_size=64 * 1024, max_size=4 * (1 << 20)):
+    """
+    Recommend a stripe size. With at least as many clients as servers,
+    each transfer goes to a single server and the clients spread the load.
+    With fewer clients, each transfer is split so that the concurrent
+    transfers cover every server.
+
+    :param num_servers: The number of IO servers
+    :param num_clients: The number of client hosts
+    :param xfer_size: The expected transfer size in bytes
+    :param min_size: The smallest stripe size recommended
+    :param max_size: The largest stripe size recommended
+    :return: The stripe size in bytes (a power of two)
+    """
+    num_servers = max(num_servers, 1)
+    num_clients = max(num_clients, 1)
+    if num_clients >= num_servers:
+        size = xfer_size
+    else:
+        size = xfer_size * num_clients / num_servers
+    size = max(min(size, max_size), min_size)
+    return 1 << int(math.log2(size))
@@ -2,11 +2,14 @@ from jarvis_cd.basic.pkg import Service
 from jarvis_util import *
 from .custom_kern import OrangefsCustomKern
 from .ares import OrangefsAres
+from .fuse import OrangefsFuse
+from .layout import select_hosts, pick_devices, recommend_stripe_size, \
+    parse_size
 import os
 import time
 
 
-class Orangefs(Service, OrangefsCustomKern, OrangefsAres):
+class Orangefs(Service, OrangefsCustomKern, OrangefsAres, OrangefsFuse):
     def _init(self):
         """
         Initialize paths
@@ -22,15 +25,44 @@ class Orangefs(Service, OrangefsCustomKern, OrangefsAres):
             },
             {
                 'name': 'dev_type',
-                'msg': 'The device to spawn orangefs over',
+                'msg': 'The device type to spawn orangefs over. By default, '
+                       'the fastest device of each server.',
                 'type': str,
                 'default': None,
             },
             {
                 'name': 'stripe_size',
-                'msg': 'The stripe size',
+                'msg': 'The stripe size. By default, recommended from '
+                       'xfer_size and the number of clients and servers.',
                 'type': int,
-                'default': 65536,
+                'default': None,
+            },
+            {
+                'name': 'xfer_size',
+                'msg': 'The expected transfer size of the workload (e.g., 1m)',
+                'type': str,
+                'default': None,
+            },
+            {
+                'name': 'server_hosts',
+                'msg': 'The number (>= 1) or fraction (< 1) of hosts which '
+                       'run IO servers, taken from the start of the hostfile',
+                'type': float,
+                'default': None,
+            },
+            {
+                'name': 'md_hosts',
+                'msg': 'The number (>= 1) or fraction (< 1) of IO servers '
+                       'which also run metadata servers',
+                'type': float,
+                'default': None,
+            },
+            {
+                'name': 'client_hosts',
+                'msg': 'The number (>= 1) or fraction (< 1) of hosts which '
+                       'mount clients, taken from the end of the hostfile',
+                'type': float,
+                'default': None,
             },
             {
                 'name': 'stripe_dist',
@@ -63,6 +95,14 @@ class Orangefs(Service, OrangefsCustomKern, OrangefsAres):
                 'type': bool,
                 'default': True,
             },
+            {
+                'name': 'mode',
+                'msg': 'How clients mount orangefs: the kernel module '
+                       '(kern) or userspace pvfs2fuse (fuse)',
+                'type': str,
+                'default': 'kern',
+                'choices': ['kern', 'fuse'],
+            },
             {
                 'name': 'ares',
                 'msg': 'Whether we are using the orangefs on Ares',
@@ -84,9 +124,13 @@ class Orangefs(Service, OrangefsCustomKern, OrangefsAres):
             self.config['sudoenv'] = False
 
         # Configure and save hosts
-        self.client_hosts = self.jarvis.hostfile
-        self.server_hosts = self.jarvis.hostfile
-        self.md_hosts = self.jarvis.hostfile
+        hosts = self.jarvis.hostfile.hosts
+        server_hosts = select_hosts(hosts, self.config['server_hosts'])
+        self.server_hosts = Hostfile(all_hosts=server_hosts)
+        self.md_hosts = Hostfile(all_hosts=select_hosts(
+            server_hosts, self.config['md_hosts']))
+        self.client_hosts = Hostfile(all_hosts=select_hosts(
+            hosts, self.config['client_hosts'], from_end=True))
         self.config['client_host_set'] = self.client_hosts.hosts
         self.config['server_host_set'] = self.server_hosts.hosts
         self.config['md_host_set'] = self.md_hosts.hosts
@@ -96,37 +140,61 @@ class Orangefs(Service, OrangefsCustomKern, OrangefsAres):
         self.client_hosts.save(self.config['client_hosts_path'])
         self.server_hosts.save(self.config['server_hosts_path'])
         self.md_hosts.save(self.config['metadata_hosts_path'])
-        Pscp([self.config['client_hosts_path'],
-              self.config['server_hosts_path'],
-              self.config['metadata_hosts_path']],
-             PsshExecInfo(hosts=self.jarvis.hostfile, env=self.env))
 
-        # Locate storage hardware
-        dev_df = []
+        # Locate the fastest storage hardware of each server
         if self.config['dev_type'] is None:
             dev_types = ['hdd', 'ssd', 'nvme', 'dimm']
-            for dev_type in dev_types:
-                dev_df = rg.find_storage(dev_types=[dev_type],
-                                         shared=False)
-                if len(dev_df) != 0:
-                    break
         else:
-            dev_df = rg.find_storage(dev_types=[self.config['dev_type']],
-                                     shared=False)
+            dev_types = [self.config['dev_type']]
+        dev_df = rg.find_storage(dev_types=dev_types, shared=False)
         if len(dev_df) == 0:
             raise Exception('Could not find any storage devices :(')
-        storage_dir = os.path.expandvars(dev_df.rows[0]['mount'])
+        devs = pick_devices(dev_df.rows, self.server_hosts.hosts)
+        server_dirs = {host: os.path.expandvars(dev['mount'])
+                       for host, dev in devs.items()}
+        for host, dev in devs.items():
+            self.log(f'{host}: storing on {dev["dev_type"]} '
+                     f'{server_dirs[host]}')
 
         # Define paths
         self.config['pfs_conf'] = f'{self.private_dir}/orangefs.xml'
         self.config['pvfs2tab'] = f'{self.private_dir}/pvfs2tab'
         if self.config['mount'] is None:
             self.config['mount'] = f'{self.private_dir}/client'
-        self.config['storage'] = f'{storage_dir}/orangefs_storage'
-        self.config['metadata'] = f'{storage_dir}/orangefs_metadata'
+        if len(set(server_dirs.values())) == 1:
+            storage_dir = list(server_dirs.values())[0]
+            self.config['storage'] = f'{storage_dir}/orangefs_storage'
+            self.config['metadata'] = f'{storage_dir}/orangefs_metadata'
+            self.config['storage_links'] = False
+        else:
+            # pvfs2-genconfig takes one storage path for every server, so
+            # it is a link to the device each server chose
+            self.config['storage'] = f'{self.private_dir}/orangefs_storage'
+            self.config['metadata'] = f'{self.private_dir}/orangefs_metadata'
+            self.config['storage_links'] = True
+            self.exec_per_host({
+                host: ' && '.join([
+                    f'mkdir -p {path}/orangefs_storage '
+                    f'{path}/orangefs_metadata',
+                    f'ln -sfn {path}/orangefs_storage '
+                    f'{self.config["storage"]}',
+                    f'ln -sfn {path}/orangefs_metadata '
+                    f'{self.config["metadata"]}'])
+                for host, path in server_dirs.items()})
         self.config['log'] = f'{self.private_dir}/orangefs_server.log'
         self.config['client_log'] = f'{self.private_dir}/orangefs_client.log'
 
+        # Choose the stripe size
+        stripe_size = self.config['stripe_size']
+        xfer_size = parse_size(self.config['xfer_size'])
+        if stripe_size is None and xfer_size is not None:
+            stripe_size = recommend_stripe_size(len(self.server_hosts),
+                                                len(self.client_hosts),
+                                                xfer_size)
+            self.log(f'Recommended stripe size: {stripe_size}')
+        elif stripe_size is None:
+            stripe_size = 65536
+
         # generate PFS Gen config
         if self.config['protocol'] == 'tcp':
             proto_cmd = f'--tcpport {self.config["port"]}'
@@ -140,7 +208,7 @@ class Orangefs(Service, OrangefsCustomKern, OrangefsAres):
             f'--protocol {self.config["protocol"]}',
             proto_cmd,
             f'--dist-name {self.config["stripe_dist"]}',
-            f'--dist-params \"strip_size: {self.config["stripe_size"]}\"',
+            f'--dist-params \"strip_size: {stripe_size}\"',
             f'--ioservers {self.server_hosts.host_str(sep=",")}',
             f'--metaservers {self.md_hosts.host_str(sep=",")}',
             f'--storage {self.config["storage"]}',
@@ -151,16 +219,6 @@ class Orangefs(Service, OrangefsCustomKern, OrangefsAres):
         ]
         pvfs_gen_cmd = " ".join(pvfs_gen_cmd)
         Exec(pvfs_gen_cmd, LocalExecInfo(env=self.env))
-        Pscp(self.config['pfs_conf'],
-             PsshExecInfo(hosts=self.jarvis.hostfile, env=self.env))
-
-        # Create storage directories
-        Mkdir(self.config['mount'], PsshExecInfo(hosts=self.client_hosts,
-                                                 env=self.env))
-        Mkdir(self.config['storage'], PsshExecInfo(hosts=self.server_hosts,
-                                                   env=self.env))
-        Mkdir(self.config['metadata'], PsshExecInfo(hosts=self.md_hosts,
-                                                    env=self.env))
 
         # Set pvfstab on clients
         mdm_ip = self.md_hosts.list()[0].hosts[0]
@@ -173,21 +231,36 @@ class Orangefs(Service, OrangefsCustomKern, OrangefsAres):
                     name=self.config['name'],
                     mount_point=self.config['mount'],
                     client_pvfs2tab=self.config['pvfs2tab']))
-        Pscp(self.config['pvfs2tab'],
-             PsshExecInfo(hosts=self.jarvis.hostfile,
-                          env=self.env))
         self.env['PVFS2TAB_FILE'] = self.config['pvfs2tab']
 
-        for host in self.server_hosts.list():
-            host_ip = host.hosts[0]
-            server_start_cmds = [
-                f'pvfs2-server -f -a {host_ip}  {self.config["pfs_conf"]}'
-            ]
-            print(server_start_cmds)
-            print(f"PVFS2TAB: {self.env['PVFS2TAB_FILE']}")
-            Exec(server_start_cmds,
-                 SshExecInfo(hostfile=host,
-                             env=self.env))
+        # Distribute configs and create storage directories in one round trip
+        with self.remote_batch():
+            self.broadcast([self.config['client_hosts_path'],
+                            self.config['server_hosts_path'],
+                            self.config['metadata_hosts_path'],
+                            self.config['pfs_conf'],
+                            self.config['pvfs2tab']])
+            self.mkdir(self.config['mount'], self.client_hosts)
+            self.mkdir(self.config['storage'], self.server_hosts)
+            self.mkdir(self.config['metadata'], self.md_hosts)
+
+        # Format the storage of every server concurrently
+        print(f"PVFS2TAB: {self.env['PVFS2TAB_FILE']}")
+        self.exec_per_host(self.server_cmds('pvfs2-server -f'))
+
+    def server_cmds(self, cmd):
+        """
+        Build the pvfs2-server command of every server. Each server is
+        given its own alias.
+
+        :param cmd: The pvfs2-server command without the alias or config
+        :return: Dict mapping each server host to its command
+        """
+        cmds = {host: f'{cmd} -a {host} {self.config["pfs_conf"]}'
+                for host in self.server_hosts.hosts}
+        for host_cmd in cmds.values():
+            print(host_cmd)
+        return cmds
 
     def _load_config(self):
         if 'sudoenv' not in self.config:
@@ -200,37 +273,43 @@ class Orangefs(Service, OrangefsCustomKern, OrangefsAres):
     def start(self):
         self._load_config()
         # start pfs servers
-        self.custom_start()
+        if self.config.get('mode') == 'fuse':
+            self.fuse_start()
+        else:
+            self.custom_start()
 
     def stop(self):
         self._load_config()
         if self.config['ares']:
             self.ares_stop()
+        elif self.config.get('mode') == 'fuse':
+            self.fuse_stop()
         else:
             self.custom_stop()
 
     def clean(self):
         self._load_config()
-
-        Rm([self.config['mount'], self.config['client_log']],
-           PsshExecInfo(hosts=self.client_hosts,
-                        env=self.env))
-        Rm([self.config['storage'], self.config['log']],
-           PsshExecInfo(hosts=self.server_hosts,
-                        env=self.env))
-        Rm(self.config['metadata'],
-           PsshExecInfo(hosts=self.md_hosts,
-                        env=self.env))
+        with self.remote_batch():
+            self.rm([self.config['mount'], self.config['client_log']],
+                    self.client_hosts)
+            if self.config.get('storage_links'):
+                for path in [self.config['storage'], self.config['metadata']]:
+                    self.remote_exec(f'rm -rf "$(readlink -f {path})" {path}',
+                                     self.server_hosts)
+            else:
+                self.rm(self.config['storage'], self.server_hosts)
+                self.rm(self.config['metadata'], self.md_hosts)
+            self.rm(self.config['log'], self.server_hosts)
 
     def status(self):
         self._load_config()
         Exec('mount | grep pvfs',
-             PsshExecInfo(hosts=self.server_hosts,
+             PsshExecInfo(hostfile=self.server_hosts,
                           env=self.env))
         verify_server_cmd = [
             f'pvfs2-ping -m {self.config["mount"]} | grep \"appears to be correctly configured\"'
         ]
         Exec(verify_server_cmd,
-             PsshExecInfo(hosts=self.client_hosts,
+             PsshExecInfo(hostfile=self.client_hosts,
                           env=self.env))
         return True
@@ -14,7 +14,7 @@ class Pymonitor(Service):
         """
         Initialize paths
         """
-        pass
+        self.prior_logs = {}
 
     def _configure_menu(self):
         """
@@ -68,6 +68,8 @@ class Pymonitor(Service):
         :return: None
         """
         self.log(f'Pymonitor started on {self.config["dir"]}')
+        # Logs left by an earlier run do not make this one ready
+        self.prior_logs = self.log_mtimes()
         self.env['PYTHONBUFFERED'] = '0'
         hostfile = self.jarvis.hostfile
         if self.config['num_nodes'] > 0:
@@ -77,7 +79,34 @@ class Pymonitor(Service):
                 PsshExecInfo(env=self.env,
                             hostfile=hostfile,
                             exec_async=True))
-        time.sleep(self.config['sleep'])
+
+    def ready(self):
+        """
+        The monitor is ready once it has written its first sample, i.e.,
+        a log was created or modified since start.
+
+        :return: True or false
+        """
+        prior_logs = getattr(self, 'prior_logs', {})
+        return any(prior_logs.get(name) != mtime
+                   for name, mtime in self.log_mtimes().items())
+
+    def log_mtimes(self):
+        """
+        The modification time of every log in the monitor dir
+
+        :return: Dict mapping log names to mtimes
+        """
+        log_dir = self.config['dir']
+        if not os.path.exists(log_dir):
+            return {}
+        mtimes = {}
+        for name in os.listdir(log_dir):
+            try:
+                mtimes[name] = os.path.getmtime(os.path.join(log_dir, name))
+            except FileNotFoundError:
+                continue
+        return mtimes
 
     def stop(self):
         """
@@ -0,0 +1,65 @@
+"""
+This module parses the --csv output of redis-benchmark and combines the
+results of concurrent clients.
+"""
+
+import csv
+
+
+def parse_csv(text):
+    """
+    Parse the --csv output of redis-benchmark. Redis 7 prints a header and
+    latency percentiles, older versions print only the test and its rps.
+
+    :param text: The output of redis-benchmark --csv
+    :return: Dict mapping each test (e.g., SET) to a dict with rps and,
+    when available, avg_latency_ms, p50_latency_ms, p99_latency_ms
+    """
+    results = {}
+    header = None
+    for row in csv.reader(text.splitlines()):
+        if len(row) < 2:
+            continue
+        if row[0] == 'test':
+            header = row
+            continue
+        fields = dict(zip(header or ['test', 'rps'], row))
+        try:
+            results[fields['test']] = {
+                key: float(val) for key, val in fields.items()
+                if key != 'test'}
+        except ValueError:
+            continue
+    return results
+
+
+def aggregate(client_results):
+    """
+    Combine the results of concurrent clients. Throughput is summed.
+    Average and median latency are weighted by each client's throughput,
+    and the p99 latency is the worst client's.
+
+    :param client_results: A list of parse_csv outputs
+    :return: Dict mapping stat names (e.g., set_rps, set_p99_ms) to values
+    """
+    stats = {}
+    tests = {}
+    for results in client_results:
+        for test, fields in results.items():
+            tests.setdefault(test, []).append(fields)
+    for test, rows in tests.items():
+        name = test.split()[0].lower()
+        rps = sum(row['rps'] for row in rows)
+        stats[f'{name}_rps'] = rps
+        for key, stat in [('avg_latency_ms', 'avg_ms'),
+                          ('p50_latency_ms', 'p50_ms')]:
+            weighted = [(row[key], row['rps']) for row in rows if key in row]
+            weight = sum(weight for _, weight in weighted)
+            if weight:
+                stats[f'{name}_{stat}'] = sum(
+                    lat * weight for lat, weight in weighted) / weight
+        p99 = [row['p99_latency_ms'] for row in rows
+               if 'p99_latency_ms' in row]
+        if len(p99):
+            stats[f'{name}_p99_ms'] = max(p99)
+    return stats
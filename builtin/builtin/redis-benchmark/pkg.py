@@ -3,7 +3,10 @@ This module provides classes and methods to launch the Redis benchmark tool.
 Redis cluster is used if the hostfile has many hosts
 """
 from jarvis_cd.basic.pkg import Application
+from jarvis_cd.basic.host_exec import host_output
+from jarvis_cd.basic.redis_cluster import RedisCluster, parse_node
 from jarvis_util import *
+from .parse import parse_csv, aggregate
 
 
 class RedisBenchmark(Application):
@@ -14,7 +17,7 @@ class RedisBenchmark(Application):
         """
         Initialize paths
         """
-        pass
+        self.bench_stats = None
 
     def _configure_menu(self):
         """
@@ -89,6 +92,15 @@ class RedisBenchmark(Application):
                 'choices': [],
                 'args': [],
             },
+            {
+                'name': 'clients',
+                'msg': 'The number of hosts to run benchmark clients on, '
+                       'taken from the end of the hostfile. Client i '
+                       'targets cluster node (node + i). With 1, a single '
+                       'client runs on this host.',
+                'type': int,
+                'default': 1,
+            },
         ]
 
     def _configure(self, **kwargs):
@@ -108,7 +120,7 @@ class RedisBenchmark(Application):
 
         :return: None
         """
-
+        self.bench_stats = None
         hostfile = self.jarvis.hostfile
         bench_type = [
             'set' if self.config['write'] else '',
@@ -122,19 +134,43 @@ class RedisBenchmark(Application):
             f'-P {self.config["pipeline"]}',
             f'--threads {self.config["nthreads"]}',
             f'-d {self.config["req_size"]}',
-            f'-p {self.config["port"]}',
         ]
-        if len(hostfile) > 1:
-            cmd += [
-                f'-h {hostfile.hosts[self.config["node"]]}',
-                f'--cluster'
-            ]
+        cmd.append('--csv')
+        nodes = self.nodes()
         self.log('Starting the cluster', color=Color.YELLOW)
-        Exec(' '.join(cmd),
-             LocalExecInfo(env=self.mod_env,
-                           hostfile=hostfile,
-                           do_dbg=self.config['do_dbg'],
-                           dbg_port=self.config['dbg_port']))
+        clients = self.config.get('clients', 1)
+        if clients <= 1:
+            target, port = nodes[self.config['node']]
+            cmd += [f'-h {target}', f'-p {port}']
+            if len(nodes) > 1:
+                cmd.append('--cluster')
+            node = Exec(' '.join(cmd),
+                        LocalExecInfo(env=self.mod_env,
+                                      hostfile=hostfile,
+                                      do_dbg=self.config['do_dbg'],
+                                      dbg_port=self.config['dbg_port'],
+                                      collect_output=True))
+            outputs = [node.stdout.get('localhost', '')]
+        else:
+            if clients > len(hostfile):
+                raise Exception(f'Requested {clients} clients, but the '
+                                f'hostfile only has {len(hostfile)} hosts')
+            client_cmds = {}
+            for i, entry in enumerate(hostfile.hosts[-clients:]):
+                host, _ = parse_node(entry, self.config['port'])
+                target, port = nodes[(self.config['node'] + i) % len(nodes)]
+                client_cmds[host] = ' '.join(cmd + [f'-h {target}',
+                                                    f'-p {port}',
+                                                    '--cluster'])
+            execs = self.exec_per_host(client_cmds,
+                                       env=self.mod_env,
+                                       collect_output=True)
+            outputs = [host_output(node, host)
+                       for host, node in execs.items()]
+        self.bench_stats = aggregate([parse_csv(output)
+                                      for output in outputs])
+        for key, val in self.bench_stats.items():
+            self.log(f'{key}: {val}')
 
     def stop(self):
         """
@@ -152,15 +188,35 @@ class RedisBenchmark(Application):
 
         :return: None
         """
-        hostfile = self.jarvis.hostfile
-        for host in range(hostfile.hosts):
-            Exec(f'redis-cli -p {self.config["port"]} -h {host} flushall',
-                 LocalExecInfo(env=self.mod_env,
-                               hostfile=hostfile,
-                               do_dbg=self.config['do_dbg'],
-                               dbg_port=self.config['dbg_port']))
-            Exec(f'redis-cli -p {self.config["port"]} -h {host} cluster reset',
-                 LocalExecInfo(env=self.mod_env,
-                               hostfile=hostfile,
-                               do_dbg=self.config['do_dbg'],
-                               dbg_port=self.config['dbg_port']))
+        nodes = self.nodes()
+        cluster = RedisCluster(nodes)
+        try:
+            if len(nodes) > 1:
+                cluster.reset()
+            else:
+                cluster.command_all('FLUSHALL')
+        except Exception as err:
+            # E.g., the redis servers were already stopped
+            self.log(f'Could not reset redis: {err}', Color.YELLOW)
+
+    def nodes(self):
+        """
+        The (host, port) of every redis server. Hostfile entries may name
+        a port (host:port), otherwise the port option is used.
+
+        :return: List of (host, port)
+        """
+        return [parse_node(entry, self.config['port'])
+                for entry in self.jarvis.hostfile.hosts]
+
+    def _get_stat(self, stat_dict):
+        """
+        Get statistics from the application.
+
+        :param stat_dict: A dictionary of statistics.
+        :return: None
+        """
+        if self.bench_stats is None:
+            return
+        for key, val in self.bench_stats.items():
+            stat_dict[f'{self.pkg_id}.{key}'] = val
@@ -3,6 +3,8 @@ This module provides classes and methods to launch Redis.
 Redis cluster is used if the hostfile has many hosts
 """
 from jarvis_cd.basic.pkg import Application
+from jarvis_cd.basic.readiness import PortProbe, HookProbe
+from jarvis_cd.basic.redis_cluster import RedisCluster, parse_node
 from jarvis_util import *
 
 
@@ -14,7 +16,7 @@ class Redis(Application):
         """
         Initialize paths
         """
-        pass
+        self.cluster = None
 
     def _configure_menu(self):
         """
@@ -49,6 +51,7 @@ class Redis(Application):
                                 {
                                     'PORT': self.config['port']
                                 })
+        self.broadcast(f'{self.shared_dir}/redis.conf', self.server_hosts())
 
     def start(self):
         """
@@ -58,63 +61,115 @@ class Redis(Application):
         :return: None
         """
         hostfile = self.jarvis.hostfile
-        host_str = [f'{host}:{self.config["port"]}' for host in hostfile.hosts]
-        host_str = ' '.join(host_str)
-        cluster_config_file = f'{self.private_dir}/nodes.conf'
+        nodes = self.nodes()
+        self.cluster = None
         # Create redis servers
         self.log('Starting individual servers', color=Color.YELLOW)
         cmd = [
             'redis-server',
             f'{self.shared_dir}/redis.conf',
         ]
-        if len(hostfile) > 1:
-            cmd += [
-                f'--cluster-enabled yes',
-                f'--cluster-config-file {cluster_config_file}',
-                f'--cluster-node-timeout 5000',
-            ]
-
-        cmd = ' '.join(cmd)
-        Exec(cmd,
-             PsshExecInfo(env=self.mod_env,
-                          hostfile=hostfile,
-                          do_dbg=self.config['do_dbg'],
-                          dbg_port=self.config['dbg_port'],
-                          exec_async=True))
-        self.log(f'Sleeping for {self.config["sleep"]} seconds', color=Color.YELLOW)
-        time.sleep(self.config['sleep'])
-
-        # Create redis clients
-        if len(hostfile) > 1:
+        if self.explicit_ports():
+            # Hostfile entries name ports (host:port), possibly several
+            # per host, so each host starts its own set of servers
+            host_cmds = {}
+            for host, port in nodes:
+                node_cmd = cmd + [f'--port {port}']
+                if len(nodes) > 1:
+                    node_cmd += self.cluster_args(
+                        f'{self.private_dir}/nodes-{port}.conf')
+                host_cmds.setdefault(host, []).append(' '.join(node_cmd))
+            self.exec_per_host(
+                {host: ' & '.join(host_cmd) + ' & wait'
+                 for host, host_cmd in host_cmds.items()},
+                env=self.mod_env, exec_async=True)
+        else:
+            if len(nodes) > 1:
+                cmd += self.cluster_args(f'{self.private_dir}/nodes.conf')
+            cmd = ' '.join(cmd)
+            Exec(cmd,
+                 PsshExecInfo(env=self.mod_env,
+                              hostfile=hostfile,
+                              do_dbg=self.config['do_dbg'],
+                              dbg_port=self.config['dbg_port'],
+                              exec_async=True))
+
+    def create_cluster(self, port_probes):
+        """
+        Create the cluster once every server accepts connections
+
+        :param port_probes: The probes of every server's port
+        :return: Whether every node reports cluster_state:ok
+        """
+        if not all(probe.ready() for probe in port_probes):
+            return False
+        if self.cluster is None:
+            cluster = RedisCluster(self.nodes())
             self.log('Flushing all data and resetting the cluster', color=Color.YELLOW)
-            for host in hostfile.hosts:
-                Exec(f'redis-cli -p {self.config["port"]} -h {host} flushall',
-                     LocalExecInfo(env=self.mod_env,
-                                   hostfile=hostfile,
-                                   do_dbg=self.config['do_dbg'],
-                                   dbg_port=self.config['dbg_port']))
-                Exec(f'redis-cli -p {self.config["port"]} -h {host} cluster reset',
-                     LocalExecInfo(env=self.mod_env,
-                                   hostfile=hostfile,
-                                   do_dbg=self.config['do_dbg'],
-                                   dbg_port=self.config['dbg_port']))
+            cluster.reset()
 
             self.log('Creating the cluster', color=Color.YELLOW)
-            cmd = [
-                'redis-cli',
-                f'--cluster create {host_str}',
-                '--cluster-replicas 0',
-                '--cluster-yes'
-            ]
-            cmd = ' '.join(cmd)
+            cmd = cluster.create_cmd()
             print(cmd)
             Exec(cmd,
                  LocalExecInfo(env=self.mod_env,
-                               hostfile=hostfile,
+                               hostfile=self.jarvis.hostfile,
                                do_dbg=self.config['do_dbg'],
                                dbg_port=self.config['dbg_port']))
-            self.log(f'Sleeping for {self.config["sleep"]} seconds', color=Color.YELLOW)
-            time.sleep(self.config['sleep'])
+            self.cluster = cluster
+        return self.cluster.is_ok()
+
+    @staticmethod
+    def cluster_args(cluster_config_file):
+        return [
+            f'--cluster-enabled yes',
+            f'--cluster-config-file {cluster_config_file}',
+            f'--cluster-node-timeout 5000',
+        ]
+
+    def nodes(self):
+        """
+        The (host, port) of every redis server. Hostfile entries may name
+        a port (host:port), otherwise the port option is used.
+
+        :return: List of (host, port)
+        """
+        return [parse_node(entry, self.config['port'])
+                for entry in self.jarvis.hostfile.hosts]
+
+    def explicit_ports(self):
+        return any(parse_node(entry, -1)[1] != -1
+                   for entry in self.jarvis.hostfile.hosts)
+
+    def server_hosts(self):
+        """
+        The hostfile of hosts running at least one redis server
+
+        :return: Hostfile
+        """
+        hosts = []
+        for host, _ in self.nodes():
+            if host not in hosts:
+                hosts.append(host)
+        return Hostfile(all_hosts=hosts)
+
+    def ready_probes(self):
+        """
+        Redis is ready once every server accepts connections. With many
+        servers, the cluster is then created, and redis is ready once
+        every node reports cluster_state:ok.
+
+        :return: List of ReadyProbe
+        """
+        port_hosts = {}
+        for host, port in self.nodes():
+            port_hosts.setdefault(port, []).append(host)
+        probes = [PortProbe(hosts, port) for port, hosts in port_hosts.items()]
+        if len(self.nodes()) > 1:
+            port_probes = list(probes)
+            probes.append(HookProbe(lambda: self.create_cluster(port_probes),
+                                    'redis cluster_state:ok'))
+        return probes
 
     def stop(self):
         """
@@ -126,7 +181,7 @@ class Redis(Application):
         for i in range(3):
             Kill('redis-server',
                  PsshExecInfo(env=self.env,
-                              hostfile=self.jarvis.hostfile))
+                              hostfile=self.server_hosts()))
 
     def clean(self):
         """
@@ -4,6 +4,7 @@ SparkCluster is ....
 """
 
 from jarvis_cd.basic.pkg import Service
+from jarvis_cd.basic.readiness import PortProbe
 from jarvis_util import *
 
 
@@ -64,13 +65,32 @@ class SparkCluster(Service):
         Exec(f'{self.config["SPARK_SCRIPTS"]}/sbin/start-master.sh',
              PsshExecInfo(env=self.env,
                           hosts=self.jarvis.hostfile.subset(1)))
-        time.sleep(1)
+        self.wait_ready([self.master_probe()])
         # Start the worker nodes
         Exec(f'{self.config["SPARK_SCRIPTS"]}/sbin/start-worker.sh '
              f'{self.env["SPARK_MASTER_HOST"]}:{self.env["SPARK_MASTER_PORT"]}',
              PsshExecInfo(env=self.mod_env,
                           hosts=self.jarvis.hostfile.subset(self.config['num_nodes'])))
-        time.sleep(self.config['sleep'])
+
+    def master_probe(self):
+        """
+        The master is ready once it accepts connections (7077 by default)
+
+        :return: ReadyProbe
+        """
+        return PortProbe(self.env['SPARK_MASTER_HOST'],
+                         self.env['SPARK_MASTER_PORT'])
+
+    def ready_probes(self):
+        """
+        The cluster is ready once the master and every worker accept
+        connections.
+
+        :return: List of ReadyProbe
+        """
+        workers = self.jarvis.hostfile.subset(self.config['num_nodes'])
+        return [self.master_probe(),
+                PortProbe(workers.hosts, self.env['SPARK_WORKER_PORT'])]
 
     def stop(self):
         """
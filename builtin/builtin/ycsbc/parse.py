@@ -0,0 +1,87 @@
+"""
+This module parses and merges the output of YCSB clients. The final
+status line of a run reports, for every operation, its count and its
+latency (us) min, max, average, and percentiles, e.g.:
+READ: Count=1000 Max=120.5 Min=3.1 Avg=10.2 50=9 90=15 99=40 99.9=90
+"""
+
+import re
+
+THROUGHPUT_REGEX = re.compile(r'throughput\(ops/sec\): ([0-9.]+)')
+OP_REGEX = re.compile(r'([A-Z][A-Z-]*): Count=(\d+)((?: [\w.]+=[0-9.e+-]+)*)')
+METRIC_REGEX = re.compile(r'([\w.]+)=([0-9.e+-]+)')
+
+
+def parse_output(text):
+    """
+    Parse the output of one YCSB client
+
+    :param text: The client's stdout
+    :return: (throughput, ops). throughput is None if it was not printed.
+    ops maps each operation to a dict of its count and latency metrics.
+    """
+    throughput = None
+    match = THROUGHPUT_REGEX.search(text)
+    if match is not None:
+        throughput = float(match.group(1))
+    ops = {}
+    # Statuses are cumulative, so the last one which reports an
+    # operation has its final numbers
+    for line in text.splitlines():
+        for op, count, metrics in OP_REGEX.findall(line):
+            fields = {'Count': int(count)}
+            for name, val in METRIC_REGEX.findall(metrics):
+                fields[name] = float(val)
+            ops[op] = fields
+    return throughput, ops
+
+
+def metric_name(name):
+    """
+    The stat name of a latency metric (e.g., 99.9 -> p99_9_us)
+
+    :param name: The metric name YCSB printed
+    :return: str
+    """
+    if name[0].isdigit():
+        return f'p{name.replace(".", "_")}_us'
+    return f'{name.lower()}_us'
+
+
+def merge(client_outputs):
+    """
+    Merge the results of concurrent clients. Throughput and counts are
+    summed. Without the clients' histograms, percentiles cannot be merged
+    exactly: the average and median are weighted by each client's count,
+    and the higher percentiles and max are the worst client's, an upper
+    bound.
+
+    :param client_outputs: A list of parse_output outputs
+    :return: Dict mapping stat names (e.g., throughput, read_p99_us) to
+    values
+    """
+    stats = {}
+    throughputs = [tput for tput, _ in client_outputs if tput is not None]
+    if len(throughputs):
+        stats['throughput'] = sum(throughputs)
+    op_rows = {}
+    for _, ops in client_outputs:
+        for op, fields in ops.items():
+            op_rows.setdefault(op, []).append(fields)
+    for op, rows in op_rows.items():
+        prefix = op.lower().replace('-', '_')
+        count = sum(row['Count'] for row in rows)
+        stats[f'{prefix}_count'] = count
+        names = sorted({name for row in rows for name in row
+                        if name != 'Count'})
+        for name in names:
+            vals = [(row[name], row['Count']) for row in rows if name in row]
+            stat = f'{prefix}_{metric_name(name)}'
+            weight = sum(weight for _, weight in vals)
+            if name == 'Min':
+                stats[stat] = min(val for val, _ in vals)
+            elif name in ('Avg', '50') and weight:
+                stats[stat] = sum(val * weight for val, weight in vals) / weight
+            else:
+                stats[stat] = max(val for val, _ in vals)
+    return stats
@@ -3,7 +3,10 @@ This module provides classes and methods to launch Redis.
 Redis cluster is used if the hostfile has many hosts
 """
 from jarvis_cd.basic.pkg import Application
+from jarvis_cd.basic.host_exec import host_output
 from jarvis_util import *
+from .parse import parse_output, merge
+import re
 
 
 class Ycsbc(Application):
@@ -14,7 +17,7 @@ class Ycsbc(Application):
         """
         Initialize paths
         """
-        pass
+        self.ycsb_stats = None
 
     def _configure_menu(self):
         """
@@ -48,6 +51,36 @@ class Ycsbc(Application):
                 'default': True,
                 'args': [],
             },
+            {
+                'name': 'clients',
+                'msg': 'The number of hosts to run YCSB clients on, taken '
+                       'from the end of the hostfile. With 1, a single '
+                       'client runs on this host.',
+                'type': int,
+                'default': 1,
+            },
+            {
+                'name': 'threads',
+                'msg': 'The number of threads per client',
+                'type': int,
+                'default': 1,
+            },
+            {
+                'name': 'load',
+                'msg': 'When to load the dataset before running: always, '
+                       'never, or auto (unless it was loaded since the '
+                       'last clean)',
+                'type': str,
+                'default': 'auto',
+                'choices': ['always', 'auto', 'never'],
+            },
+            {
+                'name': 'recordcount',
+                'msg': 'The number of records to load and run over. By '
+                       'default, the workload\'s recordcount.',
+                'type': int,
+                'default': None,
+            },
         ]
 
     def _configure(self, **kwargs):
@@ -58,7 +91,8 @@ class Ycsbc(Application):
         :param kwargs: Configuration parameters for this pkg.
         :return: None
         """
-        pass
+        # Marks that the dataset was loaded since the last clean
+        self.config['loaded'] = f'{self.shared_dir}/loaded'
 
     def start(self):
         """
@@ -67,29 +101,119 @@ class Ycsbc(Application):
 
         :return: None
         """
+        self.ycsb_stats = None
+        load = self.config.get('load', 'never')
+        loaded = self.config.get('loaded', f'{self.shared_dir}/loaded')
+        if load == 'always' or \
+                (load == 'auto' and not os.path.exists(loaded)):
+            self.log('Loading the dataset', color=Color.YELLOW)
+            self.exec = None
+            self.run_clients('-load', self.load_args())
+            # Many clients raise through exec_per_host
+            if self.exec is not None and self.exec.exit_code != 0:
+                raise Exception(f'ycsb -load failed with exit code '
+                                f'{self.exec.exit_code}')
+            with open(loaded, 'w', encoding='utf-8'):
+                pass
+        outputs = self.run_clients('-run')
+        self.ycsb_stats = merge([parse_output(output)
+                                 for output in outputs])
+        for key, val in self.ycsb_stats.items():
+            self.log(f'{key}: {val}')
+
+    def ycsb_cmd(self, phase, extra=None):
+        """
+        Build a ycsb command. The recordcount option is passed to both
+        phases, so the run covers exactly the records loaded.
+
+        :param phase: -load or -run
+        :param extra: Additional arguments
+        :return: str
+        """
         root = self.env['YCSBC_ROOT']
         db_name = self.config["db_name"]
-        workload = f'workload{self.config["workload"]}'
         props = f'{root}/{db_name}/{db_name}.properties'
         if not os.path.exists(props):
             props_arg = ''
         else:
             props_arg = f'-P {props}'
         cmd = [
-            'ycsb -run',
+            f'ycsb {phase}',
             f'-db {db_name}',
-            f'-P {root}/workloads/{workload}',
+            f'-P {self.workload_path()}',
             props_arg,
+            f'-threads {self.config.get("threads", 1)}',
             f'-s' if self.config['status'] else ''
         ]
-        cmd = ' '.join(cmd)
-        print(cmd)
-        self.exec = Exec(cmd,
-             LocalExecInfo(env=self.mod_env,
-                           hostfile=self.jarvis.hostfile,
-                           do_dbg=self.config['do_dbg'],
-                           dbg_port=self.config['dbg_port'],
-                           collect_output=True))
+        if self.config.get('recordcount') is not None:
+            cmd.append(f'-p recordcount={self.config["recordcount"]}')
+        if extra is not None:
+            cmd.append(extra)
+        return ' '.join(cmd)
+
+    def workload_path(self):
+        workload = f'workload{self.config["workload"]}'
+        return f'{self.env["YCSBC_ROOT"]}/workloads/{workload}'
+
+    def client_hosts(self):
+        clients = self.config.get('clients', 1)
+        hostfile = self.jarvis.hostfile
+        if clients > len(hostfile):
+            raise Exception(f'Requested {clients} clients, but the '
+                            f'hostfile only has {len(hostfile)} hosts')
+        return hostfile.hosts[-clients:]
+
+    def load_args(self):
+        """
+        The arguments which give each client a disjoint range of the
+        records to insert
+
+        :return: List of str, one per client
+        """
+        clients = self.config.get('clients', 1)
+        if clients <= 1:
+            return [None]
+        count = self.config.get('recordcount')
+        if count is None:
+            with open(self.workload_path(), 'r', encoding='utf-8') as fp:
+                match = re.search(r'^\s*recordcount\s*=\s*(\d+)',
+                                  fp.read(), re.MULTILINE)
+            if match is None:
+                raise Exception('Set recordcount to load with many clients')
+            count = int(match.group(1))
+        bounds = [count * i // clients for i in range(clients + 1)]
+        return [f'-p insertstart={bounds[i]} '
+                f'-p insertcount={bounds[i + 1] - bounds[i]}'
+                for i in range(clients)]
+
+    def run_clients(self, phase, client_args=None):
+        """
+        Run a YCSB phase on every client concurrently
+
+        :param phase: -load or -run
+        :param client_args: Additional arguments of each client
+        :return: List of the output of each client
+        """
+        hosts = self.client_hosts()
+        if client_args is None:
+            client_args = [None] * len(hosts)
+        if len(hosts) <= 1:
+            cmd = self.ycsb_cmd(phase, client_args[0])
+            self.log(cmd, color=Color.YELLOW)
+            self.exec = Exec(cmd,
+                 LocalExecInfo(env=self.mod_env,
+                               hostfile=self.jarvis.hostfile,
+                               do_dbg=self.config['do_dbg'],
+                               dbg_port=self.config['dbg_port'],
+                               collect_output=True))
+            return [self.exec.stdout['localhost']]
+        cmds = {host: self.ycsb_cmd(phase, args)
+                for host, args in zip(hosts, client_args)}
+        for host, cmd in cmds.items():
+            self.log(f'{host}: {cmd}', color=Color.YELLOW)
+        execs = self.exec_per_host(cmds, env=self.mod_env,
+                                   collect_output=True)
+        return [host_output(node, host) for host, node in execs.items()]
 
     def stop(self):
         """
@@ -107,7 +231,9 @@ class Ycsbc(Application):
 
         :return: None
         """
-        pass
+        loaded = self.config.get('loaded', f'{self.shared_dir}/loaded')
+        if loaded is not None and os.path.exists(loaded):
+            os.remove(loaded)
 
     def _get_stat(self, stat_dict):
         """
@@ -116,8 +242,7 @@ class Ycsbc(Application):
         :param stat_dict: A dictionary of statistics.
         :return: None
         """
-        output = self.exec.stdout['localhost']
-        if 'throughput(ops/sec)' in output:
-            throughput = re.search(r'throughput\(ops\/sec\): ([0-9.]+)', output).group(1)
-            stat_dict[f'{self.pkg_id}.throughput'] = throughput
+        if self.ycsb_stats is not None:
+            for key, val in self.ycsb_stats.items():
+                stat_dict[f'{self.pkg_id}.{key}'] = val
         stat_dict[f'{self.pkg_id}.runtime'] = self.start_time
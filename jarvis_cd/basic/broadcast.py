@@ -0,0 +1,263 @@
+"""
+This module distributes configuration files from the launch node to every
+host without making the launch node's uplink and ssh fan-out the
+bottleneck. Files are either relayed along a k-ary tree of hosts, or
+written once to a shared directory which every host copies from.
+"""
+
+from jarvis_util.shell.exec import Exec
+from jarvis_util.shell.filesystem import Pscp
+from jarvis_util.shell.pssh_exec import PsshExecInfo
+from jarvis_util.shell.ssh_exec import SshExecInfo
+from jarvis_util.util.hostfile import Hostfile
+from jarvis_cd.basic.ssh_pool import SshPool
+from concurrent.futures import ThreadPoolExecutor
+import shutil
+import shlex
+import time
+import os
+
+MISSING = '##JARVIS_MISSING'
+
+
+class Broadcast:
+    """
+    Copies local files to the same paths on a set of hosts.
+
+    Modes:
+        flat: the launch node copies to every host (Pscp)
+        tree: every host which has the files forwards them to fanout more
+        hosts, so N hosts are reached in log_{fanout + 1}(N) rounds
+        shared: the files are written once to a shared directory and
+        every host copies them from there. Paths already within the
+        shared directory are only checked for visibility.
+        auto: shared for files already in the shared directory, flat for
+        up to flat_max hosts, otherwise shared if a shared directory
+        exists and tree if not
+    Hosts which cannot see the files afterwards are sent them directly.
+    """
+
+    MODES = ['auto', 'flat', 'tree', 'shared']
+
+    def __init__(self, env=None, fanout=4, flat_max=16):
+        """
+        :param env: The environment to execute commands in
+        :param fanout: The number of hosts each host forwards to per round
+        :param flat_max: The largest number of hosts auto copies to directly
+        """
+        self.env = env
+        self.fanout = fanout
+        self.flat_max = flat_max
+
+    @staticmethod
+    def in_dir(path, dir_path):
+        if dir_path is None:
+            return False
+        dir_path = os.path.abspath(dir_path)
+        return os.path.abspath(path).startswith(dir_path + os.sep)
+
+    def resolve_mode(self, paths, hosts, mode='auto', stage_dir=None):
+        """
+        Decide how to distribute files
+
+        :param paths: The list of paths
+        :param hosts: The list of hosts
+        :param mode: One of MODES
+        :param stage_dir: A directory visible to every host, or None
+        :return: flat, tree, or shared
+        """
+        if mode not in self.MODES:
+            raise Exception(f'Broadcast mode must be one of {self.MODES}, '
+                            f'not {mode}')
+        if mode == 'shared' and stage_dir is None:
+            raise Exception('Shared broadcast requires a shared directory')
+        if mode != 'auto':
+            return mode
+        if all(self.in_dir(path, stage_dir) for path in paths):
+            return 'shared'
+        remote = [host for host in hosts if not SshPool.is_local(host)]
+        if len(remote) <= self.flat_max:
+            return 'flat'
+        if stage_dir is not None:
+            return 'shared'
+        return 'tree'
+
+    def run(self, paths, hostfile, mode='auto', stage_dir=None):
+        """
+        Copy files to the same paths on every host
+
+        :param paths: A path or list of paths
+        :param hostfile: The Hostfile of hosts to copy to
+        :param mode: One of MODES
+        :param stage_dir: A directory visible to every host, or None
+        :return: The mode used (None if every host is local)
+        """
+        if isinstance(paths, str):
+            paths = [paths]
+        hosts = list(hostfile.hosts)
+        if all(SshPool.is_local(host) for host in hosts):
+            return None
+        mode = self.resolve_mode(paths, hosts, mode, stage_dir)
+        if mode == 'flat':
+            self.flat(paths, hosts)
+        elif mode == 'tree':
+            self.tree(paths, hosts)
+        else:
+            self.shared(paths, hosts, stage_dir)
+        return mode
+
+    def flat(self, paths, hosts):
+        if len(hosts):
+            Pscp(paths, PsshExecInfo(hostfile=Hostfile(all_hosts=hosts),
+                                     env=self.env))
+
+    @staticmethod
+    def plan_tree(hosts, fanout):
+        """
+        Plan the rounds of a tree broadcast. In each round, the launch node
+        (None) and every host which received the files in an earlier round
+        send them to up to fanout new hosts.
+
+        :param hosts: The hosts to reach
+        :param fanout: The number of hosts each sender sends to per round
+        :return: List of rounds. A round is a list of (sender, receivers).
+        """
+        holders = [None]
+        pending = list(hosts)
+        rounds = []
+        while len(pending):
+            cur_round = []
+            for sender in holders:
+                receivers = pending[:fanout]
+                pending = pending[fanout:]
+                if len(receivers) == 0:
+                    break
+                cur_round.append((sender, receivers))
+            for _, receivers in cur_round:
+                holders += receivers
+            rounds.append(cur_round)
+        return rounds
+
+    def forward_cmd(self, paths, receivers):
+        """
+        The command a host runs to forward the files to its receivers
+
+        :param paths: The list of paths
+        :param receivers: The hosts to forward to
+        :return: str
+        """
+        opts = '-o BatchMode=yes'
+        dirs = ' '.join(sorted({shlex.quote(os.path.dirname(path))
+                                for path in paths}))
+        cmds = []
+        for host in receivers:
+            cmds.append(f'ssh {opts} {host} mkdir -p {dirs}')
+            for path in paths:
+                quoted = shlex.quote(path)
+                cmds.append(f'scp -q {opts} {quoted} {host}:{quoted}')
+        return ' && '.join(cmds)
+
+    def tree(self, paths, hosts):
+        """
+        Relay files along a tree of hosts. The launch node already has the
+        files, so it is never a receiver.
+
+        :param paths: The list of paths
+        :param hosts: The hosts to reach
+        :return: None
+        """
+        hosts = [host for host in hosts if not SshPool.is_local(host)]
+
+        def send(sender, receivers):
+            if sender is None:
+                self.flat(paths, receivers)
+            else:
+                Exec(self.forward_cmd(paths, receivers),
+                     SshExecInfo(hostfile=Hostfile(all_hosts=[sender]),
+                                 env=self.env))
+        for cur_round in self.plan_tree(hosts, self.fanout):
+            with ThreadPoolExecutor(max_workers=len(cur_round)) as pool:
+                futures = [pool.submit(send, sender, receivers)
+                           for sender, receivers in cur_round]
+                for future in futures:
+                    future.result()
+        self.repair(paths, hosts)
+
+    def shared(self, paths, hosts, stage_dir, retries=10, delay=.5):
+        """
+        Write files to a shared directory once and have every host copy
+        them to their destination.
+
+        :param paths: The list of paths
+        :param hosts: The hosts to reach
+        :param stage_dir: A directory visible to every host
+        :param retries: How many times to check whether the shared files
+        became visible (e.g., NFS attribute caching) before giving up
+        :param delay: Seconds between checks
+        :return: None
+        """
+        staged = []
+        for i, path in enumerate(paths):
+            if self.in_dir(path, stage_dir):
+                staged.append(path)
+                continue
+            stage_path = os.path.join(stage_dir, 'bcast',
+                                      f'{i}_{os.path.basename(path)}')
+            os.makedirs(os.path.dirname(stage_path), exist_ok=True)
+            shutil.copyfile(path, stage_path)
+            staged.append(stage_path)
+        sizes = [os.path.getsize(path) for path in paths]
+        missing = self.missing(staged, sizes, hosts)
+        for _ in range(retries):
+            if len(missing) == 0:
+                break
+            time.sleep(delay)
+            missing = self.missing(staged, sizes, missing)
+        visible = [host for host in hosts if host not in missing]
+        copies = [(src, dst) for src, dst in zip(staged, paths) if src != dst]
+        if len(copies) and len(visible):
+            dirs = ' '.join(sorted({shlex.quote(os.path.dirname(dst))
+                                    for _, dst in copies}))
+            cmds = [f'mkdir -p {dirs}']
+            cmds += [f'cp {shlex.quote(src)} {shlex.quote(dst)}'
+                     for src, dst in copies]
+            Exec(' && '.join(cmds),
+                 PsshExecInfo(hostfile=Hostfile(all_hosts=visible),
+                              env=self.env))
+        if len(missing):
+            self.flat(paths, missing)
+
+    def missing(self, paths, sizes, hosts):
+        """
+        Find the hosts which cannot see a complete copy of every file
+
+        :param paths: The paths to check on each host
+        :param sizes: The expected size of each path
+        :param hosts: The hosts to check
+        :return: List of hosts
+        """
+        if len(hosts) == 0:
+            return []
+        checks = [f'[ "$(stat -c %s {shlex.quote(path)} 2>/dev/null)" = '
+                  f'"{size}" ] || echo {MISSING}'
+                  for path, size in zip(paths, sizes)]
+        node = Exec('; '.join(checks),
+                    PsshExecInfo(hostfile=Hostfile(all_hosts=hosts),
+                                 env=self.env,
+                                 collect_output=True,
+                                 hide_output=True))
+        return [host for host in hosts
+                if host not in node.stdout or MISSING in node.stdout[host]]
+
+    def repair(self, paths, hosts):
+        """
+        Send files directly to hosts which did not receive them
+
+        :param paths: The list of paths
+        :param hosts: The hosts to check
+        :return: None
+        """
+        sizes = [os.path.getsize(path) for path in paths]
+        missing = self.missing(paths, sizes, hosts)
+        if len(missing):
+            self.flat(paths, missing)
@@ -0,0 +1,214 @@
+"""
+This module records the lifecycle of a pipeline (configure, start,
+readiness wait, stop, kill, clean) and every command it executes as
+timestamped events in a JSONL file. The events can be converted to the
+Chrome trace format and viewed in chrome://tracing or Perfetto.
+"""
+
+from contextlib import contextmanager
+import functools
+import threading
+import socket
+import json
+import time
+import os
+
+
+class EventLog:
+    """
+    Appends structured events to a JSONL file. Each line is a dict with:
+        ts: the start time of the event (seconds since the epoch)
+        dur: the duration of the event in seconds (None for instant events)
+        name: the phase or command (e.g., start, ready, exec)
+        cat: the category of the event (pipeline, pkg, exec)
+        pkg_id: the pkg the event belongs to (None for the pipeline)
+        iter: the iteration id (e.g., 3-0 for point 3 repetition 0)
+        host: the host running jarvis
+        pid, tid: the process and thread which emitted the event
+    """
+
+    def __init__(self, path):
+        """
+        :param path: The path to the JSONL file
+        """
+        self.path = path
+        self.host = socket.gethostname()
+        self.iter_id = None
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def cur_pkg_id(self):
+        """
+        The pkg whose span is innermost in the calling thread
+
+        :return: A pkg id or None
+        """
+        stack = getattr(self.local, 'stack', None)
+        if not stack:
+            return None
+        return stack[-1]
+
+    def emit(self, name, cat, pkg_id=None, ts=None, dur=None, **fields):
+        """
+        Append a single event to the log
+
+        :param name: The name of the event
+        :param cat: The category of the event
+        :param pkg_id: The pkg the event belongs to
+        :param ts: The start time of the event. Defaults to now.
+        :param dur: The duration of the event
+        :param fields: Any other fields to store
+        :return: None
+        """
+        event = {
+            'ts': ts if ts is not None else time.time(),
+            'dur': dur,
+            'name': name,
+            'cat': cat,
+            'pkg_id': pkg_id,
+            'iter': self.iter_id,
+            'host': self.host,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+        }
+        event.update(fields)
+        line = json.dumps(event, default=str)
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as fp:
+                fp.write(line + '\n')
+
+    @contextmanager
+    def span(self, name, cat, pkg_id=None, **fields):
+        """
+        Record an event lasting as long as the with block. Yields a dict
+        which can be updated with fields known only at the end (e.g.,
+        an exit code). Commands executed inside the block are attributed
+        to pkg_id.
+
+        :param name: The name of the event
+        :param cat: The category of the event
+        :param pkg_id: The pkg the event belongs to
+        :param fields: Any other fields to store
+        :return: A dict of fields
+        """
+        if not hasattr(self.local, 'stack'):
+            self.local.stack = []
+        self.local.stack.append(pkg_id)
+        start = time.time()
+        try:
+            yield fields
+        except BaseException as e:
+            fields['error'] = repr(e)
+            raise
+        finally:
+            self.local.stack.pop()
+            self.emit(name, cat, pkg_id, ts=start,
+                      dur=time.time() - start, **fields)
+
+
+_exec_log = None
+
+
+def instrument_exec(event_log):
+    """
+    Record every jarvis_util Exec (including Mkdir, Rm, Kill, etc.) in
+    an event log. Only one log receives exec events at a time.
+
+    :param event_log: The EventLog to emit exec events to
+    :return: None
+    """
+    global _exec_log
+    from jarvis_util.shell.exec import Exec
+    _exec_log = event_log
+    if getattr(Exec.__init__, 'event_logged', False):
+        return
+    orig_init = Exec.__init__
+
+    @functools.wraps(orig_init)
+    def __init__(self, cmd, exec_info=None, *args, **kwargs):
+        if _exec_log is None:
+            return orig_init(self, cmd, exec_info, *args, **kwargs)
+        hostfile = getattr(exec_info, 'hostfile', None)
+        hosts = ['localhost']
+        if hostfile is not None and len(hostfile.hosts):
+            hosts = list(hostfile.hosts)
+        with _exec_log.span('exec', 'exec', _exec_log.cur_pkg_id(),
+                            cmd=str(cmd)[:512],
+                            exec_type=type(exec_info).__name__,
+                            hosts=hosts,
+                            exec_async=getattr(exec_info, 'exec_async',
+                                               False)) as fields:
+            orig_init(self, cmd, exec_info, *args, **kwargs)
+            fields['exit_code'] = getattr(self, 'exit_code', None)
+    __init__.event_logged = True
+    Exec.__init__ = __init__
+
+
+def load_events(paths):
+    """
+    Load the events from a set of JSONL files. Missing files (e.g., of a
+    pipeline which never started) and truncated lines (e.g., from a
+    process killed mid-write) are skipped.
+
+    :param paths: A list of JSONL paths
+    :return: A list of event dicts sorted by start time
+    """
+    events = []
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as fp:
+            for line in fp:
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    events.sort(key=lambda event: event['ts'])
+    return events
+
+
+def to_chrome_trace(events):
+    """
+    Convert events to the Chrome trace event format. Each jarvis process
+    becomes a trace process and each pkg becomes a thread within it, so
+    concurrently started pkgs appear side by side.
+
+    :param events: A list of event dicts
+    :return: A dict which can be saved as JSON
+    """
+    if len(events) == 0:
+        return {'traceEvents': []}
+    base = min(event['ts'] for event in events)
+    lanes = {}
+    trace = []
+    for event in events:
+        lane_name = event['pkg_id'] if event['pkg_id'] else 'pipeline'
+        lane_key = (event['pid'], lane_name)
+        if lane_key not in lanes:
+            lanes[lane_key] = len(lanes)
+            trace.append({
+                'name': 'thread_name', 'ph': 'M',
+                'pid': event['pid'], 'tid': lanes[lane_key],
+                'args': {'name': lane_name},
+            })
+        name = event['name']
+        if event['cat'] == 'exec':
+            name = event['cmd'].split(' ')[0]
+        args = {key: val for key, val in event.items()
+                if key not in ('ts', 'dur', 'name', 'cat', 'pid', 'tid')}
+        trace_event = {
+            'name': name,
+            'cat': event['cat'],
+            'ts': (event['ts'] - base) * 1e6,
+            'pid': event['pid'],
+            'tid': lanes[lane_key],
+            'args': args,
+        }
+        if event['dur'] is None:
+            trace_event['ph'] = 'i'
+            trace_event['s'] = 't'
+        else:
+            trace_event['ph'] = 'X'
+            trace_event['dur'] = event['dur'] * 1e6
+        trace.append(trace_event)
+    return {'traceEvents': trace, 'displayTimeUnit': 'ms'}
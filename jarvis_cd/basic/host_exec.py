@@ -0,0 +1,68 @@
+"""
+This module runs a different command on each host concurrently, e.g.,
+when every host needs its own address in the command line. Commands
+which are the same on every host should use PsshExecInfo instead.
+"""
+
+from jarvis_util.shell.exec import Exec
+from jarvis_util.shell.ssh_exec import SshExecInfo
+from jarvis_util.util.hostfile import Hostfile
+from concurrent.futures import ThreadPoolExecutor
+
+
+def exec_per_host(cmds, env=None, max_workers=32, **kwargs):
+    """
+    Run one command per host over ssh with bounded parallelism. Every
+    command runs even if others fail.
+
+    :param cmds: Dict mapping each host to its command (str or list)
+    :param env: The environment to execute the commands in
+    :param max_workers: The maximum number of concurrent ssh sessions
+    :param kwargs: Other parameters to SshExecInfo (e.g., sudo,
+    collect_output)
+    :return: Dict mapping each host to its Exec. Raises an exception
+    listing every host whose command failed.
+    """
+    if len(cmds) == 0:
+        return {}
+
+    def run(host):
+        try:
+            node = Exec(cmds[host],
+                        SshExecInfo(hostfile=Hostfile(all_hosts=[host]),
+                                    env=env, **kwargs))
+        except Exception as err:
+            return host, None, None, str(err)
+        exit_code = node.exit_code
+        if isinstance(exit_code, dict):
+            exit_code = max(exit_code.values(), default=0)
+        return host, node, exit_code, None
+
+    nodes = {}
+    errors = []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(cmds))) as pool:
+        for host, node, exit_code, err in pool.map(run, list(cmds)):
+            nodes[host] = node
+            if err is not None:
+                errors.append(f'{host}: {err}')
+            elif exit_code:
+                errors.append(f'{host}: exit code {exit_code}: {cmds[host]}')
+    if len(errors):
+        raise Exception('Per-host execution failed:\n' + '\n'.join(errors))
+    return nodes
+
+
+def host_output(node, host):
+    """
+    The collected stdout of a command run by exec_per_host
+
+    :param node: The Exec
+    :param host: The host it ran on
+    :return: str
+    """
+    stdout = node.stdout
+    if isinstance(stdout, dict):
+        if host in stdout:
+            return stdout[host]
+        return next(iter(stdout.values()), '')
+    return stdout or ''
@@ -61,6 +61,8 @@ class JarvisManager:
         self.resource_graph = None
         self.hostfile = None
         self.repos = []
+        # The (private_dir, hosts) pairs created by this process
+        self.private_dirs_made = set()
         self.load()
 
     def create(self, config_dir, private_dir, shared_dir=None):
@@ -194,6 +196,25 @@ class JarvisManager:
         Rm(self.shared_dir, LocalExecInfo())
         Rm(self.private_dir, PsshExecInfo(
             hostfile=self.hostfile))
+        self.forget_private_dirs()
+
+    def forget_private_dirs(self, path=None):
+        """
+        Forget that private directories were created, so that they are
+        created again the next time they are needed. Call this whenever
+        a private directory may have been removed.
+
+        :param path: Forget this directory and every directory within it.
+        None forgets all of them.
+        :return: None
+        """
+        if path is None:
+            self.private_dirs_made.clear()
+            return
+        path = path.rstrip('/')
+        for key in list(self.private_dirs_made):
+            if key[0] == path or key[0].startswith(f'{path}/'):
+                self.private_dirs_made.discard(key)
 
     def print_config(self):
         print(yaml.dump(self.jarvis_conf))
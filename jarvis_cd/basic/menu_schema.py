@@ -0,0 +1,123 @@
+"""
+This module validates and converts pkg configuration parameters against
+a pkg's configure menu directly, without formatting them as key=val
+strings and parsing them with PkgArgParse.
+"""
+
+import copy
+import yaml
+
+
+class MenuSchema:
+    """
+    A configure menu compiled for fast lookup. Menu options follow the
+    jarvis_util ArgParse format (name, type, default, choices, aliases,
+    and args for list options).
+    """
+
+    TRUE_STRS = {'true', '1', 'yes', 'on'}
+    FALSE_STRS = {'false', '0', 'no', 'off'}
+
+    def __init__(self, menu):
+        """
+        :param menu: The list of menu options (e.g., from configure_menu)
+        """
+        self.menu = menu
+        self.opts = {}
+        self.aliases = {}
+        for opt in menu:
+            self.opts[opt['name']] = opt
+            for alias in opt.get('aliases', []):
+                self.aliases[alias] = opt['name']
+
+    def defaults(self):
+        """
+        The default value of every option. Mutable defaults are copied so
+        that configs never share them.
+
+        :return: Dict of option name to default value
+        """
+        return {name: copy.deepcopy(opt.get('default'))
+                for name, opt in self.opts.items()}
+
+    def parse(self, kwargs):
+        """
+        Validate and convert parameters
+
+        :param kwargs: A dict of parameters. Values may be strings (e.g.,
+        from the CLI) or already have the option's type (e.g., from YAML).
+        :return: A new dict containing the converted parameters, with
+        aliases replaced by option names
+        """
+        parsed = {}
+        for key, val in kwargs.items():
+            name = self.aliases.get(key, key)
+            if name not in self.opts:
+                raise Exception(f'{key} is not a configuration option')
+            parsed[name] = self.convert(self.opts[name], val)
+        return parsed
+
+    @staticmethod
+    def convert(opt, val):
+        """
+        Convert a parameter to the type of its option
+
+        :param opt: The menu option
+        :param val: The parameter value
+        :return: The converted value
+        """
+        if val is None or (isinstance(val, str) and len(val) == 0):
+            return None
+        name = opt.get('name')
+        opt_type = opt.get('type')
+        if opt_type is bool:
+            if isinstance(val, str):
+                if val.lower() in MenuSchema.TRUE_STRS:
+                    val = True
+                elif val.lower() in MenuSchema.FALSE_STRS:
+                    val = False
+                else:
+                    raise Exception(f'{name} must be a bool, not {val}')
+            else:
+                val = bool(val)
+        elif opt_type in (list, dict):
+            if isinstance(val, str):
+                val = yaml.safe_load(val)
+            if opt_type is list and isinstance(val, tuple):
+                val = list(val)
+            if not isinstance(val, opt_type):
+                raise Exception(f'{name} must be a {opt_type.__name__}, '
+                                f'not {val}')
+            if opt_type is list and 'args' in opt:
+                val = [MenuSchema.convert_entry(opt['args'], entry)
+                       for entry in val]
+        elif opt_type is not None and not isinstance(val, opt_type):
+            try:
+                val = opt_type(val)
+            except (TypeError, ValueError):
+                raise Exception(f'{name} must be a {opt_type.__name__}, '
+                                f'not {val}')
+        choices = opt.get('choices')
+        if choices and val not in choices:
+            raise Exception(f'{name} must be one of {choices}, not {val}')
+        return val
+
+    @staticmethod
+    def convert_entry(args, entry):
+        """
+        Convert an entry of a list option
+
+        :param args: The menu options of each field of the entry
+        :param entry: A list of fields, or a single field
+        :return: The converted entry
+        """
+        if isinstance(entry, dict):
+            return entry
+        if not isinstance(entry, (list, tuple)):
+            if len(args) == 1:
+                return MenuSchema.convert(args[0], entry)
+            return entry
+        fields = list(entry)
+        for i, arg in enumerate(args[:len(fields)]):
+            fields[i] = MenuSchema.convert(arg, fields[i])
+        return fields
@@ -5,6 +5,16 @@ pkg types in Jarvis.
 
 from abc import ABC, abstractmethod
 from jarvis_cd.basic.jarvis_manager import JarvisManager
+from jarvis_cd.basic.pkg_dag import PkgDag
+from jarvis_cd.basic.readiness import HookProbe, wait_ready
+from jarvis_cd.basic.event_log import EventLog, instrument_exec, \
+    load_events, to_chrome_trace
+from jarvis_cd.basic.profiler import Profiler, profiled
+from jarvis_cd.basic.menu_schema import MenuSchema
+from jarvis_cd.basic.ssh_pool import SshPool, pool_exec
+from jarvis_cd.basic.remote_batch import RemoteBatch
+from jarvis_cd.basic.broadcast import Broadcast
+from jarvis_cd.basic.host_exec import exec_per_host
 from jarvis_util.util.logging import ColorPrinter, Color
 from jarvis_util.util.naming import to_snake_case
 from jarvis_util.serialize.yaml_file import YamlFile
@@ -12,10 +22,17 @@ from jarvis_util.shell.local_exec import LocalExecInfo
 from jarvis_util.shell.exec import Exec
 from jarvis_util.util.argparse import ArgParse
 from jarvis_util.jutil_manager import JutilManager
-from jarvis_util.shell.filesystem import Mkdir, Rm
+from jarvis_util.shell.filesystem import Mkdir, Rm, Pscp
 from jarvis_util.shell.pssh_exec import PsshExecInfo
+from jarvis_util.util.hostfile import Hostfile
+from contextlib import contextmanager
+from queue import Empty
 from enum import Enum
+import multiprocessing
+import threading
+import itertools
 import yaml
+import json
 import inspect
 import pathlib
 import shutil
@@ -51,16 +68,23 @@ class PipelineIterator:
     """
     Grid searching pipeline parameters
     """
-    def __init__(self, ppl):
+    def __init__(self, ppl, iter_out=None):
         """
         Initialize grid search
 
         fors: A list of lists [(pkg, var_name, var_vals)]
+
+        :param ppl: The pipeline being iterated over
+        :param iter_out: Override the iterator output directory. Used by
+        partitioned sweeps so that every worker writes to the same place.
         """
         self.ppl = ppl
         self.norerun = set()
         if 'norerun' in ppl.config['iterator']:
             self.norerun = set(ppl.config['iterator']['norerun'])
+        self.partitions = 1
+        if 'partitions' in ppl.config['iterator']:
+            self.partitions = ppl.config['iterator']['partitions']
         self.fors = []
         self.cur_iters = []
         self.cur_pos = []
@@ -73,7 +97,9 @@ class PipelineIterator:
         self.iter_loop = ppl.config['iterator']['loop']
         self.repeat = ppl.config['iterator']['repeat']
         ppl.set_config_env_vars()
-        self.iter_out = os.path.expandvars(ppl.config['iterator']['output'])
+        if iter_out is None:
+            iter_out = os.path.expandvars(ppl.config['iterator']['output'])
+        self.iter_out = iter_out
         print(f'ITER OUT: {self.iter_out} (from: {ppl.config["iterator"]["output"]})')
         self.stats_path = f'{self.iter_out}/stats_dict.csv'
         self.stats = []
@@ -106,7 +132,7 @@ class PipelineIterator:
         return self.conf_dict
 
     def current(self):
-        for i in range(len(self.cur_iters)):
+        for i in range(len(self.cur_pos)):
             for pkg, var_name, var_vals in self.fors[i].zip:
                 self.conf_dict[pkg][var_name] = var_vals[self.cur_pos[i]]
                 pkg.iter_diff = self.cur_pos_diff[i]
@@ -133,24 +159,62 @@ class PipelineIterator:
         self.iter_count += 1
         return conf_dict
 
+    def points(self):
+        """
+        Enumerate the position of every point in the grid, in the same
+        order that begin() and next() would visit them.
+
+        :return: List of position lists
+        """
+        ranges = [range(for_zip.zip_len) for for_zip in self.fors]
+        return [list(pos) for pos in itertools.product(*ranges)]
+
+    def seek(self, iter_count, pos, prev_pos=None):
+        """
+        Jump directly to a point in the grid.
+
+        :param iter_count: The index of the point (as returned by points())
+        :param pos: The position of the point
+        :param prev_pos: The position of the point previously run by this
+        iterator. Used to determine which pkgs changed for norerun.
+        :return: The configuration dict of the point
+        """
+        if prev_pos is None:
+            self.cur_pos_diff = [1] * len(pos)
+        else:
+            self.cur_pos_diff = [int(cur != prev)
+                                 for cur, prev in zip(pos, prev_pos)]
+        self.cur_pos = list(pos)
+        self.iter_count = iter_count
+        self.max_iter_count = math.prod(
+            [for_zip.zip_len for for_zip in self.fors])
+        return self.current()
+
+    @profiled('PipelineIterator.config_pkgs')
     def config_pkgs(self, conf_dict):
+        events = self.ppl.event_log()
         for pkg, conf in conf_dict.items():
             pkg.skip_run = False
             if pkg.pkg_id in self.norerun and pkg.iter_diff == 0:
                 pkg.skip_run = True
             pkg.set_config_env_vars()
-            pkg.configure(**conf)
+            with events.span('configure', 'pkg', pkg.pkg_id):
+                pkg.configure(**conf)
             pkg.save()
 
+    @profiled('PipelineIterator.save_run')
     def save_run(self, conf_dict):
         stat_dict = {**self.linear_conf_dict}
         # Get the package-specific stats
         for pkg in self.ppl.sub_pkgs:
             if hasattr(pkg, '_get_stat'):
                 pkg._get_stat(stat_dict)
+            if pkg.config.get('timeout'):
+                stat_dict[f'{pkg.pkg_id}.timed_out'] = pkg.timed_out
         # Save the stats to the list
         self.stats.append(stat_dict)
 
+    @profiled('PipelineIterator.analysis')
     def analysis(self):
         for pkg in self.ppl.sub_pkgs:
             if hasattr(pkg, '_analysis'):
@@ -212,13 +276,136 @@ class Pkg(ABC):
         self.mod_env = None
         self.iterator = None
         self.exit_code = 0
+        self.timed_out = False
         self.start_time = 0
         self.stop_time = 0
         self.skip_run = False
+        self.batch = None
 
     def log(self, msg, color=None):
         ColorPrinter.print(msg, color)
 
+    @contextmanager
+    def remote_batch(self):
+        """
+        Batch the remote operations issued through mkdir, rm, pscp, and
+        remote_exec within the with block. When the block exits, each
+        host runs all of its operations as a single script in one
+        round trip. Nested blocks join the outermost batch.
+
+        :return: The RemoteBatch
+        """
+        if self.batch is not None:
+            yield self.batch
+            return
+        self.batch = RemoteBatch(self.env)
+        try:
+            yield self.batch
+            self.batch.flush()
+        finally:
+            self.batch = None
+
+    def mkdir(self, paths, hostfile=None):
+        """
+        Create directories on a set of hosts
+
+        :param paths: A path or list of paths
+        :param hostfile: The hosts. Defaults to the jarvis hostfile.
+        :return: None
+        """
+        if hostfile is None:
+            hostfile = self.jarvis.hostfile
+        if self.batch is not None:
+            self.batch.mkdir(paths, hostfile)
+        else:
+            Mkdir(paths, PsshExecInfo(hostfile=hostfile, env=self.env))
+
+    def rm(self, paths, hostfile=None):
+        """
+        Recursively remove paths (which may contain globs) on a set of hosts
+
+        :param paths: A path or list of paths
+        :param hostfile: The hosts. Defaults to the jarvis hostfile.
+        :return: None
+        """
+        if hostfile is None:
+            hostfile = self.jarvis.hostfile
+        if self.batch is not None:
+            self.batch.rm(paths, hostfile)
+        else:
+            Rm(paths, PsshExecInfo(hostfile=hostfile, env=self.env))
+
+    def pscp(self, paths, hostfile=None):
+        """
+        Copy local files to the same paths on a set of hosts
+
+        :param paths: A path or list of paths
+        :param hostfile: The hosts. Defaults to the jarvis hostfile.
+        :return: None
+        """
+        if hostfile is None:
+            hostfile = self.jarvis.hostfile
+        if self.batch is not None:
+            self.batch.pscp(paths, hostfile)
+        else:
+            Pscp(paths, PsshExecInfo(hostfile=hostfile, env=self.env))
+
+    def broadcast(self, paths, hostfile=None):
+        """
+        Copy configuration files to the same paths on a set of hosts. The
+        pkg's bcast option selects how (see Broadcast). Direct copies
+        join the current remote batch.
+
+        :param paths: A path or list of paths
+        :param hostfile: The hosts. Defaults to the jarvis hostfile.
+        :return: None
+        """
+        if hostfile is None:
+            hostfile = self.jarvis.hostfile
+        if isinstance(paths, str):
+            paths = [paths]
+        mode = 'auto'
+        if self.config is not None:
+            mode = self.config.get('bcast', 'auto')
+        bcast = Broadcast(self.env)
+        mode = bcast.resolve_mode(paths, hostfile.hosts, mode,
+                                  self.shared_dir)
+        if mode == 'flat':
+            self.pscp(paths, hostfile)
+        else:
+            bcast.run(paths, hostfile, mode, self.shared_dir)
+
+    def remote_exec(self, cmd, hostfile=None):
+        """
+        Run a shell command on a set of hosts
+
+        :param cmd: The command
+        :param hostfile: The hosts. Defaults to the jarvis hostfile.
+        :return: None
+        """
+        if hostfile is None:
+            hostfile = self.jarvis.hostfile
+        if self.batch is not None:
+            self.batch.exec(cmd, hostfile)
+        else:
+            Exec(cmd, PsshExecInfo(hostfile=hostfile, env=self.env))
+
+    def exec_per_host(self, cmds, max_workers=32, env=None, **kwargs):
+        """
+        Run a different command on each host concurrently. Not batched,
+        since each host's command usually depends on the previous
+        remote operations having completed.
+
+        :param cmds: Dict mapping each host to its command
+        :param max_workers: The maximum number of concurrent ssh sessions
+        :param env: The environment to execute in. Defaults to self.env.
+        :param kwargs: Other parameters to SshExecInfo
+        :return: Dict mapping each host to its Exec
+        """
+        if env is None:
+            env = self.env
+        return exec_per_host(cmds, env, max_workers, **kwargs)
+
     def _init_common(self, global_id, root):
         """
         Update paths in this package based on the global_id
@@ -275,6 +462,7 @@ class Pkg(ABC):
         self._init()
         return self
 
+    @profiled('Pkg.load')
     def load(self, global_id=None, root=None, with_config=True):
         """
         Load the configuration of a pkg from the filesystem. Will
@@ -342,6 +530,7 @@ class Pkg(ABC):
 
         :return: self
         """
+        self.jarvis.forget_private_dirs(self.private_dir)
         try:
             for dir_name in os.listdir(self.config_dir):
                 path = os.path.join(self.config_dir, dir_name)
@@ -371,6 +560,7 @@ class Pkg(ABC):
         for pkg in self.sub_pkgs:
             if pkg is not None:
                 pkg.destroy()
+        self.jarvis.forget_private_dirs(self.private_dir)
         try:
             shutil.rmtree(self.config_dir)
         except FileNotFoundError:
@@ -688,6 +878,8 @@ class SimplePkg(Pkg):
     A SimplePkg represents a single program. A pipeline is not a SimplePkg
     because it represents a combination of multiple programs.
     """
+    # The compiled configure menu of each pkg class
+    menu_schemas = {}
 
     def configure_menu(self):
         """
@@ -699,10 +891,34 @@ class SimplePkg(Pkg):
         menu += [
             {
                 'name': 'sleep',
-                'msg': 'How much time to sleep during start (seconds)',
+                'msg': 'How much time to sleep during start (seconds). '
+                       'Services with readiness probes do not sleep.',
                 'type': int,
                 'default': 0,
             },
+            {
+                'name': 'timeout',
+                'msg': 'Kill the pkg if start runs longer than this '
+                       '(seconds). None for no limit.',
+                'type': int,
+                'default': None,
+            },
+            {
+                'name': 'ready_timeout',
+                'msg': 'How long to wait for a service to become ready '
+                       'after starting (seconds)',
+                'type': int,
+                'default': 60,
+            },
+            {
+                'name': 'bcast',
+                'msg': 'How config files are sent to hosts: flat '
+                       '(launch node copies to all), tree (hosts relay '
+                       'copies), shared (via the shared dir), or auto',
+                'type': str,
+                'default': 'auto',
+                'choices': Broadcast.MODES,
+            },
             {
                 'name': 'reinit',
                 'msg': 'Destroy previous configuration and rebuild',
@@ -741,6 +957,21 @@ class SimplePkg(Pkg):
                 'type': bool,
                 'default': False
             },
+            {
+                'name': 'depends_on',
+                'msg': 'The pkgs which must start before this pkg. By '
+                       'default, a pkg depends on the pkg before it in '
+                       'the pipeline. Use [] for no dependencies.',
+                'type': list,
+                'default': None,
+                'args': [
+                    {
+                        'name': 'pkg_id',
+                        'msg': 'The id of the pkg depended on',
+                        'type': str
+                    },
+                ]
+            },
         ]
         return menu
 
@@ -755,6 +986,7 @@ class SimplePkg(Pkg):
         """
         return []
 
+    @profiled('SimplePkg.configure')
     def configure(self, **kwargs):
         if 'reinit' not in kwargs:
             kwargs['reinit'] = False
@@ -781,6 +1013,7 @@ class SimplePkg(Pkg):
         """
         pass
 
+    @profiled('SimplePkg.update_config')
     def update_config(self, kwargs, rebuild=False):
         """
         The kwargs to pack with default values
@@ -790,42 +1023,61 @@ class SimplePkg(Pkg):
         from self.conifgure_menu
         :return:
         """
-        Mkdir(self.private_dir,
-              PsshExecInfo(hostfile=self.jarvis.hostfile))
-        menu = self.configure_menu()
-        menu_keys = {m['name']: True for m in menu}
-        args = []
-        # Convert kwargs into a list of CLI strings
-        for key, val in kwargs.items():
-            if val is not None:
-                args.append(f'{key}={val}')
-            else:
-                args.append(f'{key}=')
-        parser = PkgArgParse(args=args, menu=menu)
+        self.make_private_dir()
+        schema = self.menu_schema()
+        real_kwargs = schema.parse(kwargs)
         if rebuild:
             # This will overwrite the entire configuration
             # Any parameters unspecified in the input kwargs dict
             # will be set to their default value
-            self.config.update(parser.kwargs)
+            self.config.update(schema.defaults())
+            self.config.update(real_kwargs)
         else:
             # This will update the config with only the
             # parameters specified in the input kwargs dict.
-            self.config.update(parser.real_kwargs)
+            self.config.update(real_kwargs)
             # If a pipeline existed before an update was made to this
             # pkg changing the parameter sets, this will ensure
             # that the config is updated with the new parameters.
-            for key in parser.kwargs:
+            for key, val in schema.defaults().items():
                 if key not in self.config:
-                    self.config[key] = parser.kwargs[key]
+                    self.config[key] = val
         # This will ensure the kwargs dict contains all
         # CLI-configurable values for this pkg. The config
         # contains many parameters that may be set internally
         # by the application.
         for key, val in self.config.items():
-            if key not in menu_keys:
+            if key not in schema.opts:
                 continue
             kwargs[key] = val
 
+    def menu_schema(self):
+        """
+        Get the configure menu of this pkg's class. The menu is built
+        and compiled once per class.
+
+        :return: MenuSchema
+        """
+        cls = self.__class__
+        if cls not in SimplePkg.menu_schemas:
+            SimplePkg.menu_schemas[cls] = MenuSchema(self.configure_menu())
+        return SimplePkg.menu_schemas[cls]
+
+    def make_private_dir(self):
+        """
+        Create the private directory on every host. Only done once per
+        directory and set of hosts, until the directory is forgotten by
+        a clean, reset, or destroy.
+
+        :return: None
+        """
+        key = (self.private_dir, tuple(self.jarvis.hostfile.hosts))
+        if key in self.jarvis.private_dirs_made:
+            return
+        Mkdir(self.private_dir,
+              PsshExecInfo(hostfile=self.jarvis.hostfile))
+        self.jarvis.private_dirs_made.add(key)
+
     @staticmethod
     def copy_template_file(src, dst, replacements=None):
         """
@@ -913,6 +1165,38 @@ class Service(SimplePkg):
         """
         pass
 
+    def ready(self):
+        """
+        A custom readiness check, polled after start. E.g., can a client
+        connect to the OrangeFS servers?
+
+        :return: True or false
+        """
+        return True
+
+    def ready_probes(self):
+        """
+        The conditions which indicate the service is ready to be used
+        (e.g., a PortProbe on the port the service listens on).
+        By default, only the ready() hook is polled.
+
+        :return: List of ReadyProbe
+        """
+        return [HookProbe(self.ready, f'{self.pkg_id}.ready')]
+
+    def wait_ready(self, probes=None):
+        """
+        Poll the readiness probes with exponential backoff until they
+        all pass or ready_timeout expires.
+
+        :param probes: The probes to wait on. Default: ready_probes()
+        :return: The number of seconds spent waiting
+        """
+        if probes is None:
+            probes = self.ready_probes()
+        timeout = self.config.get('ready_timeout', 60)
+        return wait_ready(probes, timeout=timeout)
+
 
 class Application(Service):
     """
@@ -928,8 +1212,61 @@ class Pipeline(Pkg):
     """
     A pipeline connects the different pkg types together in a chain.
     """
+    # The exit code of a pkg killed by its timeout (same as timeout(1))
+    TIMEOUT_EXIT_CODE = 124
+
     def _init(self):
-        pass
+        self.events = None
+
+    def event_log(self):
+        """
+        Get the log where the lifecycle events of this pipeline and the
+        commands it executes are recorded (events.jsonl in config_dir)
+
+        :return: EventLog
+        """
+        if getattr(self, 'events', None) is None:
+            self.events = EventLog(
+                os.path.join(self.config_dir, 'events.jsonl'))
+        instrument_exec(self.events)
+        return self.events
+
+    @contextmanager
+    def ssh_pool(self):
+        """
+        Reuse persistent ssh connections to the hosts of the hostfile for
+        every remote command run within the with block. The pipeline env
+        is not modified; each Exec gets a copy of its env with the ssh
+        wrapper first in PATH. The pool is stopped when the outermost
+        block exits.
+
+        :return: None
+        """
+        pool = SshPool.get_instance()
+        owner = not pool.active
+        pool_exec()
+        pool.start(self.jarvis.hostfile.hosts)
+        try:
+            yield
+        finally:
+            if owner:
+                pool.stop()
+
+    def trace(self, path=None):
+        """
+        Convert the event log to the Chrome trace format, which can be
+        viewed in chrome://tracing or https://ui.perfetto.dev
+
+        :param path: Where to save the trace. Defaults to trace.json in
+        the pipeline's config_dir.
+        :return: The path to the trace
+        """
+        if path is None:
+            path = os.path.join(self.config_dir, 'trace.json')
+        events = load_events([self.event_log().path])
+        with open(path, 'w', encoding='utf-8') as fp:
+            json.dump(to_chrome_trace(events), fp)
+        return path
 
     def configure(self, pkg_id, **kwargs):
         """
@@ -943,7 +1280,8 @@ class Pipeline(Pkg):
         if pkg is None:
             raise Exception(f'Could not find pkg: {pkg_id}')
         pkg.update_env(self.env)
-        pkg.configure(**kwargs)
+        with self.event_log().span('configure', 'pkg', pkg.pkg_id):
+            pkg.configure(**kwargs)
 
     def build_env(self, env_track_dict=None):
         """
@@ -1031,6 +1369,7 @@ class Pipeline(Pkg):
             - [pkg_name.var1, pkg_name.var2]
             - [pkg_name.var3]
         output: my_dir
+        partitions: 1  # (optional) number of concurrent host partitions
 
         :param path:
         :param do_configure: Whether to append and configure
@@ -1044,6 +1383,8 @@ class Pipeline(Pkg):
         self.config['iterator']['repeat'] = config['repeat']
         if 'norerun' in config:
             self.config['iterator']['norerun'] = config['norerun']
+        if 'partitions' in config:
+            self.config['iterator']['partitions'] = config['partitions']
         return self
 
     def get_static_env_path(self, env_name):
@@ -1110,38 +1451,207 @@ class Pipeline(Pkg):
 
         :return: self
         """
+        events = self.event_log()
         for pkg in self.sub_pkgs:
             pkg.env = self.env
-            pkg.configure()
+            with events.span('configure', 'pkg', pkg.pkg_id):
+                pkg.configure()
         return self
 
-    def run_iter(self, resume=False):
+    def run_iter(self, resume=False, partitions=None):
         """
         Run the pipeline repeatedly with new configurations
+
+        :param resume: Resume an iterative pipeline
+        :param partitions: The number of disjoint host partitions to run
+        iterator points on concurrently. Defaults to the "partitions"
+        key of the iterator config (1 if unset).
+        :return: None
         """
         self.iterator = PipelineIterator(self)
-        conf_dict = self.iterator.begin()
-        while conf_dict is not None:
-            self.clean(with_iter_out=False)
-            for i in range(self.iterator.repeat):
-                cur_iter_tmp = os.path.join(
-                    self.iterator.iter_out,
-                    f'{self.iterator.iter_count}-{i}')
-                self.set_config_env_vars(cur_iter_tmp)
-                self.log(f'[ITER] Iteration'
-                         f'[(param) {self.iterator.iter_count + 1}/{self.iterator.max_iter_count}]'
-                         f'[(rep) {i + 1}/{self.iterator.repeat}]: '
-                         f'{self.iterator.linear_conf_dict}', Color.BRIGHT_BLUE)
-                self.iterator.config_pkgs(conf_dict)
-                self.run(kill=True)
-                self.iterator.save_run(conf_dict)
-                self.clean(with_iter_out=False)
-            conf_dict = self.iterator.next()
+        if partitions is None:
+            partitions = self.iterator.partitions
+        if partitions > 1:
+            with self.ssh_pool():
+                self._run_iter_partitioned(partitions)
+        else:
+            with self.ssh_pool():
+                conf_dict = self.iterator.begin()
+                while conf_dict is not None:
+                    self._run_iter_point(conf_dict)
+                    conf_dict = self.iterator.next()
+        # The analysis does not belong to the last iteration
+        os.environ.pop('ITER_DIR', None)
         self.log(f'[ITER] Beginning analysis', Color.BRIGHT_BLUE)
         self.iterator.analysis()
         self.log(f'[ITER] Finished analysis', Color.BRIGHT_BLUE)
         self.log(f'[ITER] Stored results in: {self.iterator.stats_path}', Color.BRIGHT_BLUE)
 
+    def _run_iter_point(self, conf_dict):
+        """
+        Run all repetitions of the current iterator point
+
+        :param conf_dict: The configuration of the current point
+        :return: None
+        """
+        events = self.event_log()
+        events.iter_id = str(self.iterator.iter_count)
+        self.clean(with_iter_out=False)
+        for i in range(self.iterator.repeat):
+            iter_id = f'{self.iterator.iter_count}-{i}'
+            cur_iter_tmp = os.path.join(self.iterator.iter_out, iter_id)
+            self.set_config_env_vars(cur_iter_tmp)
+            events.iter_id = iter_id
+            self.log(f'[ITER] Iteration'
+                     f'[(param) {self.iterator.iter_count + 1}/{self.iterator.max_iter_count}]'
+                     f'[(rep) {i + 1}/{self.iterator.repeat}]: '
+                     f'{self.iterator.linear_conf_dict}', Color.BRIGHT_BLUE)
+            with events.span('iteration', 'pipeline',
+                             conf=self.iterator.linear_conf_dict):
+                self.iterator.config_pkgs(conf_dict)
+                self.run(kill=True)
+                self.iterator.save_run(conf_dict)
+                self.clean(with_iter_out=False)
+
+    def _run_iter_partitioned(self, partitions, poll=1):
+        """
+        Split the hostfile into disjoint partitions and run iterator points
+        on each partition concurrently. Each partition is a forked worker
+        process with a private copy of this pipeline. Stats are merged
+        back into this pipeline's iterator in point order.
+
+        :param partitions: The number of partitions
+        :param poll: Seconds between checks that the workers are alive
+        :return: None
+        """
+        hostfiles = self.split_hostfile(partitions)
+        points = list(enumerate(self.iterator.points()))
+        self.log(f'[ITER] Running {len(points)} points over {partitions} '
+                 f'partitions of {len(hostfiles[0])} hosts', Color.BRIGHT_BLUE)
+        ctx = multiprocessing.get_context('fork')
+        queue = ctx.Queue()
+        workers = {}
+        for part_id, hostfile in enumerate(hostfiles):
+            part_points = points[part_id::partitions]
+            if len(part_points) == 0:
+                continue
+            worker = ctx.Process(target=self._iter_worker,
+                                 args=(part_id, hostfile, part_points, queue))
+            worker.start()
+            workers[part_id] = worker
+        results = []
+        pending = dict(workers)
+        while len(pending):
+            try:
+                part_id, part_results, exit_code = queue.get(timeout=poll)
+            except Empty:
+                dead = [part_id for part_id, worker in pending.items()
+                        if not worker.is_alive()]
+                if len(dead) == 0:
+                    continue
+                # A worker may have reported just before exiting
+                try:
+                    part_id, part_results, exit_code = queue.get(
+                        timeout=poll)
+                except Empty:
+                    for part_id in dead:
+                        worker = pending.pop(part_id)
+                        self.log(f'[ITER] Partition {part_id} died without '
+                                 f'reporting (exit code {worker.exitcode}). '
+                                 f'Its points have no stats.', Color.RED)
+                        self.exit_code += 1
+                    continue
+            pending.pop(part_id, None)
+            if exit_code != 0:
+                self.log(f'[ITER] Partition {part_id} exited with '
+                         f'code {exit_code}', Color.RED)
+            self.exit_code += exit_code
+            results += part_results
+        for worker in workers.values():
+            worker.join()
+        results.sort(key=lambda result: result[0])
+        for _, point_stats in results:
+            self.iterator.stats += point_stats
+
+    def _iter_worker(self, part_id, hostfile, points, queue):
+        """
+        Run a subset of iterator points on a partition of the hostfile.
+        Executes within a forked process.
+
+        :param part_id: The partition id
+        :param hostfile: The hostfile of this partition
+        :param points: A list of (iter_count, position) to run
+        :param queue: Where to place the (part_id, results, exit_code) tuple
+        :return: None
+        """
+        results = []
+        exit_code = 1
+        ppl = None
+        try:
+            self.jarvis.hostfile = hostfile
+            ppl = self.copy(f'{self.global_id}_part{part_id}')
+            ppl.events = self.event_log()
+            ppl.update()
+            ppl.iterator = PipelineIterator(ppl, self.iterator.iter_out)
+            prev_pos = None
+            for iter_count, pos in points:
+                conf_dict = ppl.iterator.seek(iter_count, pos, prev_pos)
+                stat_off = len(ppl.iterator.stats)
+                ppl._run_iter_point(conf_dict)
+                results.append((iter_count, ppl.iterator.stats[stat_off:]))
+                prev_pos = pos
+            exit_code = ppl.exit_code
+        finally:
+            try:
+                # Failed partitions must not leave their pipeline behind
+                if ppl is not None:
+                    ppl.destroy()
+            finally:
+                # Forked workers exit without running atexit handlers
+                Profiler.get_instance().flush()
+                queue.put((part_id, results, exit_code))
+
+    def split_hostfile(self, partitions):
+        """
+        Divide the jarvis hostfile into disjoint, equally-sized hostfiles.
+        Hosts which do not divide evenly are left unused.
+
+        :param partitions: The number of hostfiles to create
+        :return: List of Hostfile
+        """
+        hosts = self.jarvis.hostfile.hosts
+        if len(hosts) < partitions:
+            raise Exception(f'Cannot split {len(hosts)} hosts into '
+                            f'{partitions} partitions')
+        part_size = len(hosts) // partitions
+        hostfiles = []
+        for i in range(partitions):
+            path = os.path.join(self.config_dir, f'hostfile_part{i}.txt')
+            part_hosts = hosts[i * part_size:(i + 1) * part_size]
+            Hostfile(all_hosts=part_hosts).save(path)
+            hostfiles.append(Hostfile(hostfile=path))
+        return hostfiles
+
+    def copy(self, pipeline_id):
+        """
+        Create a private copy of this pipeline's configuration. The copy
+        has its own config, shared, and private directories.
+
+        :param pipeline_id: The id of the new pipeline
+        :return: The loaded copy
+        """
+        config_dir = f'{self.jarvis.config_dir}/{pipeline_id}'
+        if os.path.exists(config_dir):
+            shutil.rmtree(config_dir)
+        shutil.copytree(self.config_dir, config_dir)
+        os.rename(f'{config_dir}/{self.pkg_id}.yaml',
+                  f'{config_dir}/{pipeline_id}.yaml')
+        ppl = Pipeline().load(pipeline_id)
+        for pkg in [ppl] + ppl.sub_pkgs:
+            if pkg.shared_dir is not None:
+                os.makedirs(pkg.shared_dir, exist_ok=True)
+        return ppl
+
     def run(self, kill=False):
         """
         Start and stop the pipeline
@@ -1155,6 +1665,42 @@ class Pipeline(Pkg):
         else:
             self.stop()
 
+    def pkg_dag(self):
+        """
+        Build the dependency graph of the pipeline's pkgs. Pkgs may declare
+        the pkgs they depend on with "depends_on". Interceptors always
+        separate the pkgs before them from the pkgs after them, since they
+        modify the environment (e.g., LD_PRELOAD) of later pkgs.
+
+        :return: (PkgDag, max_workers)
+        """
+        depends_on = {}
+        for pkg in self.sub_pkgs:
+            if pkg.config.get('depends_on') is not None:
+                depends_on[pkg.pkg_id] = pkg.config['depends_on']
+        barriers = {pkg.pkg_id for pkg in self.sub_pkgs
+                    if isinstance(pkg, Interceptor)}
+        dag = PkgDag([pkg.pkg_id for pkg in self.sub_pkgs],
+                     depends_on, barriers)
+        max_workers = 1
+        if len(depends_on):
+            max_workers = len(self.sub_pkgs)
+        return dag, max_workers
+
+    def _run_dag(self, fn, reverse=False):
+        """
+        Call fn on each sub-pkg, following the pkg dependency graph.
+
+        :param fn: A function which takes a pkg
+        :param reverse: Whether to run dependents before their dependencies
+        :return: None
+        """
+        dag, max_workers = self.pkg_dag()
+        run_pkg = Profiler.get_instance().propagate(
+            lambda pkg_id: fn(self.sub_pkgs_dict[pkg_id]))
+        dag.run(run_pkg, reverse=reverse, max_workers=max_workers)
+
+    @profiled('Pipeline.start')
     def start(self):
         """
         Start the pipeline.
@@ -1168,62 +1714,132 @@ class Pipeline(Pkg):
 
         :return: None
         """
-        self.mod_env = self.env.copy()
+        with self.ssh_pool(), self.event_log().span('start', 'pipeline'):
+            self.mod_env = self.env.copy()
+            self._run_dag(self._start_pkg)
         for pkg in self.sub_pkgs:
-            if pkg.skip_run:
-                self.log(f'[RUN] (skipping) {pkg.pkg_id}: Start', color=Color.YELLOW)
-            else:
-                self.log(f'[RUN] {pkg.pkg_id}: Start', color=Color.GREEN)
+            self.exit_code += pkg.exit_code
 
-            start = time.time()
-            if isinstance(pkg, Service):
-                pkg.update_env(self.env, self.mod_env)
-                pkg.start()
-            if isinstance(pkg, Interceptor):
-                pkg.update_env(self.env, self.mod_env)
+    def _start_pkg(self, pkg):
+        if pkg.skip_run:
+            self.log(f'[RUN] (skipping) {pkg.pkg_id}: Start', color=Color.YELLOW)
+        else:
+            self.log(f'[RUN] {pkg.pkg_id}: Start', color=Color.GREEN)
+
+        start = time.time()
+        pkg.exit_code = 0
+        pkg.timed_out = False
+        if isinstance(pkg, Service):
+            pkg.update_env(self.env, self.mod_env)
+            self._watchdog_start(pkg)
+            if not pkg.timed_out:
+                with self.event_log().span('ready', 'pkg', pkg.pkg_id):
+                    wait_time = pkg.wait_ready()
+                self.log(f'[RUN] {pkg.pkg_id}: '
+                         f'Ready after {wait_time} seconds',
+                         color=Color.GREEN)
+        if isinstance(pkg, Interceptor):
+            pkg.update_env(self.env, self.mod_env)
+            with self.event_log().span('modify_env', 'pkg', pkg.pkg_id):
                 pkg.modify_env()
-                self.mod_env.update(self.env)
-            self.exit_code += pkg.exit_code
-            end = time.time()
-            pkg.start_time = end - start
-            self.log(f'[RUN] {pkg.pkg_id}: '
-                     f'Start finished in {pkg.start_time} seconds',
-                     color=Color.GREEN)
+            self.mod_env.update(self.env)
+        end = time.time()
+        pkg.start_time = end - start
+        self.log(f'[RUN] {pkg.pkg_id}: '
+                 f'Start finished in {pkg.start_time} seconds',
+                 color=Color.GREEN)
+
+    def _watchdog_start(self, pkg, grace=30):
+        """
+        Start a pkg. If the pkg has a timeout, start runs in a separate
+        thread and the pkg is killed if start does not return in time.
+        A timed out pkg has timed_out set and exit_code set to
+        TIMEOUT_EXIT_CODE.
+
+        :param pkg: The pkg to start
+        :param grace: Seconds to wait for start to return after the kill
+        :return: None
+        """
+        timeout = pkg.config.get('timeout')
+        if not timeout:
+            self._start_service(pkg)
+            return
+        errors = []
 
+        def start():
+            try:
+                self._start_service(pkg)
+            except Exception as e:
+                errors.append(e)
+        thread = threading.Thread(
+            target=Profiler.get_instance().propagate(start), daemon=True)
+        thread.start()
+        thread.join(timeout)
+        if thread.is_alive():
+            self.log(f'[RUN] {pkg.pkg_id}: Timed out after {timeout} '
+                     f'seconds', color=Color.RED)
+            pkg.timed_out = True
+            self.event_log().emit('timeout', 'pkg', pkg.pkg_id,
+                                  timeout=timeout)
+            self._kill_pkg(pkg)
+            thread.join(grace)
+            if thread.is_alive():
+                self.log(f'[RUN] {pkg.pkg_id}: Start did not return after '
+                         f'being killed. Abandoning it.', color=Color.RED)
+            pkg.exit_code = self.TIMEOUT_EXIT_CODE
+            return
+        if len(errors):
+            raise errors[0]
+
+    def _start_service(self, pkg):
+        with self.event_log().span('start', 'pkg', pkg.pkg_id):
+            pkg.start()
+
+    @profiled('Pipeline.stop')
     def stop(self):
         """
         Stop the pipeline
 
         :return: None
         """
-        for pkg in reversed(self.sub_pkgs):
-            self.log(f'[RUN] {pkg.pkg_id}: Stop', color=Color.GREEN)
-            start = time.time()
-            if isinstance(pkg, Service):
-                pkg.update_env(self.env, self.mod_env)
+        with self.ssh_pool(), self.event_log().span('stop', 'pipeline'):
+            self._run_dag(self._stop_pkg, reverse=True)
+
+    def _stop_pkg(self, pkg):
+        self.log(f'[RUN] {pkg.pkg_id}: Stop', color=Color.GREEN)
+        start = time.time()
+        if isinstance(pkg, Service):
+            pkg.update_env(self.env, self.mod_env)
+            with self.event_log().span('stop', 'pkg', pkg.pkg_id):
                 pkg.stop()
-            end = time.time()
-            pkg.stop_time = end - start
-            self.log(f'[RUN] {pkg.pkg_id}: '
-                     f'Stop finished in {pkg.stop_time} seconds',
-                     color=Color.GREEN)
+        end = time.time()
+        pkg.stop_time = end - start
+        self.log(f'[RUN] {pkg.pkg_id}: '
+                 f'Stop finished in {pkg.stop_time} seconds',
+                 color=Color.GREEN)
 
+    @profiled('Pipeline.kill')
     def kill(self):
         """
         Stop the pipeline
 
         :return: None
         """
-        for pkg in reversed(self.sub_pkgs):
-            self.log(f'[RUN] {pkg.pkg_id}: Killing', color=Color.GREEN)
-            if isinstance(pkg, Service):
-                pkg.update_env(self.env, self.mod_env)
+        with self.ssh_pool(), self.event_log().span('kill', 'pipeline'):
+            self._run_dag(self._kill_pkg, reverse=True)
+
+    def _kill_pkg(self, pkg):
+        self.log(f'[RUN] {pkg.pkg_id}: Killing', color=Color.GREEN)
+        if isinstance(pkg, Service):
+            pkg.update_env(self.env, self.mod_env)
+            with self.event_log().span('kill', 'pkg', pkg.pkg_id):
                 if hasattr(pkg, 'kill'):
                     pkg.kill()
                 else:
                     pkg.stop()
-            self.log(f'[RUN] {pkg.pkg_id}: Finished killing', color=Color.GREEN)
+        self.log(f'[RUN] {pkg.pkg_id}: Finished killing', color=Color.GREEN)
 
+    @profiled('Pipeline.clean')
     def clean(self, with_iter_out=True):
         """
         Clean the pipeline
@@ -1231,19 +1847,25 @@ class Pipeline(Pkg):
         with_iter_out: Clean the iteration output
         :return: None
         """
-        for pkg in reversed(self.sub_pkgs):
-            if pkg.skip_run:
-                self.log(f'[RUN] (skipping) {pkg.pkg_id}: Cleaning', color=Color.YELLOW)
-            else:
-                self.log(f'[RUN] {pkg.pkg_id}: Cleaning', color=Color.GREEN)
-            if isinstance(pkg, Service):
-                pkg.update_env(self.env, self.mod_env)
-                pkg.clean()
-            self.log(f'[RUN] {pkg.pkg_id}: Finished cleaning', color=Color.GREEN)
+        with self.ssh_pool(), self.event_log().span('clean', 'pipeline'):
+            self._run_dag(self._clean_pkg, reverse=True)
         if with_iter_out and 'iterator' in self.config:
             self.iterator = PipelineIterator(self)
             Rm(self.iterator.iter_out)
 
+    def _clean_pkg(self, pkg):
+        if pkg.skip_run:
+            self.log(f'[RUN] (skipping) {pkg.pkg_id}: Cleaning', color=Color.YELLOW)
+        else:
+            self.log(f'[RUN] {pkg.pkg_id}: Cleaning', color=Color.GREEN)
+        if isinstance(pkg, Service):
+            pkg.update_env(self.env, self.mod_env)
+            with self.event_log().span('clean', 'pkg', pkg.pkg_id):
+                pkg.clean()
+        # Cleaning may remove the pkg's private data
+        self.jarvis.forget_private_dirs(pkg.private_dir)
+        self.log(f'[RUN] {pkg.pkg_id}: Finished cleaning', color=Color.GREEN)
+
     def status(self):
         """
         Get the status of the pipeline
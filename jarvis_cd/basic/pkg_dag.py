@@ -0,0 +1,137 @@
+"""
+This module schedules the lifecycle operations (start, stop, kill, clean)
+of the pkgs in a pipeline as a dependency graph.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class PkgDag:
+    """
+    A dependency graph over the pkgs of a pipeline. Edges point from a
+    pkg to the pkgs it depends on. Starting a pkg requires all of its
+    dependencies to have started. Stopping a pkg requires all of the pkgs
+    which depend on it to have stopped.
+    """
+
+    def __init__(self, pkg_ids, depends_on=None, barriers=None):
+        """
+        Build the dependency graph
+
+        :param pkg_ids: The ids of the pkgs in pipeline order
+        :param depends_on: A dict mapping a pkg id to the list of pkg ids
+        it depends on. Pkgs which are not in the dict depend on the pkg
+        directly before them in the pipeline.
+        :param barriers: A set of pkg ids which depend on every pkg before
+        them and which every pkg after them depends on. This is used to
+        keep the environment modifications of Interceptors ordered.
+        """
+        if depends_on is None:
+            depends_on = {}
+        if barriers is None:
+            barriers = set()
+        self.pkg_ids = list(pkg_ids)
+        self.deps = {}
+        for i, pkg_id in enumerate(self.pkg_ids):
+            if pkg_id in depends_on:
+                deps = set(depends_on[pkg_id])
+                for dep in deps:
+                    if dep not in self.pkg_ids:
+                        raise Exception(f'{pkg_id} depends on {dep}, '
+                                        f'which is not in the pipeline')
+            elif i > 0:
+                deps = {self.pkg_ids[i - 1]}
+            else:
+                deps = set()
+            self.deps[pkg_id] = deps
+        for i, pkg_id in enumerate(self.pkg_ids):
+            if pkg_id not in barriers:
+                continue
+            self.deps[pkg_id].update(self.pkg_ids[:i])
+            for later_id in self.pkg_ids[i + 1:]:
+                self.deps[later_id].add(pkg_id)
+        for pkg_id in self.deps:
+            self.deps[pkg_id].discard(pkg_id)
+        self.order = self._toposort()
+
+    def _toposort(self):
+        """
+        Order the pkgs so that every pkg comes after its dependencies.
+        Ties are broken by pipeline order.
+
+        :return: List of pkg ids
+        """
+        remaining = {pkg_id: set(deps) for pkg_id, deps in self.deps.items()}
+        order = []
+        while len(remaining):
+            ready = [pkg_id for pkg_id in self.pkg_ids
+                     if pkg_id in remaining and len(remaining[pkg_id]) == 0]
+            if len(ready) == 0:
+                raise Exception(f'Cycle in pkg dependencies: '
+                                f'{sorted(remaining)}')
+            for pkg_id in ready:
+                del remaining[pkg_id]
+                order.append(pkg_id)
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+    def _edges(self, reverse):
+        """
+        Get the set of pkgs which must finish before each pkg runs.
+
+        :param reverse: Whether to invert the edges (e.g., for stop)
+        :return: Dict of pkg id to set of pkg ids
+        """
+        if not reverse:
+            return {pkg_id: set(deps) for pkg_id, deps in self.deps.items()}
+        edges = {pkg_id: set() for pkg_id in self.deps}
+        for pkg_id, deps in self.deps.items():
+            for dep in deps:
+                edges[dep].add(pkg_id)
+        return edges
+
+    def run(self, fn, reverse=False, max_workers=1):
+        """
+        Call fn on every pkg id, respecting dependencies.
+
+        :param fn: A function which takes a pkg id
+        :param reverse: Whether to run dependents before their dependencies
+        :param max_workers: The number of pkgs which may run concurrently.
+        When 1, fn is called from the current thread in dependency order.
+        :return: None
+        """
+        order = self.order
+        if reverse:
+            order = list(reversed(order))
+        if max_workers <= 1:
+            for pkg_id in order:
+                fn(pkg_id)
+            return
+        edges = self._edges(reverse)
+        rank = {pkg_id: i for i, pkg_id in enumerate(order)}
+        pending = set(order)
+        running = {}
+        error = None
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while len(pending) or len(running):
+                if error is None:
+                    ready = [pkg_id for pkg_id in pending
+                             if len(edges[pkg_id]) == 0]
+                    ready.sort(key=lambda pkg_id: rank[pkg_id])
+                    for pkg_id in ready:
+                        pending.remove(pkg_id)
+                        running[pool.submit(fn, pkg_id)] = pkg_id
+                if len(running) == 0:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pkg_id = running.pop(future)
+                    if future.exception() is not None:
+                        if error is None:
+                            error = future.exception()
+                        continue
+                    for deps in edges.values():
+                        deps.discard(pkg_id)
+        if error is not None:
+            raise error
@@ -0,0 +1,197 @@
+"""
+This module profiles jarvis's own overhead (e.g., YAML I/O, argument
+parsing, remote mkdirs) during the lifecycle phases of a pipeline.
+
+Profiling is enabled by setting JARVIS_PROFILE to an output directory.
+One .prof file is written per phase per iteration:
+    ${JARVIS_PROFILE}/${ITERATION}/${PHASE}-${PID}.prof
+where ITERATION is the basename of ITER_DIR (or "setup" outside of an
+iterator). ${JARVIS_PROFILE}/summary.txt merges all .prof files in the
+directory and lists the top JARVIS_PROFILE_TOP (default 30) functions
+of each phase by cumulative time.
+
+Phases may nest (e.g., Pipeline.start calls SimplePkg.configure). The
+outer phase is paused while the inner phase runs, so each phase only
+accounts for its own time. cProfile only sees the thread which entered
+the phase, so work handed to other threads (e.g., pkgs started
+concurrently by the pkg DAG) must be wrapped with Profiler.propagate to
+be profiled as part of the phase.
+"""
+
+from contextlib import contextmanager
+import functools
+import threading
+import cProfile
+import pstats
+import atexit
+import glob
+import io
+import os
+
+
+class Profiler:
+    """
+    Accumulates a cProfile profile per (phase, iteration, thread).
+    """
+    instance_ = None
+
+    @staticmethod
+    def get_instance():
+        if Profiler.instance_ is None:
+            profiler = Profiler(os.environ.get('JARVIS_PROFILE'),
+                                int(os.environ.get('JARVIS_PROFILE_TOP', 30)))
+            if profiler.out_dir:
+                atexit.register(profiler.flush)
+                os.register_at_fork(after_in_child=profiler.reset)
+            Profiler.instance_ = profiler
+        return Profiler.instance_
+
+    def __init__(self, out_dir=None, top=30):
+        """
+        :param out_dir: Where to store profiles. None disables profiling.
+        :param top: The number of functions per phase in the summary
+        """
+        self.out_dir = out_dir
+        self.top = top
+        self.profiles = {}
+        self.local = threading.local()
+
+    def reset(self):
+        """
+        Forget all profiles. A forked process calls this so that it does
+        not dump the profiles of its parent.
+
+        :return: None
+        """
+        self.profiles = {}
+        self.local = threading.local()
+
+    @staticmethod
+    def iter_id():
+        """
+        The id of the current iteration
+
+        :return: str
+        """
+        iter_dir = os.environ.get('ITER_DIR')
+        if not iter_dir:
+            return 'setup'
+        return os.path.basename(iter_dir.rstrip('/'))
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Profile the code in the with block as part of a phase
+
+        :param name: The name of the phase (e.g., Pipeline.start)
+        :return: None
+        """
+        if not hasattr(self.local, 'stack'):
+            self.local.stack = []
+        stack = self.local.stack
+        key = (name, self.iter_id(), threading.get_ident())
+        if key not in self.profiles:
+            self.profiles[key] = cProfile.Profile()
+        prof = self.profiles[key]
+        outer = stack[-1] if len(stack) else None
+        if outer is not prof:
+            if outer is not None:
+                outer.disable()
+            prof.enable()
+        stack.append(prof)
+        self.local.names = getattr(self.local, 'names', []) + [name]
+        try:
+            yield
+        finally:
+            stack.pop()
+            self.local.names = self.local.names[:-1]
+            if outer is not prof:
+                prof.disable()
+                if outer is not None:
+                    outer.enable()
+
+    def propagate(self, fn):
+        """
+        Wrap a function which will be called on another thread (e.g., by
+        a thread pool), so that it is profiled as part of the phase the
+        calling thread is in
+
+        :param fn: The function
+        :return: The wrapped function, or fn if no phase is active
+        """
+        names = getattr(self.local, 'names', [])
+        if not self.out_dir or len(names) == 0:
+            return fn
+        name = names[-1]
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with self.phase(name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def flush(self):
+        """
+        Dump every phase of every iteration to a .prof file and rewrite
+        the summary. Safe to call more than once.
+
+        :return: None
+        """
+        if not self.out_dir:
+            return
+        merged = {}
+        for (name, iter_id, _), prof in list(self.profiles.items()):
+            stats = pstats.Stats(prof)
+            key = (name, iter_id)
+            if key in merged:
+                merged[key].add(stats)
+            else:
+                merged[key] = stats
+        for (name, iter_id), stats in merged.items():
+            iter_dir = os.path.join(self.out_dir, iter_id)
+            os.makedirs(iter_dir, exist_ok=True)
+            stats.dump_stats(
+                os.path.join(iter_dir, f'{name}-{os.getpid()}.prof'))
+        self.summarize()
+
+    def summarize(self):
+        """
+        Merge every .prof file in the output directory (including those of
+        other processes) and write the top functions of each phase.
+
+        :return: The path to the summary
+        """
+        by_phase = {}
+        for path in glob.glob(os.path.join(self.out_dir, '*', '*.prof')):
+            name = os.path.basename(path).rsplit('-', 1)[0]
+            by_phase.setdefault(name, []).append(path)
+        out = io.StringIO()
+        for name in sorted(by_phase):
+            stats = pstats.Stats(*by_phase[name], stream=out)
+            out.write(f'==== {name}: {len(by_phase[name])} profiles, '
+                      f'{stats.total_tt:.3f} seconds ====\n')
+            stats.sort_stats('cumulative').print_stats(self.top)
+        path = os.path.join(self.out_dir, 'summary.txt')
+        with open(path, 'w', encoding='utf-8') as fp:
+            fp.write(out.getvalue())
+        return path
+
+
+def profiled(name):
+    """
+    Decorate a function so that it is profiled as a phase when
+    JARVIS_PROFILE is set.
+
+    :param name: The name of the phase
+    :return: The decorator
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            profiler = Profiler.get_instance()
+            if not profiler.out_dir:
+                return fn(*args, **kwargs)
+            with profiler.phase(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
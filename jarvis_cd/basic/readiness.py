@@ -0,0 +1,161 @@
+"""
+This module contains probes which determine whether a service is ready
+to be used, and a function to wait on them.
+"""
+
+from abc import ABC, abstractmethod
+import socket
+import time
+import os
+import re
+
+
+class ReadyProbe(ABC):
+    """
+    A condition which indicates that a service is ready.
+    """
+
+    @abstractmethod
+    def ready(self):
+        """
+        Check whether the condition holds. May raise an exception if the
+        condition can never hold (e.g., the daemon crashed).
+
+        :return: True or False
+        """
+        pass
+
+
+class PortProbe(ReadyProbe):
+    """
+    Ready when a TCP port accepts connections on every host.
+    """
+
+    def __init__(self, hosts, port, connect_timeout=1):
+        """
+        :param hosts: A list of hostnames (or a single hostname)
+        :param port: The TCP port to connect to
+        :param connect_timeout: Seconds to wait for a single connection
+        """
+        if isinstance(hosts, str):
+            hosts = [hosts]
+        self.hosts = list(hosts)
+        self.port = int(port)
+        self.connect_timeout = connect_timeout
+        self.open_hosts = set()
+
+    def ready(self):
+        for host in self.hosts:
+            if host in self.open_hosts:
+                continue
+            try:
+                with socket.create_connection((host, self.port),
+                                              self.connect_timeout):
+                    self.open_hosts.add(host)
+            except OSError:
+                return False
+        return True
+
+    def __str__(self):
+        pending = [host for host in self.hosts
+                   if host not in self.open_hosts]
+        return f'port {self.port} on {pending}'
+
+
+class LogProbe(ReadyProbe):
+    """
+    Ready when a line of a log file matches a regex.
+    """
+
+    def __init__(self, path, regex):
+        """
+        :param path: The path to the log file
+        :param regex: The regex to search for
+        """
+        self.path = path
+        self.regex = re.compile(regex)
+
+    def ready(self):
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, 'r', encoding='utf-8', errors='replace') as fp:
+            for line in fp:
+                if self.regex.search(line):
+                    return True
+        return False
+
+    def __str__(self):
+        return f'/{self.regex.pattern}/ in {self.path}'
+
+
+class PidProbe(ReadyProbe):
+    """
+    Ready while every process is alive. Fails immediately if any of them
+    has exited.
+    """
+
+    def __init__(self, pids):
+        """
+        :param pids: A list of local process ids (or a single pid)
+        """
+        if isinstance(pids, int):
+            pids = [pids]
+        self.pids = list(pids)
+
+    def ready(self):
+        for pid in self.pids:
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                raise Exception(f'Process {pid} exited before it was ready')
+            except PermissionError:
+                pass
+        return True
+
+    def __str__(self):
+        return f'pids {self.pids}'
+
+
+class HookProbe(ReadyProbe):
+    """
+    Ready when a custom function returns True.
+    """
+
+    def __init__(self, fn, name=None):
+        """
+        :param fn: A function taking no parameters and returning a bool
+        :param name: A name for the probe used in error messages
+        """
+        self.fn = fn
+        self.name = name if name is not None else fn.__name__
+
+    def ready(self):
+        return bool(self.fn())
+
+    def __str__(self):
+        return self.name
+
+
+def wait_ready(probes, timeout=60, delay=.05, max_delay=2, backoff=2):
+    """
+    Poll a set of probes with exponential backoff until all are ready.
+
+    :param probes: A list of ReadyProbe
+    :param timeout: Seconds to wait before giving up
+    :param delay: Seconds to wait after the first failed poll
+    :param max_delay: The maximum number of seconds between polls
+    :param backoff: The factor the delay grows by after each poll
+    :return: The number of seconds spent waiting
+    """
+    start = time.time()
+    pending = list(probes)
+    while True:
+        pending = [probe for probe in pending if not probe.ready()]
+        elapsed = time.time() - start
+        if len(pending) == 0:
+            return elapsed
+        if elapsed >= timeout:
+            pending = ', '.join([str(probe) for probe in pending])
+            raise TimeoutError(f'Not ready after {timeout} seconds: {pending}')
+        time.sleep(min(delay, timeout - elapsed))
+        delay = min(delay * backoff, max_delay)
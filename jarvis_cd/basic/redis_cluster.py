@@ -0,0 +1,179 @@
+"""
+This module manages the nodes of a Redis cluster directly over the Redis
+protocol (RESP), so commands reach every node concurrently instead of
+one redis-cli process per node and command.
+"""
+
+from jarvis_cd.basic.readiness import HookProbe, wait_ready
+from concurrent.futures import ThreadPoolExecutor
+import socket
+
+
+def parse_node(entry, default_port):
+    """
+    Parse a hostfile entry which may name a port (host:port)
+
+    :param entry: The hostfile entry
+    :param default_port: The port used when the entry does not name one
+    :return: (host, port)
+    """
+    host, sep, port = entry.rpartition(':')
+    if sep and port.isdigit():
+        return host, int(port)
+    return entry, int(default_port)
+
+
+class RedisError(Exception):
+    """
+    An error reply from a Redis node
+    """
+
+
+class RedisCluster:
+    """
+    The nodes of a Redis cluster
+    """
+
+    def __init__(self, nodes, timeout=5, max_workers=64):
+        """
+        :param nodes: A list of (host, port)
+        :param timeout: Seconds to wait for a node to connect or reply
+        :param max_workers: The number of nodes contacted at once
+        """
+        self.nodes = list(nodes)
+        self.timeout = timeout
+        self.max_workers = max_workers
+
+    @staticmethod
+    def encode(args):
+        parts = [f'*{len(args)}\r\n'.encode()]
+        for arg in args:
+            arg = str(arg).encode()
+            parts.append(f'${len(arg)}\r\n'.encode() + arg + b'\r\n')
+        return b''.join(parts)
+
+    @staticmethod
+    def read_reply(fp):
+        """
+        Read a single RESP reply
+
+        :param fp: A binary file over the connection
+        :return: str, int, list, or None. Raises RedisError for errors.
+        """
+        line = fp.readline()
+        if not line:
+            raise ConnectionError('Connection closed by the node')
+        kind, data = line[:1], line[1:].rstrip(b'\r\n').decode()
+        if kind == b'+':
+            return data
+        if kind == b'-':
+            raise RedisError(data)
+        if kind == b':':
+            return int(data)
+        if kind == b'$':
+            if int(data) < 0:
+                return None
+            bulk = fp.read(int(data) + 2)
+            return bulk[:-2].decode()
+        if kind == b'*':
+            if int(data) < 0:
+                return None
+            return [RedisCluster.read_reply(fp) for _ in range(int(data))]
+        raise RedisError(f'Unexpected reply: {line}')
+
+    def command(self, node, *args):
+        """
+        Run a command on a node
+
+        :param node: (host, port)
+        :param args: The command and its arguments (e.g., 'CLUSTER', 'INFO')
+        :return: The reply
+        """
+        with socket.create_connection(node, self.timeout) as sock:
+            sock.settimeout(self.timeout)
+            sock.sendall(self.encode(args))
+            with sock.makefile('rb') as fp:
+                return self.read_reply(fp)
+
+    def command_all(self, *args):
+        """
+        Run a command on every node concurrently
+
+        :param args: The command and its arguments
+        :return: Dict mapping each node to its reply. Raises an exception
+        listing every node which failed.
+        """
+        def run(node):
+            try:
+                return node, self.command(node, *args), None
+            except (OSError, RedisError) as err:
+                return node, None, err
+        replies = {}
+        errors = []
+        workers = max(min(self.max_workers, len(self.nodes)), 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for node, reply, err in pool.map(run, self.nodes):
+                if err is not None:
+                    errors.append(f'{node[0]}:{node[1]}: {err}')
+                replies[node] = reply
+        if len(errors):
+            raise Exception(f'{" ".join(map(str, args))} failed:\n' +
+                            '\n'.join(errors))
+        return replies
+
+    def reset(self):
+        """
+        Remove all data and forget the cluster on every node, so that a
+        new cluster can be created from them
+
+        :return: None
+        """
+        self.command_all('FLUSHALL')
+        self.command_all('CLUSTER', 'RESET')
+
+    @staticmethod
+    def parse_info(text):
+        info = {}
+        for line in text.splitlines():
+            key, sep, val = line.partition(':')
+            if sep:
+                info[key.strip()] = val.strip()
+        return info
+
+    def is_ok(self):
+        """
+        Whether every node reports cluster_state:ok
+
+        :return: bool
+        """
+        try:
+            replies = self.command_all('CLUSTER', 'INFO')
+        except Exception:
+            return False
+        return all(self.parse_info(reply).get('cluster_state') == 'ok'
+                   for reply in replies.values())
+
+    def wait_ok(self, timeout=60):
+        """
+        Wait until every node reports cluster_state:ok
+
+        :param timeout: Seconds to wait before giving up
+        :return: The number of seconds spent waiting
+        """
+        return wait_ready([HookProbe(self.is_ok, 'redis cluster_state:ok')],
+                          timeout=timeout)
+
+    def create_cmd(self, replicas=0):
+        """
+        The redis-cli command which creates the cluster
+
+        :param replicas: The number of replicas of each master
+        :return: str
+        """
+        nodes = ' '.join([f'{host}:{port}' for host, port in self.nodes])
+        return ' '.join([
+            'redis-cli',
+            f'--cluster create {nodes}',
+            f'--cluster-replicas {replicas}',
+            '--cluster-yes'
+        ])
@@ -0,0 +1,244 @@
+"""
+This module coalesces many small remote filesystem operations (mkdir,
+rm, copying small files, commands) into a single shell script per host.
+Each host runs its script in one parallel-ssh round trip. Every operation
+prints a marker with its exit code, so a failure is attributed to the
+operation and host that caused it.
+
+The script is passed as a single command-line argument, which the kernel
+limits to 128KB (MAX_ARG_STRLEN). When a host's script would grow past
+MAX_SCRIPT_SIZE, the batch is split into rounds. Large files are copied
+with Pscp between rounds, so operations always run in the order they
+were queued.
+"""
+
+from jarvis_util.shell.exec import Exec
+from jarvis_util.shell.filesystem import Pscp
+from jarvis_util.shell.pssh_exec import PsshExecInfo
+from jarvis_util.util.hostfile import Hostfile
+import base64
+import shlex
+import os
+import re
+
+OP_MARKER = '##JARVIS_OP'
+OP_MARKER_REGEX = re.compile(rf'^{OP_MARKER} (\d+) (\d+)$')
+
+
+class RemoteBatch:
+    """
+    A list of remote operations which are executed when flushed.
+    """
+
+    # Files larger than this are copied with Pscp instead of being
+    # embedded in the batch script
+    MAX_EMBED_SIZE = 32 * 1024
+    # The largest script run in one round. It is base64-encoded once more
+    # on the command line, which must stay below MAX_ARG_STRLEN.
+    MAX_SCRIPT_SIZE = 64 * 1024
+
+    def __init__(self, env=None):
+        """
+        :param env: The environment the batch scripts execute in
+        """
+        self.env = env
+        self.ops = []
+        # The rounds are separated by barriers. A barrier is (op_id, copy),
+        # where op_id is the first op of the next round and copy is a
+        # (path, hostfile) copied with Pscp before it, or None.
+        self.barriers = []
+        self.script_sizes = {}
+
+    def __len__(self):
+        return len(self.ops) + len([copy for _, copy in self.barriers
+                                    if copy is not None])
+
+    def add(self, label, cmd, hostfile):
+        """
+        Add a shell command to run on a set of hosts
+
+        :param label: A description of the operation used in errors
+        :param cmd: The shell command
+        :param hostfile: The Hostfile of hosts to run the command on
+        :return: None
+        """
+        hosts = list(hostfile.hosts)
+        size = len(self.build_script([(len(self.ops), cmd)]))
+        if any(self.script_sizes.get(host, 0) + size > self.MAX_SCRIPT_SIZE
+               for host in hosts):
+            self.barrier()
+        for host in hosts:
+            self.script_sizes[host] = self.script_sizes.get(host, 0) + size
+        self.ops.append((label, cmd, hosts))
+
+    def barrier(self, copy=None):
+        """
+        End the current round. Ops queued later run in a new round.
+
+        :param copy: A (path, hostfile) to copy with Pscp between the
+        rounds
+        :return: None
+        """
+        self.barriers.append((len(self.ops), copy))
+        self.script_sizes = {}
+
+    def mkdir(self, paths, hostfile):
+        paths = self._path_list(paths)
+        self.add(f'mkdir {" ".join(paths)}',
+                 f'mkdir -p {self._quote_all(paths)}', hostfile)
+
+    def rm(self, paths, hostfile):
+        paths = self._path_list(paths)
+        # Paths may contain globs (e.g., output*), so they are not quoted
+        self.add(f'rm {" ".join(paths)}',
+                 f'rm -rf {" ".join(paths)}', hostfile)
+
+    def exec(self, cmd, hostfile):
+        self.add(cmd, cmd, hostfile)
+
+    def pscp(self, paths, hostfile):
+        """
+        Copy local files to the same path on a set of hosts. Small files
+        are embedded in the batch script.
+
+        :param paths: A path or list of paths
+        :param hostfile: The Hostfile of hosts to copy to
+        :return: None
+        """
+        for path in self._path_list(paths):
+            if os.path.getsize(path) > self.MAX_EMBED_SIZE:
+                self.mkdir(os.path.dirname(path), hostfile)
+                self.barrier((path, hostfile))
+                continue
+            with open(path, 'rb') as fp:
+                data = base64.b64encode(fp.read()).decode()
+            quoted = shlex.quote(path)
+            self.add(f'copy {path}',
+                     f'mkdir -p {shlex.quote(os.path.dirname(path))} && '
+                     f'echo {data} | base64 -d > {quoted}', hostfile)
+
+    @staticmethod
+    def _path_list(paths):
+        if isinstance(paths, str):
+            return [paths]
+        return list(paths)
+
+    @staticmethod
+    def _quote_all(paths):
+        return ' '.join([shlex.quote(path) for path in paths])
+
+    @staticmethod
+    def build_script(ops):
+        """
+        Build the shell script which runs a list of operations in order.
+        Operations run in subshells and a failure does not stop the
+        operations after it.
+
+        :param ops: A list of (op_id, cmd)
+        :return: The script text
+        """
+        lines = []
+        for op_id, cmd in ops:
+            lines.append(f'( {cmd}\n) 2>&1; echo "{OP_MARKER} {op_id} $?"')
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def parse_output(text):
+        """
+        Split the output of a batch script by operation
+
+        :param text: The output of build_script's script
+        :return: Dict mapping op_id to (exit_code, output)
+        """
+        results = {}
+        output = []
+        for line in text.splitlines():
+            match = OP_MARKER_REGEX.match(line.strip())
+            if match is None:
+                output.append(line)
+                continue
+            results[int(match.group(1))] = (int(match.group(2)),
+                                           '\n'.join(output))
+            output = []
+        return results
+
+    def scripts(self, first=0, last=None):
+        """
+        Group the operations into one script per set of hosts which run
+        exactly the same operations.
+
+        :param first: The first op of the round
+        :param last: The op after the last op of the round. Defaults to
+        the end of the batch.
+        :return: List of (hosts, script, op_ids)
+        """
+        if last is None:
+            last = len(self.ops)
+        host_ops = {}
+        for op_id in range(first, last):
+            for host in self.ops[op_id][2]:
+                host_ops.setdefault(host, []).append(op_id)
+        groups = {}
+        for host, op_ids in host_ops.items():
+            groups.setdefault(tuple(op_ids), []).append(host)
+        scripts = []
+        for op_ids, hosts in groups.items():
+            script = self.build_script(
+                [(op_id, self.ops[op_id][1]) for op_id in op_ids])
+            scripts.append((hosts, script, list(op_ids)))
+        return scripts
+
+    def flush(self):
+        """
+        Execute every operation and clear the batch. Raises an exception
+        listing each failed operation and the hosts it failed on.
+
+        :return: None
+        """
+        errors = []
+        first = 0
+        for last, copy in self.barriers + [(len(self.ops), None)]:
+            errors += self.run_round(first, last)
+            if copy is not None:
+                path, hostfile = copy
+                Pscp(path, PsshExecInfo(hostfile=hostfile, env=self.env))
+            first = last
+        self.ops = []
+        self.barriers = []
+        self.script_sizes = {}
+        if len(errors):
+            raise Exception('Remote batch failed:\n' + '\n'.join(errors))
+
+    def run_round(self, first, last):
+        """
+        Run the scripts of one round concurrently
+
+        :param first: The first op of the round
+        :param last: The op after the last op of the round
+        :return: List of errors
+        """
+        execs = []
+        for hosts, script, op_ids in self.scripts(first, last):
+            encoded = base64.b64encode(script.encode()).decode()
+            node = Exec(f'echo {encoded} | base64 -d | sh',
+                        PsshExecInfo(hostfile=Hostfile(all_hosts=hosts),
+                                     env=self.env,
+                                     collect_output=True,
+                                     hide_output=True,
+                                     exec_async=True))
+            execs.append((hosts, op_ids, node))
+        errors = []
+        for hosts, op_ids, node in execs:
+            node.wait()
+            for host in hosts:
+                results = self.parse_output(node.stdout.get(host, ''))
+                for op_id in op_ids:
+                    label = self.ops[op_id][0]
+                    if op_id not in results:
+                        errors.append(f'{host}: {label}: did not run')
+                        continue
+                    exit_code, output = results[op_id]
+                    if exit_code != 0:
+                        errors.append(f'{host}: {label}: exit code '
+                                      f'{exit_code}: {output.strip()}')
+        return errors
@@ -0,0 +1,225 @@
+"""
+This module keeps a pool of persistent, multiplexed ssh connections
+(OpenSSH ControlMaster) open for the lifetime of a jarvis command. Every
+ssh and pssh launched by jarvis_util finds a wrapper script named ssh
+first in the local PATH. The wrapper reuses the master connection to the
+host, so a remote operation no longer pays for a TCP + ssh handshake.
+scp (and so Pscp) runs the ssh binary it was compiled with rather than
+the one in PATH, so copies are not pooled.
+
+Pkgs pass their own env (with a saved PATH) to every Exec, which
+overrides this process's environment. pool_exec hooks jarvis_util's
+Exec so that each command gets a copy of its env with the wrapper first
+in PATH. The pipeline env itself is never modified, so the wrapper is
+never saved. On remote hosts the wrapper's directory does not exist, so
+the forwarded PATH entry is ignored.
+
+Set JARVIS_SSH_POOL=0 to disable the pool.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import subprocess
+import functools
+import tempfile
+import socket
+import atexit
+import shutil
+import glob
+import copy
+import os
+
+
+class SshPool:
+    """
+    A singleton which manages the ssh control masters of this process.
+    """
+    instance_ = None
+
+    @staticmethod
+    def get_instance():
+        if SshPool.instance_ is None:
+            SshPool.instance_ = SshPool()
+        return SshPool.instance_
+
+    def __init__(self):
+        self.ctrl_dir = None
+        self.bin_dir = None
+        self.real_ssh = None
+        self.owner_pid = None
+        self.hosts = set()
+        self.exit_hook = False
+
+    @property
+    def active(self):
+        return self.ctrl_dir is not None
+
+    @staticmethod
+    def enabled():
+        return os.environ.get('JARVIS_SSH_POOL', '1') not in ('0', 'false')
+
+    @staticmethod
+    def is_local(host):
+        return host in ('localhost', '127.0.0.1', socket.gethostname())
+
+    def start(self, hosts, persist=600):
+        """
+        Create the ssh wrapper and open a master connection to each
+        remote host. Hosts already connected are skipped.
+
+        :param hosts: A list of hostnames
+        :param persist: Seconds an idle master stays open. Masters are
+        closed when the pool is stopped regardless.
+        :return: True if the pool is active
+        """
+        remote = [host for host in hosts if not self.is_local(host)]
+        if not self.enabled() or len(remote) == 0:
+            return self.active
+        if not self.active:
+            self.real_ssh = shutil.which('ssh')
+            if self.real_ssh is None:
+                return False
+            self.ctrl_dir = tempfile.mkdtemp(prefix='jarvis-ssh-')
+            self.bin_dir = os.path.join(self.ctrl_dir, 'bin')
+            os.makedirs(self.bin_dir)
+            wrapper = os.path.join(self.bin_dir, 'ssh')
+            with open(wrapper, 'w', encoding='utf-8') as fp:
+                fp.write('#!/bin/sh\n'
+                         f'exec {self.real_ssh} '
+                         f'-o ControlMaster=auto '
+                         f'-o ControlPath={self.ctrl_dir}/%C '
+                         f'-o ControlPersist={persist} "$@"\n')
+            os.chmod(wrapper, 0o755)
+            os.environ['PATH'] = self.prefix_path(os.environ.get('PATH', ''))
+            self.owner_pid = os.getpid()
+            if not self.exit_hook:
+                atexit.register(self.stop)
+                self.exit_hook = True
+        self.warm([host for host in remote if host not in self.hosts])
+        return True
+
+    def warm(self, hosts, max_workers=32):
+        """
+        Open the master connections to a set of hosts concurrently. A
+        host which cannot be reached, or whose host key is not already
+        known, is skipped; its commands will fail
+        (or succeed) exactly as they would without the pool.
+
+        :param hosts: A list of hostnames
+        :param max_workers: The number of connections opened at once
+        :return: None
+        """
+        if len(hosts) == 0:
+            return
+
+        def connect(host):
+            proc = subprocess.run(
+                [os.path.join(self.bin_dir, 'ssh'),
+                 '-o', 'BatchMode=yes', host, 'true'],
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL, check=False)
+            return host, proc.returncode
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for host, code in pool.map(connect, hosts):
+                if code == 0:
+                    self.hosts.add(host)
+
+    def prefix_path(self, path):
+        """
+        Put the ssh wrapper first in a PATH string
+
+        :param path: The PATH to modify
+        :return: The new PATH
+        """
+        if not self.active or self.in_path(path):
+            return path
+        if not path:
+            return self.bin_dir
+        return f'{self.bin_dir}:{path}'
+
+    def pool_env(self, env):
+        """
+        Put the ssh wrapper first in the PATH of an env
+
+        :param env: An env dict. It is not modified.
+        :return: A copy of env with the new PATH, or env itself if it
+        needs no change
+        """
+        if not self.active or env is None or 'PATH' not in env or \
+                self.in_path(env['PATH']):
+            return env
+        env = dict(env)
+        env['PATH'] = self.prefix_path(env['PATH'])
+        return env
+
+    def pool_exec_info(self, exec_info):
+        """
+        Make an Exec's env find the ssh wrapper first
+
+        :param exec_info: A jarvis_util ExecInfo. It is not modified.
+        :return: A copy of exec_info with pooled envs, or exec_info itself
+        if it needs no change
+        """
+        if not self.active or exec_info is None:
+            return exec_info
+        envs = {}
+        for key in ['env', 'basic_env']:
+            env = getattr(exec_info, key, None)
+            pooled = self.pool_env(env)
+            if pooled is not env:
+                envs[key] = pooled
+        if len(envs) == 0:
+            return exec_info
+        exec_info = copy.copy(exec_info)
+        for key, env in envs.items():
+            setattr(exec_info, key, env)
+        return exec_info
+
+    def in_path(self, path):
+        return self.active and path is not None and \
+            path.split(':')[0] == self.bin_dir
+
+    def stop(self):
+        """
+        Close every master connection and remove the wrapper. Only the
+        process which created the pool does this, so forked workers do
+        not close connections their parent is still using.
+
+        :return: None
+        """
+        if not self.active or os.getpid() != self.owner_pid:
+            return
+        for ctrl_path in glob.glob(os.path.join(self.ctrl_dir, '*')):
+            if ctrl_path == self.bin_dir:
+                continue
+            subprocess.run([self.real_ssh, '-o', f'ControlPath={ctrl_path}',
+                            '-O', 'exit', 'jarvis'],
+                           stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL, check=False)
+        path = os.environ.get('PATH', '').split(':')
+        os.environ['PATH'] = ':'.join([entry for entry in path
+                                       if entry != self.bin_dir])
+        shutil.rmtree(self.ctrl_dir, ignore_errors=True)
+        self.ctrl_dir = None
+        self.bin_dir = None
+        self.hosts = set()
+
+
+def pool_exec():
+    """
+    Route every jarvis_util Exec (including Mkdir, Rm, Kill, etc.)
+    through the ssh wrapper while the pool is active, even when the Exec
+    is given an env with its own PATH.
+
+    :return: None
+    """
+    from jarvis_util.shell.exec import Exec
+    if getattr(Exec.__init__, 'ssh_pooled', False):
+        return
+    orig_init = Exec.__init__
+
+    @functools.wraps(orig_init)
+    def __init__(self, cmd, exec_info=None, *args, **kwargs):
+        exec_info = SshPool.get_instance().pool_exec_info(exec_info)
+        return orig_init(self, cmd, exec_info, *args, **kwargs)
+    __init__.ssh_pooled = True
+    Exec.__init__ = __init__
@@ -0,0 +1,238 @@
+"""
+Benchmark the overhead of jarvis's own control plane (no cluster needed).
+
+Builds synthetic pipelines from the test_repo pkgs (first, second, third)
+and times CLI cold start, Pipeline.load/save/update, PkgArgParse menu
+parsing, pkg configuration, and the iterator's per-point overhead.
+The pipelines live in a temporary jarvis root which is removed when the
+benchmark ends and run on localhost only, so the user's pipelines,
+jarvis config, and hosts are untouched.
+
+Usage:
+    python3 test/bench/bench_control_plane.py --out base.json
+    (make a change)
+    python3 test/bench/bench_control_plane.py --out new.json \
+        --compare base.json
+
+With --compare, exits with code 1 if any benchmark's median got slower
+than --threshold times its median in the baseline.
+"""
+from jarvis_cd.basic.jarvis_manager import JarvisManager
+from jarvis_cd.basic.pkg import Pipeline, PipelineIterator, PkgArgParse
+from jarvis_util.util.hostfile import Hostfile
+import contextlib
+import tempfile
+import subprocess
+import statistics
+import argparse
+import platform
+import shutil
+import os
+import json
+import time
+import sys
+import io
+
+PKG_TYPES = ['first', 'second', 'third']
+
+
+def measure(fn, repeat):
+    """
+    Time a function
+
+    :param fn: A function taking no parameters
+    :param repeat: The number of times to call it
+    :return: Dict of timing statistics (seconds)
+    """
+    times = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+    return {
+        'median': statistics.median(times),
+        'min': min(times),
+        'mean': statistics.mean(times),
+        'repeat': repeat,
+    }
+
+
+def git_commit(root):
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=root,
+                              capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class ControlPlaneBench:
+    """
+    Builds the benchmark pipelines and runs every benchmark
+    """
+    def __init__(self, sizes, repeat):
+        self.jarvis = JarvisManager.get_instance()
+        self.sizes = sizes
+        self.repeat = repeat
+        self.results = {}
+        # Only set in memory, so the user's config is untouched. Saving is
+        # disabled so none of these changes can reach it.
+        self.jarvis.save = lambda: None
+        self.jarvis.add_repo(
+            f'{self.jarvis.jarvis_root}/test/unit/test_repo')
+        self.root = tempfile.mkdtemp(prefix='jarvis_bench_')
+        self.jarvis.config_dir = os.path.join(self.root, 'config')
+        self.jarvis.env_dir = os.path.join(self.jarvis.config_dir, 'env')
+        self.jarvis.private_dir = os.path.join(self.root, 'private')
+        self.jarvis.shared_dir = os.path.join(self.root, 'shared')
+        os.makedirs(self.jarvis.env_dir, exist_ok=True)
+        # Never ssh to (or create directories on) the user's hosts
+        self.jarvis.hostfile = Hostfile()
+
+    def record(self, name, fn, repeat=None):
+        self.results[name] = measure(fn, repeat or self.repeat)
+        print(f'{name:32} {self.results[name]["median"] * 1000:10.3f} ms',
+              file=sys.stderr)
+
+    def make_pipeline(self, pipeline_id, num_pkgs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            ppl = Pipeline().create(pipeline_id)
+            ppl.reset()
+            for i in range(num_pkgs):
+                pkg_type = PKG_TYPES[i % len(PKG_TYPES)]
+                ppl.append(pkg_type, f'{pkg_type}{i}', port=i)
+            ppl.save()
+        return ppl
+
+    def bench_cli(self):
+        jarvis_bin = shutil.which('jarvis')
+        cmd = [jarvis_bin] if jarvis_bin else \
+            [sys.executable, f'{self.jarvis.jarvis_root}/bin/jarvis']
+        # getcwd only reads the jarvis config, which the CLI loads from
+        # the real jarvis root
+        self.record('cli_cold_start',
+                    lambda: subprocess.run(cmd + ['getcwd'],
+                                           capture_output=True, check=True))
+
+    def bench_pipelines(self):
+        for size in self.sizes:
+            pipeline_id = f'bench_ppl_{size}'
+            self.record(f'create[{size}]',
+                        lambda: self.make_pipeline(pipeline_id, size),
+                        repeat=1)
+            self.record(f'load[{size}]',
+                        lambda: Pipeline().load(pipeline_id))
+            ppl = Pipeline().load(pipeline_id)
+            self.record(f'save[{size}]', ppl.save)
+            self.record(f'update[{size}]', ppl.update)
+
+    def bench_argparse(self):
+        ppl = Pipeline().load('bench_ppl_1')
+        pkg = ppl.sub_pkgs[0]
+        args = ['port=1', 'sleep=0', 'reinit=False']
+        self.record('configure_menu', pkg.configure_menu)
+        menu = pkg.configure_menu()
+        self.record('pkg_arg_parse',
+                    lambda: PkgArgParse(args=args, menu=menu))
+        self.record('pkg_configure', lambda: pkg.configure(port=1))
+
+    def bench_iterator(self):
+        pipeline_id = 'bench_ppl_iter'
+        ppl = self.make_pipeline(pipeline_id, len(PKG_TYPES))
+        ppl.config['iterator'] = {
+            'vars': {'first0.port': [1, 2, 3], 'second1.port': [4, 5, 6],
+                     'third2.port': [7, 8, 9]},
+            'loop': [['first0.port', 'second1.port'], ['third2.port']],
+            'repeat': 1,
+            'output': '$SHARED_DIR/output',
+        }
+        ppl.save()
+        with contextlib.redirect_stdout(io.StringIO()):
+            ppl.iterator = PipelineIterator(ppl)
+        points = list(enumerate(ppl.iterator.points()))
+
+        def run_point():
+            iter_count, pos = points.pop(0)
+            ppl._run_iter_point(ppl.iterator.seek(iter_count, pos))
+        self.record('iter_point', run_point,
+                    repeat=min(self.repeat, len(points)))
+
+    def run(self):
+        try:
+            self.bench_pipelines()
+            self.bench_cli()
+            self.bench_argparse()
+            self.bench_iterator()
+        finally:
+            shutil.rmtree(self.root, ignore_errors=True)
+        return {
+            'meta': {
+                'commit': git_commit(self.jarvis.jarvis_root),
+                'python': platform.python_version(),
+                'host': platform.node(),
+                'time': time.time(),
+                'sizes': self.sizes,
+            },
+            'results': self.results,
+        }
+
+
+def compare(results, baseline, threshold):
+    """
+    Print the change in median time of every benchmark
+
+    :param results: The current results
+    :param baseline: The baseline results
+    :param threshold: The slowdown ratio considered a regression
+    :return: List of regressed benchmark names
+    """
+    regressions = []
+    print(f'{"benchmark":32} {"base ms":>10} {"new ms":>10} {"ratio":>7}',
+          file=sys.stderr)
+    for name, stat in results['results'].items():
+        if name not in baseline['results']:
+            continue
+        base = baseline['results'][name]['median']
+        new = stat['median']
+        ratio = new / base if base else float('inf')
+        flag = ''
+        if ratio > threshold:
+            regressions.append(name)
+            flag = ' REGRESSION'
+        print(f'{name:32} {base * 1000:10.3f} {new * 1000:10.3f} '
+              f'{ratio:7.2f}{flag}', file=sys.stderr)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--out', default=None,
+                        help='Where to save the JSON results (stdout if unset)')
+    parser.add_argument('--compare', default=None,
+                        help='A previous JSON result to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='Slowdown ratio counted as a regression')
+    parser.add_argument('--sizes', default='1,10,50,200',
+                        help='Comma-separated synthetic pipeline sizes')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+    if 1 not in sizes:
+        sizes.insert(0, 1)
+    results = ControlPlaneBench(sizes, args.repeat).run()
+    text = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as fp:
+            fp.write(text)
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as fp:
+            baseline = json.load(fp)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
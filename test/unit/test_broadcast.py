@@ -0,0 +1,41 @@
+"""
+Test the config file broadcast planner
+"""
+from jarvis_cd.basic.broadcast import Broadcast
+from unittest import TestCase
+
+
+class TestBroadcast(TestCase):
+    """
+    Test tree planning and mode selection
+    """
+    def test_plan_tree(self):
+        hosts = [f'h{i}' for i in range(10)]
+        rounds = Broadcast.plan_tree(hosts, 1)
+        # Binomial: the number of holders doubles every round
+        self.assertEqual(len(rounds), 4)
+        self.assertEqual(rounds[0], [(None, ['h0'])])
+        self.assertEqual(rounds[1], [(None, ['h1']), ('h0', ['h2'])])
+        received = [host for cur_round in rounds
+                    for _, receivers in cur_round for host in receivers]
+        self.assertEqual(sorted(received), sorted(hosts))
+        for i, cur_round in enumerate(rounds):
+            holders = {None} | {host for prev in rounds[:i]
+                                for _, receivers in prev
+                                for host in receivers}
+            for sender, _ in cur_round:
+                self.assertIn(sender, holders)
+        self.assertEqual(len(Broadcast.plan_tree(range(124), 4)), 3)
+
+    def test_resolve_mode(self):
+        bcast = Broadcast(flat_max=2)
+        hosts = ['a', 'b', 'c']
+        self.assertEqual(bcast.resolve_mode(['/shared/x'], hosts,
+                                            stage_dir='/shared'), 'shared')
+        self.assertEqual(bcast.resolve_mode(['/private/x'], hosts[:2],
+                                            stage_dir='/shared'), 'flat')
+        self.assertEqual(bcast.resolve_mode(['/private/x'], hosts,
+                                            stage_dir='/shared'), 'shared')
+        self.assertEqual(bcast.resolve_mode(['/private/x'], hosts), 'tree')
+        with self.assertRaises(Exception):
+            bcast.resolve_mode(['/private/x'], hosts, 'shared')
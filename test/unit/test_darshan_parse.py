@@ -0,0 +1,95 @@
+"""
+Test finding and summarizing Darshan logs
+"""
+from builtin.builtin.darshan.parse import find_logs, parse_totals, summarize
+from unittest import TestCase
+import tempfile
+import time
+import os
+
+TOTALS = """# darshan log version: 3.41
+# compression method: ZLIB
+# exe: /usr/bin/ior -w -r
+# uid: 1000
+# jobid: 12
+# start_time: 1714644000
+# nprocs: 4
+# run time: 2.0000
+
+# *******************************************************
+# POSIX module data
+# *******************************************************
+total_POSIX_OPENS: 16
+total_POSIX_FILENOS: 0
+total_POSIX_READS: 64
+total_POSIX_WRITES: 64
+total_POSIX_SEEKS: 0
+total_POSIX_STATS: 4
+total_POSIX_BYTES_READ: 67108864
+total_POSIX_BYTES_WRITTEN: 67108864
+total_POSIX_SIZE_READ_1M_4M: 64
+total_POSIX_SIZE_WRITE_1M_4M: 64
+total_POSIX_F_OPEN_START_TIMESTAMP: 0.010000
+total_POSIX_F_READ_TIME: 0.125000
+total_POSIX_F_WRITE_TIME: 0.250000
+total_POSIX_F_META_TIME: 0.010000
+
+# *******************************************************
+# MPI-IO module data
+# *******************************************************
+total_MPIIO_COLL_WRITES: 64
+total_MPIIO_BYTES_WRITTEN: 67108864
+total_MPIIO_F_WRITE_TIME: 0.300000
+
+# *******************************************************
+# STDIO module data
+# *******************************************************
+total_STDIO_OPENS: 2
+total_STDIO_WRITES: 8
+total_STDIO_BYTES_WRITTEN: 2048
+total_STDIO_F_WRITE_TIME: 0.001000
+total_STDIO_F_META_TIME: 0.002000
+"""
+
+
+class TestDarshanParse(TestCase):
+    """
+    Test log discovery and the reduction of darshan-parser --total
+    """
+    def test_find_logs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            names = ['user_ior_id1-100_5-2-36000-1.darshan',
+                     'user_ior_id12-101_5-2-36000-2.darshan',
+                     'user_ior_id1-102_5-2-36000-3.darshan_partial',
+                     'user_ior_id1-103_5-2-36000-4.darshan']
+            for name in names:
+                with open(os.path.join(tmp, name), 'w', encoding='utf-8'):
+                    pass
+            old = os.path.join(tmp, names[3])
+            os.utime(old, (time.time() - 3600, time.time() - 3600))
+            since = time.time() - 60
+            self.assertEqual(find_logs(tmp, since),
+                             [os.path.join(tmp, names[i]) for i in [0, 1]])
+            self.assertEqual(find_logs(tmp, since, 1),
+                             [os.path.join(tmp, names[0])])
+            self.assertEqual(len(find_logs(tmp)), 3)
+
+    def test_summarize(self):
+        totals = parse_totals(TOTALS)
+        self.assertEqual(totals['POSIX_OPENS'], 16)
+        self.assertEqual(totals['MPIIO_F_WRITE_TIME'], .3)
+        stats = summarize([totals, totals])
+        self.assertEqual(stats['logs'], 2)
+        self.assertEqual(stats['posix_bytes_read'], 2 * 67108864)
+        self.assertEqual(stats['mpiio_coll_writes'], 128)
+        self.assertEqual(stats['posix_size_write_1m_4m'], 128)
+        self.assertEqual(stats['bytes_written'], 2 * (67108864 + 2048))
+        # MPI-IO time is not added to the POSIX time it includes
+        self.assertAlmostEqual(stats['write_time'], 2 * .251)
+        self.assertAlmostEqual(stats['meta_time'], 2 * .012)
+        self.assertAlmostEqual(stats['io_time'], 2 * .376)
+
+    def test_empty(self):
+        stats = summarize([])
+        self.assertEqual(stats['logs'], 0)
+        self.assertEqual(stats['io_time'], 0)
@@ -0,0 +1,105 @@
+"""
+Test parsing of DLIO metrics and dftracer traces
+"""
+from builtin.builtin.dlio_benchmark.parse import Histogram, read_events, \
+    find_traces, summarize_traces, parse_output
+from unittest import TestCase
+import tempfile
+import gzip
+import os
+
+SUMMARY = """{
+    "num_accelerators": 8,
+    "num_hosts": 1,
+    "hostname": "node1",
+    "metric": {
+        "train_au_percentage": [98.1, 99.2],
+        "train_au_mean_percentage": 98.65,
+        "train_au_meet_expectation": "success",
+        "train_au_stdev_percentage": 0.55,
+        "train_throughput_samples_per_second": [30.1, 31.2],
+        "train_throughput_mean_samples_per_second": 30.65,
+        "train_throughput_stdev_samples_per_second": 0.55,
+        "train_io_mean_MB_per_second": 4281.3,
+        "train_io_stdev_MB_per_second": 76.9
+    },
+    "start": "2024-05-02T10:00:00.000000",
+    "end": "2024-05-02T10:05:00.000000",
+    "epochs": 2
+}
+"""
+
+PER_EPOCH_STATS = """{
+    "1": {
+        "start": "2024-05-02T10:00:01.000000",
+        "end": "2024-05-02T10:02:26.210000",
+        "duration": "145.21",
+        "block1": {"start": "2024-05-02T10:00:01.000000", "duration": "145.20"}
+    },
+    "2": {
+        "start": "2024-05-02T10:02:27.000000",
+        "end": "2024-05-02T10:04:42.000000",
+        "duration": "135.00"
+    }
+}
+"""
+
+TRACE = """[
+{"id":1,"name":"open64","cat":"POSIX","pid":1234,"tid":1234,"ts":1714644000000000,"dur":25,"ph":"X","args":{"hhash":"a1","fhash":"b2"}}
+{"id":2,"name":"read","cat":"POSIX","pid":1234,"tid":1234,"ts":1714644000000030,"dur":1500,"ph":"X","args":{"size":1048576}},
+{"id":3,"name":"read","cat":"POSIX","pid":1234,"tid":1234,"ts":1714644000001600,"dur":3,"ph":"X","args":{"size":4096}}
+{"id":4,"name":"TorchDataset.__getitem__","cat":"dlio_benchmark","pid":1234,"tid":1234,"ts":1714644000000000,"dur":2000,"ph":"X"}
+{"id":5,"name":"HH","cat":"dftracer","pid":1234,"tid":0,"ph":"M","args":{"name":"a1","value":"node1"}}
+"""
+
+
+class TestDlioBenchmarkParse(TestCase):
+    """
+    Test DLIO's output folder and streamed trace histograms
+    """
+    def test_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, 'summary.json'), 'w',
+                      encoding='utf-8') as fp:
+                fp.write(SUMMARY)
+            with open(os.path.join(tmp, 'per_epoch_stats.json'), 'w',
+                      encoding='utf-8') as fp:
+                fp.write(PER_EPOCH_STATS)
+            stats = parse_output(tmp)
+        self.assertEqual(stats['train_au_mean_percentage'], 98.65)
+        self.assertEqual(stats['train_io_mean_MB_per_second'], 4281.3)
+        self.assertEqual(stats['epochs'], 2)
+        self.assertNotIn('train_au_percentage', stats)
+        self.assertNotIn('train_au_meet_expectation', stats)
+        self.assertAlmostEqual(stats['epoch_time'], 140.105)
+        self.assertEqual(stats['epoch_time_max'], 145.21)
+
+    def test_histogram(self):
+        hist = Histogram()
+        for dur in [0.5, 3, 5, 100] + [2000] * 96:
+            hist.add(dur)
+        stats = hist.to_dict()
+        self.assertEqual(stats['count'], 100)
+        self.assertEqual(stats['buckets_us'],
+                         {1: 1, 4: 1, 8: 1, 128: 1, 2048: 96})
+        self.assertEqual(stats['p50_us'], 2000)
+        self.assertEqual(hist.percentile(3), 8)
+        self.assertEqual(stats['max_us'], 2000)
+
+    def test_traces(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, 'trace-1.pfw'), 'w',
+                      encoding='utf-8') as fp:
+                fp.write(TRACE)
+            with gzip.open(os.path.join(tmp, 'trace-2.pfw.gz'), 'wt',
+                           encoding='utf-8') as fp:
+                fp.write(TRACE)
+            traces = find_traces(tmp)
+            self.assertEqual(len(traces), 2)
+            self.assertEqual(len(list(read_events(traces[1]))), 5)
+            hists = summarize_traces(traces, ['POSIX'])
+            all_hists = summarize_traces(traces)
+        self.assertEqual(sorted(hists), ['open64', 'read'])
+        self.assertEqual(hists['read'].count, 4)
+        self.assertEqual(hists['read'].total, 3006)
+        self.assertIn('TorchDataset.__getitem__', all_hists)
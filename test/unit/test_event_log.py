@@ -0,0 +1,64 @@
+"""
+Test the pipeline lifecycle event log
+"""
+from jarvis_cd.basic.event_log import EventLog, load_events, to_chrome_trace
+from unittest import TestCase
+import tempfile
+import os
+
+
+class TestEventLog(TestCase):
+    """
+    Test event spans and the Chrome trace conversion
+    """
+    def test_span(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'events.jsonl')
+            events = EventLog(path)
+            events.iter_id = '0-0'
+            with events.span('start', 'pipeline'):
+                with events.span('start', 'pkg', 'redis') as fields:
+                    self.assertEqual(events.cur_pkg_id(), 'redis')
+                    fields['exit_code'] = 0
+                self.assertIsNone(events.cur_pkg_id())
+            with self.assertRaises(RuntimeError):
+                with events.span('stop', 'pkg', 'redis'):
+                    raise RuntimeError('stop failed')
+            with open(path, 'a', encoding='utf-8') as fp:
+                fp.write('{"ts": 1')
+            loaded = load_events([path])
+        self.assertEqual(len(loaded), 3)
+        outer, inner, stop = loaded
+        self.assertEqual(outer['pkg_id'], None)
+        self.assertEqual(inner['pkg_id'], 'redis')
+        self.assertEqual(inner['exit_code'], 0)
+        self.assertEqual(inner['iter'], '0-0')
+        self.assertGreaterEqual(outer['dur'], inner['dur'])
+        self.assertIn('RuntimeError', stop['error'])
+
+    def test_missing_log(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            events = load_events([os.path.join(tmp, 'events.jsonl')])
+        self.assertEqual(events, [])
+        self.assertEqual(to_chrome_trace(events), {'traceEvents': []})
+
+    def test_chrome_trace(self):
+        events = [
+            {'ts': 10, 'dur': 2, 'name': 'start', 'cat': 'pipeline',
+             'pkg_id': None, 'iter': None, 'host': 'h', 'pid': 1, 'tid': 5},
+            {'ts': 10.5, 'dur': 1, 'name': 'exec', 'cat': 'exec',
+             'pkg_id': 'ior', 'iter': None, 'host': 'h', 'pid': 1, 'tid': 5,
+             'cmd': 'mpiexec -n 4 ior'},
+            {'ts': 11, 'dur': None, 'name': 'timeout', 'cat': 'pkg',
+             'pkg_id': 'ior', 'iter': None, 'host': 'h', 'pid': 1, 'tid': 5},
+        ]
+        trace = to_chrome_trace(events)['traceEvents']
+        lanes = [event['args']['name'] for event in trace
+                 if event['ph'] == 'M']
+        self.assertEqual(lanes, ['pipeline', 'ior'])
+        spans = [event for event in trace if event['ph'] != 'M']
+        self.assertEqual(spans[0]['ts'], 0)
+        self.assertEqual(spans[0]['dur'], 2e6)
+        self.assertEqual(spans[1]['name'], 'mpiexec')
+        self.assertEqual(spans[1]['ts'], .5e6)
+        self.assertEqual(spans[2]['ph'], 'i')
@@ -0,0 +1,71 @@
+"""
+Test parsing and aggregation of filebench IO Summaries
+"""
+from builtin.builtin.filebench.parse import parse_summary, aggregate
+from unittest import TestCase
+
+# Filebench 1.5
+FILEBENCH_1_5 = """
+Filebench Version 1.5-alpha3
+0.000: Allocated 173MB of shared memory
+0.002: File-server Version 3.0 personality successfully loaded
+0.002: Populating and pre-allocating filesets
+0.130: bigfileset populated: 10000 files, avg. dir. width = 20, avg. dir. depth = 3.1, 0 leafdirs, 1240.757MB total size
+0.131: Running...
+60.140: Run took 60 seconds...
+60.145: Per-Operation Breakdown
+statfile1            12345ops      205ops/s   0.0mb/s    0.107ms/op [0.003ms - 10.120ms]
+readfile1            12345ops      205ops/s  27.1mb/s    1.003ms/op [0.008ms - 80.551ms]
+60.145: IO Summary: 135795 ops 2262.945 ops/s 205/411 rd/wr  53.2mb/s 22.103ms/op
+60.145: Shutting down processes
+"""
+
+# Older filebench versions
+FILEBENCH_1_4 = """
+ 1234: 60.123: IO Summary: 100000 ops, 1666.7 ops/s, (151/303 r/w),  40.1mb/s,    350us cpu/op,  30.0ms latency
+ 1234: 60.124: Shutting down processes
+"""
+
+
+class TestFilebenchParse(TestCase):
+    """
+    Test both IO Summary formats and the combination of hosts
+    """
+    def test_parse_1_5(self):
+        summary = parse_summary(FILEBENCH_1_5)
+        self.assertEqual(summary, {
+            'ops': 135795,
+            'ops_per_sec': 2262.945,
+            'reads_per_sec': 205,
+            'writes_per_sec': 411,
+            'mb_per_sec': 53.2,
+            'latency_ms': 22.103,
+        })
+
+    def test_parse_1_4(self):
+        summary = parse_summary(FILEBENCH_1_4)
+        self.assertEqual(summary['ops'], 100000)
+        self.assertEqual(summary['ops_per_sec'], 1666.7)
+        self.assertEqual(summary['writes_per_sec'], 303)
+        # The cpu time per op is not the latency
+        self.assertEqual(summary['latency_ms'], 30)
+
+    def test_no_summary(self):
+        self.assertIsNone(parse_summary('filebench: command not found'))
+
+    def test_aggregate(self):
+        fast = parse_summary(FILEBENCH_1_5)
+        slow = parse_summary(FILEBENCH_1_4)
+        stats, stragglers = aggregate(
+            {'h1': fast, 'h2': fast, 'h3': slow, 'h4': None})
+        self.assertEqual(stats['hosts'], 3)
+        self.assertEqual(stats['ops'], 2 * 135795 + 100000)
+        self.assertAlmostEqual(stats['ops_per_sec'],
+                               2 * 2262.945 + 1666.7)
+        self.assertEqual(stats['ops_per_sec_min'], 1666.7)
+        self.assertAlmostEqual(
+            stats['latency_ms'],
+            (2 * 135795 * 22.103 + 100000 * 30) / (2 * 135795 + 100000))
+        self.assertEqual(stats['latency_ms_max'], 30)
+        self.assertEqual(stragglers, ['h3'])
+        self.assertEqual(stats['stragglers'], 1)
@@ -0,0 +1,102 @@
+"""
+Test parsing of IOR results
+"""
+from builtin.builtin.ior.parse import parse_json, parse_text, summarize
+from unittest import TestCase
+
+JSON_SUMMARY = """
+{
+  "Version": "3.3.0",
+  "Began": "Thu May  2 10:00:00 2024",
+  "Command line": "ior -w -r -i 2 -O summaryFormat=JSON",
+  "tests": [
+    {
+      "TestID": 0,
+      "StartTime": "Thu May  2 10:00:00 2024",
+      "Parameters": {"blockSize": 1048576, "transferSize": 262144},
+      "Results": [
+        [
+          {"access": "write", "bwMiB": 1200.0, "blockKiB": 1024.0,
+           "xferKiB": 256.0, "iops": 4800.0, "latency": 0.0002,
+           "openTime": 0.0001, "wrRdTime": 0.8, "closeTime": 0.0001,
+           "totalTime": 0.81},
+          {"access": "read", "bwMiB": 2400.0, "blockKiB": 1024.0,
+           "xferKiB": 256.0, "iops": 9600.0, "latency": 0.0001,
+           "openTime": 0.0001, "wrRdTime": 0.4, "closeTime": 0.0001,
+           "totalTime": 0.41}
+        ],
+        [
+          {"access": "write", "bwMiB": 1000.0, "blockKiB": 1024.0,
+           "xferKiB": 256.0, "iops": 4000.0, "latency": 0.0003,
+           "openTime": 0.0001, "wrRdTime": 1.0, "closeTime": 0.0001,
+           "totalTime": 1.01},
+          {"access": "read", "bwMiB": 2000.0, "blockKiB": 1024.0,
+           "xferKiB": 256.0, "iops": 8000.0, "latency": 0.0001,
+           "openTime": 0.0001, "wrRdTime": 0.5, "closeTime": 0.0001,
+           "totalTime": 0.51}
+        ]
+      ]
+    }
+  ],
+  "summary": []
+}
+"""
+
+TEXT_OUTPUT = """
+Options:
+api                 : POSIX
+xfersize            : 256 KiB
+
+Results:
+
+access    bw(MiB/s)  IOPS       Latency(s)  block(KiB) xfer(KiB)  open(s)    wr/rd(s)   close(s)   total(s)   iter
+------    ---------  ----       ----------  ---------- ---------  --------   --------   --------   --------   ----
+write     1200.00    4800.00    0.000200    1024.00    256.00     0.000100   0.800000   0.000100   0.810000   0
+read      2400.00    9600.00    0.000100    1024.00    256.00     0.000100   0.400000   0.000100   0.410000   0
+remove    -          -          -           -          -          -          -          -          0.001200   0
+Max Write: 1200.00 MiB/sec (1258.29 MB/sec)
+Max Read:  2400.00 MiB/sec (2516.58 MB/sec)
+
+Summary of all tests:
+Operation   Max(MiB)   Min(MiB)  Mean(MiB)     StdDev   Max(OPs)   Min(OPs)  Mean(OPs)     StdDev    Mean(s) Stonewall(s) Stonewall(MiB) Test# #Tasks tPN reps fPP reord reordoff reordrand seed segcnt   blksiz    xsize aggs(MiB)   API RefNum
+write        1200.00    1200.00    1200.00       0.00    4800.00    4800.00    4800.00       0.00    0.81000         NA            NA     0      1   1    1   0     0        1         0    0      1  1048576   262144       1.0 POSIX      0
+"""
+
+# IOR 3.0 prints neither IOPS nor latency
+OLD_TEXT_OUTPUT = """
+access    bw(MiB/s)  block(KiB) xfer(KiB)  open(s)    wr/rd(s)   close(s)   total(s)   iter
+------    ---------  ---------- ---------  --------   --------   --------   --------   ----
+write     1200.00    1024.00    256.00     0.000100   0.800000   0.000100   0.810000   0
+read      2400.00    1024.00    256.00     0.000100   0.400000   0.000100   0.410000   0
+
+Summary:
+	api                = POSIX
+"""
+
+
+class TestIorParse(TestCase):
+    """
+    Test the JSON summary and both layouts of the text results table
+    """
+    def test_json(self):
+        stats = summarize(parse_json(JSON_SUMMARY))
+        self.assertEqual(stats['write_bw'], 1100)
+        self.assertEqual(stats['write_bw_min'], 1000)
+        self.assertEqual(stats['write_bw_max'], 1200)
+        self.assertEqual(stats['read_iops'], 8800)
+        self.assertAlmostEqual(stats['write_latency_max'], 0.0003)
+
+    def test_text(self):
+        stats = summarize(parse_text(TEXT_OUTPUT))
+        self.assertEqual(stats['write_bw'], 1200)
+        self.assertEqual(stats['read_bw'], 2400)
+        self.assertEqual(stats['read_iops'], 9600)
+        self.assertAlmostEqual(stats['write_latency'], 0.0002)
+        self.assertNotIn('remove_bw', stats)
+
+    def test_old_text(self):
+        stats = summarize(parse_text(OLD_TEXT_OUTPUT))
+        self.assertEqual(stats['write_bw'], 1200)
+        self.assertEqual(stats['read_bw'], 2400)
+        self.assertNotIn('write_iops', stats)
+        self.assertNotIn('write_latency', stats)
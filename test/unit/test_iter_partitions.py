@@ -0,0 +1,134 @@
+"""
+Test running iterator points over disjoint host partitions
+"""
+from jarvis_cd.basic.pkg import Pipeline, PipelineIterator, PipelineZip
+from jarvis_util.util.hostfile import Hostfile
+from unittest import TestCase
+from unittest.mock import patch
+from types import SimpleNamespace
+import tempfile
+import queue
+import os
+
+
+class FakePkg:
+    def __init__(self, pkg_id):
+        self.pkg_id = pkg_id
+        self.iter_diff = 0
+
+
+def make_iterator():
+    """
+    An iterator over a.x in [1, 2] and b.y in [p, q, r]
+    """
+    it = PipelineIterator.__new__(PipelineIterator)
+    it.fors = []
+    it.cur_iters = []
+    it.cur_pos = []
+    it.cur_pos_diff = []
+    it.conf_dict = {}
+    it.linear_conf_dict = {}
+    it.iter_count = 0
+    it.max_iter_count = 0
+    pkg_a = FakePkg('a')
+    pkg_b = FakePkg('b')
+    for pkg, var_name, var_vals in [(pkg_a, 'x', [1, 2]),
+                                    (pkg_b, 'y', ['p', 'q', 'r'])]:
+        it.fors.append(PipelineZip())
+        it.add_to_for_zip(pkg, var_name, var_vals)
+    return it, pkg_a, pkg_b
+
+
+def make_pipeline():
+    ppl = Pipeline.__new__(Pipeline)
+    ppl.exit_code = 0
+    ppl.log = lambda *args, **kwargs: None
+    return ppl
+
+
+def report_or_die(part_id, hostfile, points, results):
+    # Partition 1 is killed before it can report
+    if part_id == 1:
+        os._exit(9)
+    results.put((part_id, [(iter_count, [{'point': iter_count}])
+                           for iter_count, _ in points], 0))
+
+
+class TestIterPartitions(TestCase):
+    """
+    Test splitting hosts, visiting points, and collecting workers
+    """
+    def test_split_hostfile(self):
+        ppl = make_pipeline()
+        ppl.jarvis = SimpleNamespace(
+            hostfile=Hostfile(all_hosts=[f'h{i}' for i in range(7)]))
+        with tempfile.TemporaryDirectory() as tmp:
+            ppl.config_dir = tmp
+            parts = ppl.split_hostfile(3)
+            self.assertEqual([part.hosts for part in parts],
+                             [['h0', 'h1'], ['h2', 'h3'], ['h4', 'h5']])
+            with self.assertRaises(Exception):
+                ppl.split_hostfile(8)
+
+    def test_points_match_begin_next(self):
+        it, _, _ = make_iterator()
+        self.assertEqual(it.points(), [[0, 0], [0, 1], [0, 2],
+                                       [1, 0], [1, 1], [1, 2]])
+        visited = []
+        conf = it.begin()
+        while conf is not None:
+            visited.append(dict(it.linear_conf_dict))
+            conf = it.next()
+        for iter_count, pos in enumerate(it.points()):
+            fresh, _, _ = make_iterator()
+            fresh.seek(iter_count, pos)
+            self.assertEqual(fresh.linear_conf_dict, visited[iter_count])
+
+    def test_seek(self):
+        it, pkg_a, pkg_b = make_iterator()
+        conf = it.seek(4, [1, 1])
+        self.assertEqual(conf[pkg_a], {'x': 2})
+        self.assertEqual(conf[pkg_b], {'y': 'q'})
+        self.assertEqual(it.iter_count, 4)
+        self.assertEqual(it.max_iter_count, 6)
+        self.assertEqual(it.linear_conf_dict, {'a.x': 2, 'b.y': 'q'})
+        # Only pkgs whose values changed are marked for rerun
+        it.seek(5, [1, 2], prev_pos=[1, 1])
+        self.assertEqual((pkg_a.iter_diff, pkg_b.iter_diff), (0, 1))
+
+    def test_dead_worker(self):
+        ppl = make_pipeline()
+        ppl.split_hostfile = lambda partitions: [
+            Hostfile(all_hosts=['h1']), Hostfile(all_hosts=['h2'])]
+        ppl.iterator = SimpleNamespace(points=lambda: [[0], [1], [2]],
+                                       stats=[])
+        ppl._iter_worker = report_or_die
+        ppl._run_iter_partitioned(2, poll=.05)
+        self.assertEqual(ppl.iterator.stats, [{'point': 0}, {'point': 2}])
+        self.assertEqual(ppl.exit_code, 1)
+
+    def test_failed_partition_is_destroyed(self):
+        ppl = make_pipeline()
+        ppl.jarvis = SimpleNamespace(hostfile=None)
+        ppl.global_id = 'ppl'
+        ppl.iterator = SimpleNamespace(iter_out='/tmp/iter_out')
+        ppl.event_log = lambda: None
+        part = SimpleNamespace(destroyed=False, update=lambda: None)
+
+        def destroy():
+            part.destroyed = True
+
+        def fail(conf_dict):
+            raise RuntimeError('point failed')
+        part.destroy = destroy
+        part._run_iter_point = fail
+        ppl.copy = lambda pipeline_id: part
+        results = queue.Queue()
+        with patch('jarvis_cd.basic.pkg.PipelineIterator') as iterator:
+            iterator.return_value = SimpleNamespace(
+                seek=lambda *args: {}, stats=[])
+            with self.assertRaises(RuntimeError):
+                ppl._iter_worker(0, Hostfile(all_hosts=['h1']),
+                                 [(0, [0])], results)
+        self.assertTrue(part.destroyed)
+        self.assertEqual(results.get_nowait(), (0, [], 1))
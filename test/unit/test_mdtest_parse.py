@@ -0,0 +1,85 @@
+"""
+Test parsing of mdtest's rate summary
+"""
+from builtin.builtin.mdtest.parse import parse_rates
+from unittest import TestCase
+
+# mdtest 3.x (from the IOR repository)
+MDTEST_3 = """
+-- started at 05/02/2024 10:00:00 --
+
+mdtest-3.3.0 was launched with 4 total task(s) on 1 node(s)
+Command line used: mdtest '-n' '1000' '-F' '-i' '1'
+Path: /tmp/mdtest
+
+4 tasks, 4000 files
+
+SUMMARY rate: (of 1 iterations)
+   Operation                     Max            Min           Mean        Std Dev
+   ---------                     ---            ---           ----        -------
+   File creation             :      34567.891      30000.000      32283.946       2283.946
+   File stat                 :     145678.912     145678.912     145678.912          0.000
+   File read                 :      56789.123      56789.123      56789.123          0.000
+   File removal              :      45678.912      45678.912      45678.912          0.000
+   Tree creation             :       1234.567       1234.567       1234.567          0.000
+   Tree removal              :        234.567        234.567        234.567          0.000
+   Directory rename          :          0.000          0.000          0.000          0.000
+SUMMARY time: (of 1 iterations)
+   Operation                     Max            Min           Mean        Std Dev
+   ---------                     ---            ---           ----        -------
+   File creation             :          0.133          0.116          0.124          0.009
+   File stat                 :          0.027          0.027          0.027          0.000
+   Tree creation             :          0.001          0.001          0.001          0.000
+-- finished at 05/02/2024 10:00:01 --
+"""
+
+# mdtest 1.9 prints a single table of rates
+MDTEST_1_9 = """
+-- started at 05/02/2024 10:00:00 --
+
+mdtest-1.9.3 was launched with 4 total task(s) on 1 node(s)
+Command line used: mdtest -n 1000 -i 1
+Path: /tmp
+FS: 100.0 GiB   Used FS: 10.0%   Inodes: 6.2 Mi   Used Inodes: 1.0%
+
+4 tasks, 4000 files/directories
+
+SUMMARY: (of 1 iterations)
+   Operation                      Max            Min           Mean        Std Dev
+   ---------                      ---            ---           ----        -------
+   Directory creation:      11891.434      11891.434      11891.434          0.000
+   Directory stat    :     140531.240     140531.240     140531.240          0.000
+   Directory removal :      21470.117      21470.117      21470.117          0.000
+   File creation     :      15127.498      15127.498      15127.498          0.000
+   File stat         :     144363.227     144363.227     144363.227          0.000
+   File read         :      52437.908      52437.908      52437.908          0.000
+   File removal      :      19864.583      19864.583      19864.583          0.000
+   Tree creation     :       2473.057       2473.057       2473.057          0.000
+   Tree removal      :        891.113        891.113        891.113          0.000
+
+-- finished at 05/02/2024 10:00:02 --
+"""
+
+
+class TestMdtestParse(TestCase):
+    """
+    Test the rate tables of mdtest 3.x and 1.9
+    """
+    def test_mdtest_3(self):
+        stats = parse_rates(MDTEST_3)
+        self.assertAlmostEqual(stats['file_create'], 32283.946)
+        self.assertAlmostEqual(stats['file_create_min'], 30000)
+        self.assertAlmostEqual(stats['file_create_max'], 34567.891)
+        self.assertAlmostEqual(stats['tree_remove'], 234.567)
+        # Skipped operations and the time table are not rates
+        self.assertNotIn('dir_rename', stats)
+        self.assertNotIn('dir_create', stats)
+
+    def test_mdtest_1_9(self):
+        stats = parse_rates(MDTEST_1_9)
+        self.assertAlmostEqual(stats['dir_create'], 11891.434)
+        self.assertAlmostEqual(stats['file_read'], 52437.908)
+        self.assertEqual(len(stats), 27)
+
+    def test_no_summary(self):
+        self.assertEqual(parse_rates('mdtest: command not found\n'), {})
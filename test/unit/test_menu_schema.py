@@ -0,0 +1,50 @@
+"""
+Test configure menu validation and conversion
+"""
+from jarvis_cd.basic.menu_schema import MenuSchema
+from unittest import TestCase
+
+
+class TestMenuSchema(TestCase):
+    """
+    Test MenuSchema against the option types used by pkg menus
+    """
+    def setUp(self):
+        self.schema = MenuSchema([
+            {'name': 'nprocs', 'type': int, 'default': 1},
+            {'name': 'write', 'type': bool, 'default': True},
+            {'name': 'api', 'type': str, 'default': 'posix',
+             'choices': ['posix', 'mpiio'], 'aliases': ['a']},
+            {'name': 'devices', 'type': list, 'default': [],
+             'args': [{'name': 'type', 'type': str},
+                      {'name': 'count', 'type': int}]},
+            {'name': 'stdout', 'type': str, 'default': None},
+        ])
+
+    def test_convert(self):
+        parsed = self.schema.parse({
+            'nprocs': '4', 'write': 'false', 'a': 'mpiio',
+            'devices': '[[ssd, "2"]]', 'stdout': '',
+        })
+        self.assertEqual(parsed, {'nprocs': 4, 'write': False,
+                                  'api': 'mpiio',
+                                  'devices': [['ssd', 2]],
+                                  'stdout': None})
+        parsed = self.schema.parse({'nprocs': 8, 'devices': [('nvme', 1)]})
+        self.assertEqual(parsed, {'nprocs': 8, 'devices': [['nvme', 1]]})
+
+    def test_invalid(self):
+        with self.assertRaises(Exception):
+            self.schema.parse({'missing': 1})
+        with self.assertRaises(Exception):
+            self.schema.parse({'nprocs': 'four'})
+        with self.assertRaises(Exception):
+            self.schema.parse({'api': 'hdf5'})
+        with self.assertRaises(Exception):
+            self.schema.parse({'write': 'maybe'})
+
+    def test_defaults(self):
+        defaults = self.schema.defaults()
+        self.assertEqual(defaults['nprocs'], 1)
+        defaults['devices'].append(['ssd', 1])
+        self.assertEqual(self.schema.defaults()['devices'], [])
@@ -0,0 +1,69 @@
+"""
+Test the pkg dependency graph scheduler
+"""
+from jarvis_cd.basic.pkg_dag import PkgDag
+from unittest import TestCase
+import threading
+
+
+class TestPkgDag(TestCase):
+    """
+    Test PkgDag ordering and concurrency
+    """
+    def run_dag(self, dag, reverse=False, max_workers=1):
+        order = []
+        lock = threading.Lock()
+
+        def fn(pkg_id):
+            with lock:
+                order.append(pkg_id)
+        dag.run(fn, reverse=reverse, max_workers=max_workers)
+        return order
+
+    def test_default_order(self):
+        dag = PkgDag(['first', 'second', 'third'])
+        self.assertEqual(self.run_dag(dag), ['first', 'second', 'third'])
+        self.assertEqual(self.run_dag(dag, reverse=True),
+                         ['third', 'second', 'first'])
+        self.assertEqual(self.run_dag(dag, max_workers=3),
+                         ['first', 'second', 'third'])
+
+    def test_concurrent(self):
+        dag = PkgDag(['redis', 'pymonitor', 'ior'],
+                     {'redis': [], 'pymonitor': [],
+                      'ior': ['redis', 'pymonitor']})
+        barrier = threading.Barrier(2, timeout=5)
+        order = []
+
+        def fn(pkg_id):
+            if pkg_id != 'ior':
+                # Both services must be running at the same time
+                barrier.wait()
+            order.append(pkg_id)
+        dag.run(fn, max_workers=3)
+        self.assertEqual(order[-1], 'ior')
+        order.clear()
+        barrier.reset()
+        dag.run(fn, reverse=True, max_workers=3)
+        self.assertEqual(order[0], 'ior')
+
+    def test_barrier(self):
+        dag = PkgDag(['a', 'interceptor', 'b', 'c'],
+                     {'a': [], 'b': [], 'c': []},
+                     {'interceptor'})
+        order = self.run_dag(dag, max_workers=4)
+        self.assertEqual(order[:2], ['a', 'interceptor'])
+        self.assertEqual(set(order[2:]), {'b', 'c'})
+
+    def test_errors(self):
+        with self.assertRaises(Exception):
+            PkgDag(['a', 'b'], {'a': ['b'], 'b': ['a']})
+        with self.assertRaises(Exception):
+            PkgDag(['a', 'b'], {'a': ['missing']})
+
+        def fn(pkg_id):
+            if pkg_id == 'a':
+                raise RuntimeError('failed to start')
+        dag = PkgDag(['a', 'b', 'c'], {'a': [], 'b': [], 'c': ['a']})
+        with self.assertRaises(RuntimeError):
+            dag.run(fn, max_workers=3)
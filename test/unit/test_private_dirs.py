@@ -0,0 +1,51 @@
+"""
+Test the cache of created private directories
+"""
+from jarvis_cd.basic.jarvis_manager import JarvisManager
+from jarvis_cd.basic.pkg import Pipeline, SimplePkg
+from jarvis_util.util.hostfile import Hostfile
+from unittest import TestCase
+from unittest.mock import patch
+from types import SimpleNamespace
+import tempfile
+
+
+def make_jarvis():
+    jarvis = JarvisManager.__new__(JarvisManager)
+    jarvis.private_dirs_made = set()
+    jarvis.hostfile = Hostfile(all_hosts=['h1', 'h2'])
+    return jarvis
+
+
+class TestPrivateDirs(TestCase):
+    """
+    Test that removed private directories are created again
+    """
+    def test_forget(self):
+        jarvis = make_jarvis()
+        hosts = ('h1',)
+        jarvis.private_dirs_made.update({('/p/ppl', hosts),
+                                         ('/p/ppl/ior', hosts),
+                                         ('/p/ppl2', hosts)})
+        jarvis.forget_private_dirs('/p/ppl/')
+        self.assertEqual(jarvis.private_dirs_made, {('/p/ppl2', hosts)})
+        jarvis.forget_private_dirs()
+        self.assertEqual(jarvis.private_dirs_made, set())
+
+    def test_recreated_after_destroy(self):
+        jarvis = make_jarvis()
+        pkg = SimpleNamespace(private_dir='/p/ppl/ior', jarvis=jarvis)
+        with patch('jarvis_cd.basic.pkg.Mkdir') as mkdir, \
+                patch('jarvis_cd.basic.pkg.PsshExecInfo'):
+            SimplePkg.make_private_dir(pkg)
+            SimplePkg.make_private_dir(pkg)
+            self.assertEqual(mkdir.call_count, 1)
+            with tempfile.TemporaryDirectory() as tmp:
+                ppl = Pipeline.__new__(Pipeline)
+                ppl.jarvis = jarvis
+                ppl.sub_pkgs = []
+                ppl.config_dir = tmp
+                ppl.private_dir = '/p/ppl'
+                ppl.destroy()
+            SimplePkg.make_private_dir(pkg)
+            self.assertEqual(mkdir.call_count, 2)
@@ -0,0 +1,73 @@
+"""
+Test the lifecycle phase profiler
+"""
+from jarvis_cd.basic.profiler import Profiler
+from unittest import TestCase
+from concurrent.futures import ThreadPoolExecutor
+import tempfile
+import pstats
+import os
+
+
+def busy(n):
+    return sum(i * i for i in range(n))
+
+
+def pool_busy(n):
+    return sum(i * i for i in range(n))
+
+
+def profiled_funcs(path):
+    return {func[2] for func in pstats.Stats(path).stats}
+
+
+class TestProfiler(TestCase):
+    """
+    Test nested phases, threads, and the per-iteration output layout
+    """
+    def test_phases(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            profiler = Profiler(tmp, top=5)
+            iter_dir = os.environ.pop('ITER_DIR', None)
+            try:
+                with profiler.phase('Pipeline.start'):
+                    busy(1000)
+                    with profiler.phase('SimplePkg.configure'):
+                        busy(1000)
+                os.environ['ITER_DIR'] = os.path.join(tmp, 'out', '0-0')
+                with profiler.phase('Pipeline.start'):
+                    busy(1000)
+            finally:
+                os.environ.pop('ITER_DIR', None)
+                if iter_dir is not None:
+                    os.environ['ITER_DIR'] = iter_dir
+            profiler.flush()
+            pid = os.getpid()
+            self.assertEqual(
+                sorted(os.listdir(os.path.join(tmp, 'setup'))),
+                [f'Pipeline.start-{pid}.prof',
+                 f'SimplePkg.configure-{pid}.prof'])
+            self.assertEqual(os.listdir(os.path.join(tmp, '0-0')),
+                             [f'Pipeline.start-{pid}.prof'])
+            with open(os.path.join(tmp, 'summary.txt'),
+                      encoding='utf-8') as fp:
+                summary = fp.read()
+            self.assertIn('==== Pipeline.start: 2 profiles', summary)
+            self.assertIn('==== SimplePkg.configure: 1 profiles', summary)
+
+    def test_threads(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            profiler = Profiler(tmp, top=5)
+            with profiler.phase('Pipeline.start'):
+                with ThreadPoolExecutor(max_workers=2) as pool:
+                    # Work on another thread is missed unless propagated
+                    pool.submit(busy, 1000).result()
+                    pool.submit(profiler.propagate(pool_busy), 1000).result()
+            # Outside of a phase, there is nothing to propagate
+            self.assertIs(profiler.propagate(busy), busy)
+            profiler.flush()
+            funcs = profiled_funcs(os.path.join(
+                tmp, 'setup', f'Pipeline.start-{os.getpid()}.prof'))
+        self.assertIn('pool_busy', funcs)
+        self.assertNotIn('busy', funcs)
+
@@ -0,0 +1,35 @@
+"""
+Test the pymonitor readiness check
+"""
+from builtin.builtin.pymonitor.pkg import Pymonitor
+from unittest import TestCase
+import tempfile
+import os
+
+
+class TestPymonitorReady(TestCase):
+    """
+    Test that logs of an earlier run do not make the monitor ready
+    """
+    def test_stale_logs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pkg = Pymonitor.__new__(Pymonitor)
+            pkg.config = {'dir': tmp}
+            pkg._init()
+            stale = os.path.join(tmp, 'h1.yaml')
+            with open(stale, 'w', encoding='utf-8') as fp:
+                fp.write('cpu: 1\n')
+            os.utime(stale, (1000, 1000))
+            pkg.prior_logs = pkg.log_mtimes()
+            self.assertFalse(pkg.ready())
+            # A new sample appended to an old log
+            with open(stale, 'a', encoding='utf-8') as fp:
+                fp.write('cpu: 2\n')
+            self.assertTrue(pkg.ready())
+            # A new log
+            pkg.prior_logs = pkg.log_mtimes()
+            self.assertFalse(pkg.ready())
+            with open(os.path.join(tmp, 'h2.yaml'), 'w',
+                      encoding='utf-8') as fp:
+                fp.write('cpu: 1\n')
+            self.assertTrue(pkg.ready())
@@ -0,0 +1,52 @@
+"""
+Test service readiness probes
+"""
+from jarvis_cd.basic.readiness import PortProbe, LogProbe, PidProbe, \
+    HookProbe, wait_ready
+from unittest import TestCase
+import tempfile
+import socket
+import os
+
+
+class TestReadiness(TestCase):
+    """
+    Test readiness probes and backoff polling
+    """
+    def test_port_probe(self):
+        with socket.socket() as server:
+            server.bind(('localhost', 0))
+            port = server.getsockname()[1]
+            probe = PortProbe(['localhost'], port)
+            self.assertFalse(probe.ready())
+            server.listen()
+            self.assertTrue(probe.ready())
+
+    def test_log_probe(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'server.log')
+            probe = LogProbe(path, r'listening on port \d+')
+            self.assertFalse(probe.ready())
+            with open(path, 'w', encoding='utf-8') as fp:
+                fp.write('starting\nlistening on port 6379\n')
+            self.assertTrue(probe.ready())
+
+    def test_pid_probe(self):
+        self.assertTrue(PidProbe(os.getpid()).ready())
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0)
+        os.waitpid(pid, 0)
+        with self.assertRaises(Exception):
+            PidProbe([pid]).ready()
+
+    def test_wait_ready(self):
+        polls = []
+
+        def ready():
+            polls.append(1)
+            return len(polls) >= 3
+        wait_ready([HookProbe(ready)], timeout=5, delay=.01)
+        self.assertEqual(len(polls), 3)
+        with self.assertRaises(TimeoutError):
+            wait_ready([HookProbe(lambda: False)], timeout=.1, delay=.01)
@@ -0,0 +1,53 @@
+"""
+Test parsing and aggregation of redis-benchmark --csv output
+"""
+from unittest import TestCase
+import importlib
+
+parse = importlib.import_module('builtin.builtin.redis-benchmark.parse')
+
+# Redis 7 prints a header and latency percentiles
+CSV_7 = '''"test","rps","avg_latency_ms","min_latency_ms","p50_latency_ms","p95_latency_ms","p99_latency_ms","max_latency_ms"
+"SET","100000.00","0.300","0.080","0.250","0.400","0.500","1.215"
+"GET","200000.00","0.200","0.072","0.150","0.300","0.400","0.871"
+'''
+
+CSV_7_SLOW = '''"test","rps","avg_latency_ms","min_latency_ms","p50_latency_ms","p95_latency_ms","p99_latency_ms","max_latency_ms"
+"SET","50000.00","0.600","0.080","0.400","0.800","2.000","3.215"
+'''
+
+# Older versions print only the test and its rps
+CSV_OLD = '''"SET","97087.38"
+"LPUSH (needed to benchmark LPOP)","95238.10"
+'''
+
+
+class TestRedisBenchmarkParse(TestCase):
+    """
+    Test both CSV formats and the combination of many clients
+    """
+    def test_parse_csv(self):
+        results = parse.parse_csv(CSV_7)
+        self.assertEqual(results['SET']['rps'], 100000)
+        self.assertEqual(results['GET']['p99_latency_ms'], .4)
+
+    def test_parse_old_csv(self):
+        results = parse.parse_csv(CSV_OLD)
+        self.assertEqual(results['SET'], {'rps': 97087.38})
+        self.assertEqual(
+            results['LPUSH (needed to benchmark LPOP)']['rps'], 95238.10)
+
+    def test_aggregate(self):
+        stats = parse.aggregate([parse.parse_csv(CSV_7),
+                                 parse.parse_csv(CSV_7_SLOW)])
+        self.assertEqual(stats['set_rps'], 150000)
+        self.assertAlmostEqual(stats['set_avg_ms'], .4)
+        self.assertAlmostEqual(stats['set_p50_ms'], .3)
+        self.assertEqual(stats['set_p99_ms'], 2)
+        self.assertEqual(stats['get_rps'], 200000)
+
+    def test_aggregate_old(self):
+        stats = parse.aggregate([parse.parse_csv(CSV_OLD)] * 2)
+        self.assertAlmostEqual(stats['set_rps'], 2 * 97087.38)
+        self.assertAlmostEqual(stats['lpush_rps'], 2 * 95238.10)
+        self.assertNotIn('set_avg_ms', stats)
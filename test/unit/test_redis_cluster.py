@@ -0,0 +1,92 @@
+"""
+Test the redis cluster helper against local stand-in redis nodes
+"""
+from jarvis_cd.basic.redis_cluster import RedisCluster, RedisError, \
+    parse_node
+from unittest import TestCase
+import socketserver
+import threading
+
+
+class FakeRedisNode(socketserver.ThreadingTCPServer):
+    """
+    Speaks enough RESP to flush, reset, and report the cluster state.
+    The cluster becomes ok a few CLUSTER INFO calls after a reset.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('localhost', 0), FakeRedisHandler)
+        self.keys = 5
+        self.state = 'fail'
+        self.polls_until_ok = 3
+        self.commands = []
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        node = self.server
+        nargs = int(self.rfile.readline()[1:])
+        args = []
+        for _ in range(nargs):
+            size = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(size + 2)[:-2].decode().upper())
+        node.commands.append(args)
+        if args == ['FLUSHALL']:
+            node.keys = 0
+            self.wfile.write(b'+OK\r\n')
+        elif args == ['CLUSTER', 'RESET'] and node.keys == 0:
+            self.wfile.write(b'+OK\r\n')
+        elif args == ['CLUSTER', 'INFO']:
+            node.polls_until_ok -= 1
+            if node.polls_until_ok <= 0:
+                node.state = 'ok'
+            info = f'cluster_state:{node.state}\r\ncluster_known_nodes:3\r\n'
+            self.wfile.write(f'${len(info)}\r\n{info}\r\n'.encode())
+        else:
+            self.wfile.write(b'-ERR unsupported\r\n')
+
+
+class TestRedisCluster(TestCase):
+    """
+    Test concurrent reset and waiting for cluster_state:ok
+    """
+    def setUp(self):
+        self.servers = [FakeRedisNode() for _ in range(3)]
+        for server in self.servers:
+            threading.Thread(target=server.serve_forever, args=(.01,),
+                             daemon=True).start()
+        self.nodes = [('localhost', server.server_address[1])
+                      for server in self.servers]
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def test_parse_node(self):
+        self.assertEqual(parse_node('node1', 7000), ('node1', 7000))
+        self.assertEqual(parse_node('node1:7001', 7000), ('node1', 7001))
+
+    def test_reset_and_wait(self):
+        cluster = RedisCluster(self.nodes)
+        self.assertFalse(cluster.is_ok())
+        cluster.reset()
+        for server in self.servers:
+            self.assertEqual(server.keys, 0)
+            self.assertIn(['CLUSTER', 'RESET'], server.commands)
+        cluster.wait_ok(timeout=10)
+        self.assertTrue(cluster.is_ok())
+
+    def test_errors(self):
+        cluster = RedisCluster(self.nodes)
+        with self.assertRaises(RedisError):
+            cluster.command(self.nodes[0], 'SHUTDOWN')
+        self.servers[1].shutdown()
+        self.servers[1].server_close()
+        with self.assertRaises(Exception) as ctx:
+            cluster.command_all('FLUSHALL')
+        self.assertIn(str(self.nodes[1][1]), str(ctx.exception))
+        with self.assertRaises(TimeoutError):
+            cluster.wait_ok(timeout=.2)
@@ -0,0 +1,70 @@
+"""
+Test batching of remote operations into per-host scripts
+"""
+from jarvis_cd.basic.remote_batch import RemoteBatch
+from jarvis_util.util.hostfile import Hostfile
+from unittest import TestCase
+import subprocess
+import tempfile
+import os
+
+
+class TestRemoteBatch(TestCase):
+    """
+    Test script grouping and per-op error attribution
+    """
+    def test_scripts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            conf = os.path.join(tmp, 'orangefs.xml')
+            with open(conf, 'w', encoding='utf-8') as fp:
+                fp.write("<Defaults>'quoted'</Defaults>\n")
+            batch = RemoteBatch()
+            batch.mkdir(os.path.join(tmp, 'storage dir'),
+                        Hostfile(all_hosts=['h1', 'h2']))
+            batch.exec('echo oops; false', Hostfile(all_hosts=['h2']))
+            batch.pscp(conf, Hostfile(all_hosts=['h1']))
+            scripts = {tuple(hosts): (script, op_ids)
+                       for hosts, script, op_ids in batch.scripts()}
+            self.assertEqual(scripts[('h1',)][1], [0, 2])
+            self.assertEqual(scripts[('h2',)][1], [0, 1])
+            os.remove(conf)
+            for script, _ in scripts.values():
+                out = subprocess.run(['sh', '-c', script], check=True,
+                                     capture_output=True, text=True).stdout
+                results = RemoteBatch.parse_output(out)
+                self.assertEqual(results[0], (0, ''))
+                if 1 in results:
+                    self.assertEqual(results[1], (1, 'oops'))
+            self.assertTrue(os.path.isdir(os.path.join(tmp, 'storage dir')))
+            with open(conf, encoding='utf-8') as fp:
+                self.assertEqual(fp.read(),
+                                 "<Defaults>'quoted'</Defaults>\n")
+
+    def test_rounds(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            hostfile = Hostfile(all_hosts=['h1'])
+            small = os.path.join(tmp, 'small.conf')
+            big = os.path.join(tmp, 'sub', 'big.conf')
+            os.makedirs(os.path.dirname(big))
+            with open(small, 'wb') as fp:
+                fp.write(os.urandom(RemoteBatch.MAX_EMBED_SIZE // 2))
+            with open(big, 'wb') as fp:
+                fp.write(os.urandom(RemoteBatch.MAX_EMBED_SIZE + 1))
+            batch = RemoteBatch()
+            # Two embedded files fit in one script, a third does not
+            batch.pscp([small, small, small], hostfile)
+            self.assertEqual(batch.barriers, [(2, None)])
+            # A large file is copied in its queued position, after its
+            # parent directory is created
+            batch.pscp(big, hostfile)
+            batch.rm(big, hostfile)
+            self.assertEqual(batch.barriers[1], (4, (big, hostfile)))
+            self.assertEqual(batch.ops[3][1],
+                             f'mkdir -p {os.path.dirname(big)}')
+            self.assertEqual(batch.ops[4][0], f'rm {big}')
+            for first, last in [(0, 2), (2, 4), (4, 5)]:
+                for _, script, op_ids in batch.scripts(first, last):
+                    self.assertEqual(op_ids, list(range(first, last)))
+                    self.assertLessEqual(len(script),
+                                         RemoteBatch.MAX_SCRIPT_SIZE)
+
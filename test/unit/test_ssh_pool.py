@@ -0,0 +1,71 @@
+"""
+Test the ssh connection pool
+"""
+from jarvis_cd.basic.ssh_pool import SshPool, pool_exec
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+import shutil
+import types
+import sys
+import os
+
+
+class TestSshPool(TestCase):
+    """
+    Test activation of the ssh wrapper and routing Execs through it
+    """
+    def test_local_hosts(self):
+        pool = SshPool()
+        self.assertFalse(pool.start(['localhost']))
+        self.assertFalse(pool.active)
+
+    @skipIf(shutil.which('ssh') is None, 'ssh is not installed')
+    def test_wrapper(self):
+        pool = SshPool()
+        path = os.environ.get('PATH')
+        try:
+            self.assertTrue(pool.start(['jarvis-unreachable.invalid']))
+            self.assertEqual(pool.hosts, set())
+            self.assertTrue(pool.in_path(os.environ['PATH']))
+            self.assertEqual(shutil.which('ssh'),
+                             os.path.join(pool.bin_dir, 'ssh'))
+            wrapped = pool.prefix_path('/usr/bin')
+            self.assertEqual(wrapped, f'{pool.bin_dir}:/usr/bin')
+            self.assertEqual(pool.prefix_path(wrapped), wrapped)
+            ctrl_dir = pool.ctrl_dir
+        finally:
+            pool.stop()
+        self.assertFalse(os.path.exists(ctrl_dir))
+        self.assertEqual(os.environ.get('PATH'), path)
+
+    @skipIf(shutil.which('ssh') is None, 'ssh is not installed')
+    def test_exec_env(self):
+        class Exec:
+            def __init__(self, cmd, exec_info=None):
+                self.ssh = shutil.which('ssh', path=exec_info.env['PATH'])
+
+        class ExecInfo:
+            def __init__(self, env):
+                self.env = env
+                self.basic_env = env
+
+        exec_mod = types.ModuleType('jarvis_util.shell.exec')
+        exec_mod.Exec = Exec
+        pool = SshPool()
+        env = {'PATH': '/usr/bin:/bin', 'HOME': '/home/jarvis'}
+        with patch.dict(sys.modules, {'jarvis_util.shell.exec': exec_mod}), \
+                patch.object(SshPool, 'instance_', pool):
+            pool_exec()
+            pool_exec()
+            try:
+                pool.start(['jarvis-unreachable.invalid'])
+                exec_info = ExecInfo(env)
+                node = Exec('ssh host true', exec_info)
+                self.assertEqual(node.ssh, os.path.join(pool.bin_dir, 'ssh'))
+            finally:
+                pool.stop()
+            # The pkg's env and exec info are not modified
+            self.assertEqual(env['PATH'], '/usr/bin:/bin')
+            self.assertIs(exec_info.env, env)
+            node = Exec('ssh host true', ExecInfo(env))
+            self.assertNotIn('jarvis-ssh-', node.ssh)
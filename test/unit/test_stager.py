@@ -0,0 +1,90 @@
+"""
+Test the parallel copy engine used by data_stagein
+"""
+from builtin.builtin.data_stagein.stager import Stager, PART_SUFFIX
+from unittest import TestCase
+import tempfile
+import os
+
+
+class TestStager(TestCase):
+    """
+    Test planning, copying, skipping, and sharding
+    """
+    def make_tree(self, root):
+        src = os.path.join(root, 'dataset')
+        os.makedirs(os.path.join(src, 'sub'))
+        files = {'a.bin': 3 << 20, 'sub/b.bin': 1000, 'sub/empty': 0}
+        for name, size in files.items():
+            with open(os.path.join(src, name), 'wb') as fp:
+                fp.write(os.urandom(size))
+        single = os.path.join(root, 'single.txt')
+        with open(single, 'w', encoding='utf-8') as fp:
+            fp.write('hello')
+        return src, single
+
+    def test_stage(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src, single = self.make_tree(tmp)
+            dest = os.path.join(tmp, 'dest')
+            stager = Stager(nthreads=4, buf_size=1 << 20)
+            stats = stager.stage([src, single], dest)
+            self.assertEqual(stats['files_copied'], 4)
+            self.assertEqual(stats['bytes_copied'], (3 << 20) + 1005)
+            for name in ['a.bin', 'sub/b.bin', 'sub/empty']:
+                with open(os.path.join(src, name), 'rb') as fp1, \
+                        open(os.path.join(dest, 'dataset', name), 'rb') as fp2:
+                    self.assertEqual(fp1.read(), fp2.read())
+            self.assertTrue(os.path.exists(os.path.join(dest, 'single.txt')))
+            self.assertFalse(any(name.endswith(PART_SUFFIX)
+                                 for _, _, names in os.walk(dest)
+                                 for name in names))
+            # A repeated stage-in copies only what changed
+            stats = stager.stage([src, single], dest)
+            self.assertEqual(stats['files_copied'], 0)
+            self.assertEqual(stats['files_skipped'], 4)
+            with open(single, 'w', encoding='utf-8') as fp:
+                fp.write('changed')
+            stats = stager.stage([src, single], dest)
+            self.assertEqual(stats['files_copied'], 1)
+
+    def test_checksum_skip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src, _ = self.make_tree(tmp)
+            dest = os.path.join(tmp, 'dest')
+            Stager(skip='never').stage([src], dest)
+            copy = os.path.join(dest, 'dataset', 'sub', 'b.bin')
+            with open(copy, 'r+b') as fp:
+                fp.write(b'\0' * 10)
+            stats = Stager(skip='checksum').stage([src], dest)
+            self.assertEqual(stats['files_copied'], 1)
+            self.assertEqual(stats['files_skipped'], 2)
+            with self.assertRaises(Exception):
+                Stager(skip='sometimes')
+
+    def test_shard(self):
+        files = [(f'f{i}', f'd{i}', size)
+                 for i, size in enumerate([10, 9, 8, 7, 1, 1, 1, 1])]
+        shards = Stager.shard(files, 3)
+        self.assertEqual(sorted(len(shard) for shard in shards), [2, 3, 3])
+        totals = sorted(sum(file[2] for file in shard) for shard in shards)
+        self.assertEqual(totals, [11, 12, 15])
+        self.assertEqual(sorted(file for shard in shards for file in shard),
+                         sorted(files))
+
+    def test_ring_rounds(self):
+        nhosts = 4
+        have = [{i} for i in range(nhosts)]
+        rounds = Stager.ring_rounds(nhosts)
+        self.assertEqual(len(rounds), nhosts - 1)
+        for cur_round in rounds:
+            self.assertEqual(sorted(sender for sender, _, _ in cur_round),
+                             list(range(nhosts)))
+            received = []
+            for sender, receiver, shard in cur_round:
+                self.assertIn(shard, have[sender])
+                received.append((receiver, shard))
+            for receiver, shard in received:
+                have[receiver].add(shard)
+        self.assertEqual(have, [set(range(nhosts))] * nhosts)
+        self.assertEqual(Stager.ring_rounds(1), [])
@@ -0,0 +1,132 @@
+"""
+Test killing pkgs whose start does not return in time
+"""
+from jarvis_cd.basic.pkg import Pipeline, Service
+from unittest import TestCase
+from contextlib import contextmanager
+import threading
+import time
+
+
+class FakeEventLog:
+    def __init__(self):
+        self.events = []
+
+    @contextmanager
+    def span(self, name, kind, pkg_id=None):
+        yield
+
+    def emit(self, name, kind, pkg_id=None, **kwargs):
+        self.events.append((name, pkg_id, kwargs))
+
+
+class SleepyService(Service):
+    """
+    A service whose start sleeps for duration seconds. Unless it is
+    stubborn, kill interrupts the sleep.
+    """
+    def __init__(self, duration, timeout=None, stubborn=False, error=None):
+        self.pkg_id = 'sleepy'
+        self.config = {'timeout': timeout}
+        self.env = {}
+        self.mod_env = {}
+        self.duration = duration
+        self.stubborn = stubborn
+        self.error = error
+        self.killed = threading.Event()
+        self.started = False
+
+    def start(self):
+        self.started = True
+        if self.stubborn:
+            time.sleep(self.duration)
+        else:
+            self.killed.wait(self.duration)
+        if self.error is not None:
+            raise self.error
+
+    def kill(self):
+        self.killed.set()
+
+    def _init(self):
+        pass
+
+    def _configure_menu(self):
+        return []
+
+    def _configure(self, **kwargs):
+        pass
+
+    def stop(self):
+        pass
+
+    def clean(self):
+        pass
+
+    def status(self):
+        return True
+
+
+def make_pipeline():
+    ppl = Pipeline.__new__(Pipeline)
+    ppl.env = {}
+    ppl.mod_env = {}
+    ppl.events = FakeEventLog()
+    ppl.event_log = lambda: ppl.events
+    ppl.logs = []
+    ppl.log = lambda msg, *args, **kwargs: ppl.logs.append(msg)
+    return ppl
+
+
+class TestWatchdog(TestCase):
+    """
+    Test the timeout, kill, and abandon paths of the start watchdog
+    """
+    def test_no_timeout(self):
+        ppl = make_pipeline()
+        pkg = SleepyService(0)
+        ppl._watchdog_start(pkg)
+        self.assertTrue(pkg.started)
+        self.assertFalse(pkg.killed.is_set())
+        self.assertFalse(hasattr(pkg, 'timed_out'))
+
+    def test_in_time(self):
+        ppl = make_pipeline()
+        pkg = SleepyService(0, timeout=5)
+        ppl._watchdog_start(pkg)
+        self.assertFalse(pkg.killed.is_set())
+        self.assertFalse(hasattr(pkg, 'timed_out'))
+        self.assertEqual(ppl.events.events, [])
+
+    def test_error_is_raised(self):
+        ppl = make_pipeline()
+        with self.assertRaises(RuntimeError):
+            ppl._watchdog_start(SleepyService(
+                0, timeout=5, error=RuntimeError('start failed')))
+        with self.assertRaises(RuntimeError):
+            ppl._watchdog_start(SleepyService(
+                0, error=RuntimeError('start failed')))
+
+    def test_timeout_kills(self):
+        ppl = make_pipeline()
+        pkg = SleepyService(30, timeout=.2)
+        begin = time.time()
+        ppl._watchdog_start(pkg, grace=5)
+        self.assertLess(time.time() - begin, 5)
+        self.assertTrue(pkg.killed.is_set())
+        self.assertTrue(pkg.timed_out)
+        self.assertEqual(pkg.exit_code, Pipeline.TIMEOUT_EXIT_CODE)
+        self.assertEqual(ppl.events.events,
+                         [('timeout', 'sleepy', {'timeout': .2})])
+        self.assertFalse(any('Abandoning' in msg for msg in ppl.logs))
+
+    def test_abandoned(self):
+        ppl = make_pipeline()
+        pkg = SleepyService(2, timeout=.2, stubborn=True)
+        begin = time.time()
+        ppl._watchdog_start(pkg, grace=.2)
+        self.assertLess(time.time() - begin, 1.5)
+        self.assertTrue(pkg.killed.is_set())
+        self.assertTrue(pkg.timed_out)
+        self.assertEqual(pkg.exit_code, Pipeline.TIMEOUT_EXIT_CODE)
+        self.assertTrue(any('Abandoning' in msg for msg in ppl.logs))
@@ -0,0 +1,66 @@
+"""
+Test the YCSB load and run commands
+"""
+from builtin.builtin.ycsbc.pkg import Ycsbc
+from unittest import TestCase
+from types import SimpleNamespace
+import tempfile
+import os
+
+
+def make_ycsbc(root, clients=1, recordcount=None):
+    pkg = Ycsbc.__new__(Ycsbc)
+    pkg.env = {'YCSBC_ROOT': root}
+    pkg.config = {'db_name': 'rocksdb', 'workload': 'a', 'status': False,
+                  'threads': 1, 'clients': clients,
+                  'recordcount': recordcount}
+    pkg.jarvis = SimpleNamespace(hostfile=SimpleNamespace(
+        hosts=[f'h{i}' for i in range(clients)]))
+    return pkg
+
+
+class TestYcsbcCmd(TestCase):
+    """
+    Test that recordcount reaches both phases for any number of clients
+    """
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.tmp.name, 'workloads'))
+        with open(os.path.join(self.tmp.name, 'workloads', 'workloada'),
+                  'w', encoding='utf-8') as fp:
+            fp.write('recordcount=1000\noperationcount=1000\n')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_single_client(self):
+        pkg = make_ycsbc(self.tmp.name, recordcount=5000)
+        load_args = pkg.load_args()
+        self.assertEqual(load_args, [None])
+        self.assertIn('-p recordcount=5000',
+                      pkg.ycsb_cmd('-load', load_args[0]))
+        self.assertIn('-p recordcount=5000', pkg.ycsb_cmd('-run'))
+
+    def test_many_clients(self):
+        pkg = make_ycsbc(self.tmp.name, clients=3, recordcount=10)
+        load_args = pkg.load_args()
+        self.assertEqual(load_args, [
+            '-p insertstart=0 -p insertcount=3',
+            '-p insertstart=3 -p insertcount=3',
+            '-p insertstart=6 -p insertcount=4',
+        ])
+        for args in load_args:
+            cmd = pkg.ycsb_cmd('-load', args)
+            self.assertEqual(cmd.count('recordcount='), 1)
+            self.assertIn('-p recordcount=10', cmd)
+        self.assertIn('-p recordcount=10', pkg.ycsb_cmd('-run'))
+
+    def test_workload_recordcount(self):
+        # Without the option, the workload's recordcount is split and
+        # neither phase overrides it
+        pkg = make_ycsbc(self.tmp.name, clients=2)
+        self.assertEqual(pkg.load_args(), [
+            '-p insertstart=0 -p insertcount=500',
+            '-p insertstart=500 -p insertcount=500',
+        ])
+        self.assertNotIn('recordcount', pkg.ycsb_cmd('-run'))
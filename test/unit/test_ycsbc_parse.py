@@ -0,0 +1,46 @@
+"""
+Test parsing and merging of YCSB client output
+"""
+from builtin.builtin.ycsbc.parse import parse_output, merge
+from unittest import TestCase
+
+CLIENT_1 = """
+2024-05-02 10:00:01 1 sec: 40000 operations; [READ: Count=20000 Max=800.00 Min=3.00 Avg=12.00 90=20.00 99=45.00 99.9=120.00 99.99=500.00] [UPDATE: Count=20000 Max=900.00 Min=5.00 Avg=14.00 90=22.00 99=50.00 99.9=130.00 99.99=600.00]
+2024-05-02 10:00:02 2 sec: 100000 operations; [READ: Count=50000 Max=1000.00 Min=2.00 Avg=10.00 90=18.00 99=40.00 99.9=110.00 99.99=450.00] [UPDATE: Count=50000 Max=1200.00 Min=4.00 Avg=12.00 90=20.00 99=48.00 99.9=125.00 99.99=550.00]
+Run runtime(sec): 2.00
+Run operations(ops): 100000
+Run throughput(ops/sec): 50000.00
+"""
+
+CLIENT_2 = """
+2024-05-02 10:00:02 2 sec: 50000 operations; [READ: Count=25000 Max=3000.00 Min=5.00 Avg=40.00 90=60.00 99=90.00 99.9=300.00 99.99=900.00] [UPDATE: Count=25000 Max=1500.00 Min=6.00 Avg=30.00 90=45.00 99=80.00 99.9=200.00 99.99=700.00]
+Run runtime(sec): 2.00
+Run operations(ops): 50000
+Run throughput(ops/sec): 25000.00
+"""
+
+
+class TestYcsbcParse(TestCase):
+    """
+    Test the final status of a client and the merge of many clients
+    """
+    def test_parse_output(self):
+        throughput, ops = parse_output(CLIENT_1)
+        self.assertEqual(throughput, 50000)
+        # The last status line holds the final numbers
+        self.assertEqual(ops['READ']['Count'], 50000)
+        self.assertEqual(ops['UPDATE']['99.9'], 125)
+        self.assertEqual(ops['READ']['Min'], 2)
+
+    def test_no_output(self):
+        self.assertEqual(parse_output(''), (None, {}))
+
+    def test_merge(self):
+        stats = merge([parse_output(CLIENT_1), parse_output(CLIENT_2)])
+        self.assertEqual(stats['throughput'], 75000)
+        self.assertEqual(stats['read_count'], 75000)
+        self.assertEqual(stats['read_min_us'], 2)
+        self.assertEqual(stats['read_max_us'], 3000)
+        self.assertAlmostEqual(stats['read_avg_us'], 20)
+        self.assertEqual(stats['read_p99_us'], 90)
+        self.assertEqual(stats['update_p99_9_us'], 200)